@@ -0,0 +1,185 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from . import kml_writer
+from . import ndjson_writer
+from .factory import AixmFeatureFactory
+
+# Output format to file suffix
+OUTPUT_SUFFIXES = {'kml': '.kml', 'kmz': '.kmz', 'geojson': '.ndjson'}
+
+# Marks the end of a producer's output
+_DONE = object()
+
+
+class _ProducerError:
+    __slots__ = ['error']
+
+    def __init__(self, error):
+        self.error = error
+
+
+class KmlSink:
+    """Draws batches of geographic information to a kml_writer.StreamingKml, which writes them out as they arrive."""
+    __slots__ = ['_kml_obj']
+
+    def __init__(self, output_path, file_name):
+        self._kml_obj = kml_writer.StreamingKml(output=output_path, file_name=file_name)
+
+    def write(self, geo_dicts: list):
+        for geo_dict in geo_dicts:
+            if geo_dict:
+                kml_writer.draw_feature(geo_dict, self._kml_obj)
+
+    def close(self):
+        self._kml_obj.close()
+
+
+class GeoJsonSink:
+    """Writes batches of numeric geographic information as newline-delimited GeoJSON."""
+    __slots__ = ['_file']
+
+    def __init__(self, output_path, file_name):
+        self._file = open(Path(output_path).joinpath(file_name), 'wb', buffering=1 << 20)
+
+    def write(self, geo_dicts: list):
+        self._file.writelines(ndjson_writer.iter_lines(geo_dicts))
+
+    def close(self):
+        self._file.close()
+
+
+async def aiter_features(aixm_file, numeric=False, feature_types=None, bbox=None, queue_size=64, executor=None):
+    """
+    Streams the geographic information of every supported feature without blocking the event loop.
+
+    Parsing and extraction run on an executor thread which hands results over through a bounded queue, so the producer
+    waits whenever the consumer falls queue_size features behind.  Leaving the loop early stops the producer.
+
+        async for geo_dict in aiter_features(aixm_file):
+            ...
+
+    Args:
+        aixm_file: Path to the AIXM file.
+        numeric (bool): Extract numeric coordinates rather than coordinate strings.
+        feature_types (Iterable[str]): Only extract these feature types.
+        bbox (tuple): Only extract features meeting this (min_lat, min_lon, max_lat, max_lon) box.
+        queue_size (int): Most features extracted ahead of the consumer.
+        executor (concurrent.futures.ThreadPoolExecutor): Executor to run the producer on, the loop's default if None.
+    Returns:
+        geo_dicts (AsyncGenerator): Geographic information dicts in document order.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(item):
+        # Blocks this thread, never the loop, until the queue has room
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    def produce():
+        try:
+            factory = AixmFeatureFactory(aixm_file, stream=True, numeric=numeric, feature_types=feature_types,
+                                         bbox=bbox)
+            for aixm_feature in factory:
+                if stop.is_set():
+                    return
+                put(aixm_feature.get_geographic_information())
+        except Exception as error:
+            put(_ProducerError(error))
+        finally:
+            if not stop.is_set():
+                put(_DONE)
+
+    producer = loop.run_in_executor(executor, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _ProducerError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        # Keep draining so a producer blocked on a full queue can see it has been stopped
+        while not producer.done():
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.wait({producer}, timeout=0.01)
+
+
+async def convert(aixm_file, output_path, output_format='kml', queue_size=64, executor=None) -> int:
+    """
+    Converts a single AIXM file without blocking the event loop.  Extraction and writing run on executor threads,
+    connected by the bounded queue of aiter_features, so one file is written while the next features are extracted.
+    Args:
+        aixm_file: Path to the AIXM file.
+        output_path: Directory to write to.  The output is named after the AIXM file.
+        output_format (str): One of 'kml', 'kmz' or 'geojson'.
+        queue_size (int): Most features extracted ahead of the writer, and the most written in one batch.
+        executor (concurrent.futures.ThreadPoolExecutor): Executor for both stages, the loop's default if None.
+    Returns:
+        count (int): Number of features written.
+    """
+    if output_format not in OUTPUT_SUFFIXES:
+        raise ValueError(f'Unsupported output format {output_format}, expected one of {", ".join(OUTPUT_SUFFIXES)}')
+    loop = asyncio.get_running_loop()
+    file_name = Path(aixm_file).stem + OUTPUT_SUFFIXES[output_format]
+    sink_class = GeoJsonSink if output_format == 'geojson' else KmlSink
+    sink = await loop.run_in_executor(executor, sink_class, output_path, file_name)
+
+    count = 0
+    batch = []
+    try:
+        async for geo_dict in aiter_features(aixm_file, numeric=output_format == 'geojson', queue_size=queue_size,
+                                             executor=executor):
+            batch.append(geo_dict)
+            # Write whatever has queued up, the producer carries on extracting meanwhile
+            if len(batch) >= queue_size:
+                await loop.run_in_executor(executor, sink.write, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            await loop.run_in_executor(executor, sink.write, batch)
+            count += len(batch)
+    finally:
+        await loop.run_in_executor(executor, sink.close)
+    return count
+
+
+async def convert_many(aixm_files, output_path, output_format='kml', concurrency=4, queue_size=64,
+                       executor=None) -> list:
+    """
+    Converts many AIXM files, at most concurrency at a time, without blocking the event loop.
+
+        counts = await convert_many(paths, output_path, output_format='geojson', concurrency=8)
+
+    Args:
+        aixm_files (Iterable): Paths to the AIXM files.
+        output_path: Directory to write to.  Each output is named after its AIXM file.
+        output_format (str): One of 'kml', 'kmz' or 'geojson'.
+        concurrency (int): Most files converted at once.
+        queue_size (int): Most features extracted ahead of each writer.
+        executor (concurrent.futures.ThreadPoolExecutor): Executor for every stage.  Each file being converted holds
+          a thread for extraction and briefly another for writing, so it needs at least 2 * concurrency workers.  If
+          None, an executor of that size is created and shut down afterwards.
+    Returns:
+        counts (list[int]): Number of features written for each file, in the order given.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=2 * concurrency, thread_name_prefix='aixm_geo')
+
+    async def convert_limited(aixm_file):
+        async with semaphore:
+            return await convert(aixm_file, output_path, output_format, queue_size, executor)
+
+    try:
+        return list(await asyncio.gather(*(convert_limited(aixm_file) for aixm_file in aixm_files)))
+    finally:
+        if own_executor:
+            executor.shutdown(wait=True)
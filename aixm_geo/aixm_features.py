@@ -1,12 +1,15 @@
-import util
-from base import SinglePointAixm, MultiPointAixm
-from interfaces import IAixmFeature
-from settings import NAMESPACES
+from . import geometry
+from . import references
+from . import util
+from .base import SinglePointAixm, MultiPointAixm
+from .interfaces import IAixmFeature
 
 
 class AirportHeliport(SinglePointAixm, IAixmFeature):
-    def __init__(self, root):
-        super().__init__(root)
+    __slots__ = ()
+
+    def __init__(self, root, numeric=False, timeslices=None, stats=None, resolver=None):
+        super().__init__(root, numeric, timeslices, stats, resolver)
 
     def get_geographic_information(self):
         """
@@ -19,13 +22,16 @@ class AirportHeliport(SinglePointAixm, IAixmFeature):
         elevation, elevation_uom = self.get_field_elevation()
 
         if elevation_uom != 'M':
-            elevation = util.convert_elevation(elevation, elevation_uom)
-            elevation_uom = 'M'
+            elevation, elevation_uom = util.convert_elevation(elevation, elevation_uom)
+
+        if self._numeric:
+            coordinates = self.get_position_array('.//aixm:ARP//gml:pos', z=elevation)
+        else:
+            coordinates = [f"{self.get_first_value('.//aixm:ARP//gml:pos')} {elevation}"]
 
         geo_dict = {
             'type': 'AirportHeliport',
-            'coordinates': [f"{self.get_first_value('.//aixm:ARP//gml:pos')} "
-                            f"{elevation}"],
+            'coordinates': coordinates,
             'elevation': elevation,
             'elevation_uom': elevation_uom,
             'name': f'{self.get_first_value(".//aixm:designator")} ({self.get_first_value(".//aixm:name")})',
@@ -35,8 +41,10 @@ class AirportHeliport(SinglePointAixm, IAixmFeature):
 
 
 class NavaidComponent(SinglePointAixm, IAixmFeature):
-    def __init__(self, root):
-        super().__init__(root)
+    __slots__ = ()
+
+    def __init__(self, root, numeric=False, timeslices=None, stats=None, resolver=None):
+        super().__init__(root, numeric, timeslices, stats, resolver)
 
     def get_geographic_information(self):
         """
@@ -48,13 +56,16 @@ class NavaidComponent(SinglePointAixm, IAixmFeature):
         elevation, elevation_uom = self.get_elevation()
 
         if elevation_uom != 'M':
-            elevation = util.convert_elevation(elevation, elevation_uom)
-            elevation_uom = 'M'
+            elevation, elevation_uom = util.convert_elevation(elevation, elevation_uom)
+
+        if self._numeric:
+            coordinates = self.get_position_array('.//aixm:location//gml:pos', z=elevation)
+        else:
+            coordinates = [f"{self.get_first_value('.//aixm:location//gml:pos')} {elevation}"]
 
         geo_dict = {
             'type': 'NavaidComponent',
-            'coordinates': [f"{self.get_first_value('.//aixm:location//gml:pos')}"
-                            f" {elevation}"],
+            'coordinates': coordinates,
             'elevation': elevation,
             'elevation_uom': elevation_uom,
             'name': f'{self.get_first_value(".//aixm:designator")}({self.get_first_value(".//aixm:name")})' \
@@ -65,8 +76,10 @@ class NavaidComponent(SinglePointAixm, IAixmFeature):
 
 
 class DesignatedPoint(SinglePointAixm, IAixmFeature):
-    def __init__(self, root):
-        super().__init__(root)
+    __slots__ = ()
+
+    def __init__(self, root, numeric=False, timeslices=None, stats=None, resolver=None):
+        super().__init__(root, numeric, timeslices, stats, resolver)
 
     def get_geographic_information(self):
         """
@@ -75,18 +88,25 @@ class DesignatedPoint(SinglePointAixm, IAixmFeature):
         Returns:
             geo_dict(dict): A dictionary containing relevant information regarding the feature.
         """
+        if self._numeric:
+            coordinates = self.get_position_array('.//aixm:location//gml:pos')
+        else:
+            coordinates = [self.get_first_value('.//aixm:location//gml:pos')]
+
         geo_dict = {
             'type': 'DesignatedPoint',
             'name': self.get_first_value('.//aixm:name'),
-            'coordinates': [self.get_first_value('.//aixm:location//gml:pos')]
+            'coordinates': coordinates
         }
 
         return geo_dict
 
 
 class RouteSegment(MultiPointAixm, IAixmFeature):
-    def __init__(self, root):
-        super().__init__(root)
+    __slots__ = ()
+
+    def __init__(self, root, numeric=False, timeslices=None, stats=None, resolver=None):
+        super().__init__(root, numeric, timeslices, stats, resolver)
 
     def get_geographic_information(self) -> dict:
         """
@@ -96,23 +116,35 @@ class RouteSegment(MultiPointAixm, IAixmFeature):
             geo_dict(dict): A dictionary containing relevant information regarding the feature.
         """
         coordinate_list = []
-        root = self._root.iterfind('.//aixm:curveExtent', namespaces=NAMESPACES)
+        root = self.find_all('.//aixm:curveExtent')
         for location in root:
             for x in self.extract_pos_and_poslist(location):
                 coordinate_list.append(x)
 
+        if self._numeric:
+            coordinate_list = geometry.coalesce(coordinate_list)
+
+        route = self.get_reference_label('.//aixm:routeFormed')
+        start = self.get_reference_label('.//aixm:start')
+        end = self.get_reference_label('.//aixm:end')
+
         geo_dict = {
             'type': 'RouteSegment',
             'coordinates': coordinate_list,
-            # TODO add name for route segments
+            'name': f'{route or "Unknown"} ({start or "Unknown"} - {end or "Unknown"})',
+            'route_identifier': self.get_reference('.//aixm:routeFormed'),
+            'start_identifier': self.get_reference('.//aixm:start'),
+            'end_identifier': self.get_reference('.//aixm:end'),
         }
 
         return geo_dict
 
 
 class Airspace(MultiPointAixm, IAixmFeature):
-    def __init__(self, root):
-        super().__init__(root)
+    __slots__ = ()
+
+    def __init__(self, root, numeric=False, timeslices=None, stats=None, resolver=None):
+        super().__init__(root, numeric, timeslices, stats, resolver)
 
     def get_geographic_information(self):
         """
@@ -121,8 +153,7 @@ class Airspace(MultiPointAixm, IAixmFeature):
         Returns:
             geo_dict(dict): A dictionary containing relevant information regarding the feature.
         """
-        subroot = self._root.findall('.//aixm:AirspaceGeometryComponent',
-                                     namespaces=NAMESPACES)
+        subroot = self.find_all('.//aixm:AirspaceGeometryComponent')
 
         coordinate_list = self.get_coordinate_list(subroot)
 
@@ -143,10 +174,36 @@ class Airspace(MultiPointAixm, IAixmFeature):
 
         return geo_dict
 
+    def get_contributors(self) -> list:
+        """
+        Lists the airspaces this one is composed from, e.g. an OCA formed from the UNION of its parts.
+        Returns:
+            contributors (list[references.Contributor]): Each contributing airspace in operation sequence order, its
+              reference resolved if the feature was given a resolver holding it.
+        """
+        contributors = []
+        for component in self.find_all('.//aixm:AirspaceGeometryComponent'):
+            dependency = self.find_first('.//aixm:contributorAirspace', subtree=component)
+            href = None if dependency is None else references.get_href(dependency)
+            if href is None:
+                continue
+            sequence = self.get_first_value('.//aixm:operationSequence', subtree=component)
+            contributors.append(references.Contributor(
+                operation=self.get_first_value('.//aixm:operation', subtree=component),
+                sequence=int(sequence) if sequence.isdigit() else None,
+                dependency=self.get_first_value('.//aixm:dependency', subtree=dependency),
+                identifier=references.get_identifier(href),
+                reference=None if self._resolver is None else self._resolver.resolve(href),
+            ))
+        contributors.sort(key=lambda contributor: (contributor.sequence is None, contributor.sequence or 0))
+        return contributors
+
 
 class VerticalStructure(MultiPointAixm, IAixmFeature):
-    def __init__(self, root):
-        super().__init__(root)
+    __slots__ = ()
+
+    def __init__(self, root, numeric=False, timeslices=None, stats=None, resolver=None):
+        super().__init__(root, numeric, timeslices, stats, resolver)
 
     def get_geographic_information(self):
         """
@@ -156,15 +213,17 @@ class VerticalStructure(MultiPointAixm, IAixmFeature):
             geo_dict(dict): A dictionary containing relevant information regarding the feature.
         """
 
-        subroot = self._root.findall('.//aixm:part',
-                                     namespaces=NAMESPACES)[0]
+        subroot = self.find_all('.//aixm:part')[0]
 
         elevation, elevation_uom = self.get_vertical_extent()
         elevation, elevation_uom = util.convert_elevation(elevation, elevation_uom)
 
         coordinate_list = self.get_coordinate_list(subroot)
 
-        if len(coordinate_list) == 1:
+        if self._numeric:
+            if geometry.vertex_count(coordinate_list) == 1 and not isinstance(coordinate_list[0], tuple):
+                coordinate_list[0] = geometry.append_z(coordinate_list[0], elevation)
+        elif len(coordinate_list) == 1:
             coordinate_list[0] = f'{coordinate_list[0]} {elevation}'
 
         geo_dict = {
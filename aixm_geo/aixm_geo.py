@@ -1,73 +1,163 @@
+import time
 from pathlib import Path
 
 from kmlplus import kml
 
-import util as util
-from factory import AixmFeatureFactory
+from . import geodesy
+from . import kml_writer
+from . import ndjson_writer
+from .diff import IncrementalExtractor, load_manifest, save_manifest
+from .factory import AixmFeatureFactory
+from .parallel import ParallelFeatureExtractor
+
+
+def delta_file_name(file_name) -> str:
+    """
+    Args:
+        file_name: Name of the full output, e.g. airac.kml.
+    Returns:
+        file_name (str): Name of the file an incremental run draws to, e.g. airac_delta.kml.
+    """
+    file_name = Path(file_name)
+    return f'{file_name.stem}_delta{file_name.suffix}'
 
 
 class AixmGeo:
-    __slots__ = ('aixm_file', 'output_path', 'file_name')
+    __slots__ = ('aixm_file', 'output_path', 'file_name', 'workers', 'cache', 'stats', 'debug')
 
-    def __init__(self, aixm_file, output_path, file_name):
+    def __init__(self, aixm_file, output_path, file_name, workers=None, cache=None, stats=None, debug=False):
         self.aixm_file = aixm_file
         self.output_path = output_path
         self.file_name = file_name
+        self.workers = workers
+        # An optional cache.FeatureCache, a file which has been seen before is then not parsed again
+        self.cache = cache
+        # An optional instrumentation.Stats.  Extraction in worker processes or from the cache is not recorded
+        self.stats = stats
+        # Print each feature's geographic information as it is drawn
+        self.debug = debug
+
+    def build_kml(self, manifest_path=None, streaming=False):
+        """
+        Args:
+            manifest_path: Optional path to the manifest of a previous run.  If given, only features which were added
+              or have changed since that run are drawn, to a separate file named by delta_file_name, so the full
+              output of an earlier run is left in place.  The manifest is rewritten for this file.
+            streaming (bool): Write each feature to the output as it is drawn with kml_writer.StreamingKml rather than
+              building the document with KMLPlus.  Always used for a file name ending .kmz.
+        Returns:
+            diff (Union[diff.ManifestDiff, None]): The features added, removed and changed, if a manifest was given.
+        """
+        file_name = self.file_name if manifest_path is None else delta_file_name(self.file_name)
+        if streaming or Path(file_name).suffix.lower() == '.kmz':
+            with kml_writer.StreamingKml(output=self.output_path, file_name=file_name) as kml_obj:
+                return self.draw(kml_obj, manifest_path)
+        return self.draw(kml.KmlPlus(output=self.output_path, file_name=file_name), manifest_path)
+
+    def draw(self, kml_obj, manifest_path=None):
+        """
+        Args:
+            kml_obj (Union[kml.KmlPlus, kml_writer.StreamingKml]): The document to draw to.
+            manifest_path: Optional path to the manifest of a previous run.  If given, only the features which were
+              added or have changed are drawn to kml_obj.
+        Returns:
+            diff (Union[diff.ManifestDiff, None]): The features added, removed and changed, if a manifest was given.
+        """
+        if manifest_path is None:
+            self.draw_features(kml_obj)
+            return None
+
+        extractor = IncrementalExtractor(self.aixm_file, previous_manifest=load_manifest(manifest_path))
+        self.draw_features(kml_obj, extractor.get_geographic_information())
+        save_manifest(extractor.manifest, manifest_path)
+        return extractor.diff
+
+    def build_geojson(self, file_name=None, tolerance=geodesy.DEFAULT_TOLERANCE):
+        """
+        Writes every supported feature as newline-delimited GeoJSON, one Feature per line, as features are extracted.
+        Args:
+            file_name (str): Name of the file written to output_path.  Defaults to file_name with an .ndjson suffix.
+            tolerance (float): Largest chord error of densified arcs and circles in metres.
+        Returns:
+            count (int): Number of features written.
+        """
+        file_name = file_name or Path(self.file_name).with_suffix('.ndjson').name
+        return ndjson_writer.write_ndjson(self.get_geographic_information(numeric=True),
+                                    Path(self.output_path).joinpath(file_name), tolerance)
 
-    def build_kml(self):
-        kml_obj = kml.KmlPlus(output=self.output_path, file_name=self.file_name)
-        self.draw_features(kml_obj)
+    def get_geographic_information(self, numeric=False):
+        """
+        Extracts the geographic information of every supported feature, using a pool of worker processes when more
+        than one worker has been requested.
+        Args:
+            numeric (bool): Extract numeric coordinates rather than coordinate strings.
+        Returns:
+            geo_dicts (generator): A generator of geographic information dicts in document order.
+        """
+        if self.cache is not None:
+            return iter(self.cache.get_geographic_information(self.aixm_file, numeric=numeric, workers=self.workers))
+        if self.workers and self.workers > 1:
+            return iter(ParallelFeatureExtractor(self.aixm_file, workers=self.workers, numeric=numeric))
+        if self.stats is not None:
+            return (geo_dict for _, geo_dict in self.get_instrumented_geographic_information(numeric))
+        return (aixm_feature_obj.get_geographic_information()
+                for aixm_feature_obj in AixmFeatureFactory(self.aixm_file, stream=True, numeric=numeric))
 
-    def draw_features(self, kml_obj):
-        for aixm_feature_obj in AixmFeatureFactory(self.aixm_file):
+    def get_instrumented_geographic_information(self, numeric=False):
+        """
+        Args:
+            numeric (bool): Extract numeric coordinates rather than coordinate strings.
+        Returns:
+            features (generator): A generator of (gml:identifier, geographic information dict) in document order,
+              recording the time spent extracting each of them.
+        """
+        for aixm_feature_obj in AixmFeatureFactory(self.aixm_file, stream=True, numeric=numeric, stats=self.stats):
+            start = time.perf_counter()
             aixm_feature_dict = aixm_feature_obj.get_geographic_information()
+            identifier = aixm_feature_obj.get_identifier()
+            self.stats.record('extract', aixm_feature_dict['type'], time.perf_counter() - start, identifier)
+            yield identifier, aixm_feature_dict
+
+    def draw_features(self, kml_obj, geo_dicts=None):
+        if geo_dicts is not None:
+            features = ((None, aixm_feature_dict) for aixm_feature_dict in geo_dicts)
+        elif self.stats is not None and self.cache is None and not (self.workers and self.workers > 1):
+            features = self.get_instrumented_geographic_information()
+        else:
+            # Extraction in worker processes or from the cache does not keep identifiers, so the kml stage records
+            # timings without one rather than mixing in some other kind of id
+            features = ((None, aixm_feature_dict) for aixm_feature_dict in self.get_geographic_information())
+
+        for identifier, aixm_feature_dict in features:
             if aixm_feature_dict:
-                geometry_type = util.determine_geometry_type(aixm_feature_dict)
-                if geometry_type == 'cylinder':
-                    self.draw_cylinder(aixm_feature_dict, kml_obj)
-                elif geometry_type == 'point':
-                    if aixm_feature_dict['type'] == 'VerticalStructure':
-                        self.draw_vertical_structure_point(aixm_feature_dict, kml_obj)
-                    else:
-                        kml_obj.point(aixm_feature_dict["coordinates"], fol=aixm_feature_dict['name'],
-                                      point_name=aixm_feature_dict['name'])
-                elif geometry_type == 'polyhedron':
-                    self.draw_airspace(aixm_feature_dict, kml_obj)
-                print(aixm_feature_dict)
+                if self.stats is None:
+                    self.draw_feature(aixm_feature_dict, kml_obj)
+                else:
+                    start = time.perf_counter()
+                    self.draw_feature(aixm_feature_dict, kml_obj)
+                    self.stats.record('kml', aixm_feature_dict['type'], time.perf_counter() - start, identifier)
+                if self.debug:
+                    print(aixm_feature_dict)
 
             else:
                 pass
 
+    def draw_feature(self, aixm_feature_dict, kml_obj):
+        kml_writer.draw_feature(aixm_feature_dict, kml_obj)
+
     def draw_vertical_structure_point(self, aixm_feature_dict, kml_obj):
-        kml_obj.point(aixm_feature_dict["coordinates"], uom=aixm_feature_dict['elevation_uom'],
-                      fol=aixm_feature_dict['name'], point_name=aixm_feature_dict['name'],
-                      altitude_mode='relativeToGround', extrude=1)
+        kml_writer.draw_vertical_structure_point(aixm_feature_dict, kml_obj)
 
     def draw_airspace(self, aixm_feature_dict, kml_obj):
-        kml_obj.polyhedron(aixm_feature_dict["coordinates"],
-                           aixm_feature_dict["coordinates"],
-                           upper_layer=float(aixm_feature_dict['upper_layer']),
-                           lower_layer=float(aixm_feature_dict['lower_layer']),
-                           uom=aixm_feature_dict['lower_layer_uom'], fol=aixm_feature_dict['name'],
-                           altitude_mode=util.altitude_mode(aixm_feature_dict))
+        kml_writer.draw_airspace(aixm_feature_dict, kml_obj)
 
     def draw_cylinder(self, aixm_feature_dict, kml_obj):
+        kml_writer.draw_cylinder(aixm_feature_dict, kml_obj)
 
-        coordinates = aixm_feature_dict['coordinates'][0].split(',')[0].strip()
-        radius = aixm_feature_dict['coordinates'][0].split(',')[1].split('=')[-1]
-        radius_uom = util.switch_radius_uom(aixm_feature_dict['coordinates'][0].split(',')[2].split('=')[-1])
-        lower_layer = aixm_feature_dict['lower_layer']
-        upper_layer = aixm_feature_dict['upper_layer']
 
-        kml_obj.cylinder(coordinates, float(radius),
-                         radius_uom=radius_uom, lower_layer=float(lower_layer),
-                         upper_layer=float(upper_layer),
-                         fol=aixm_feature_dict['name'], lower_layer_uom=aixm_feature_dict['lower_layer_uom'],
-                         upper_layer_uom=aixm_feature_dict['upper_layer_uom'],
-                         altitude_mode=util.altitude_mode(aixm_feature_dict))
+if __name__ == '__main__':
+    import sys
 
+    from .cli import main
 
-if __name__ == '__main__':
-    file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
-    output = Path().absolute()
-    AixmGeo(file_loc, output, 'test_kml.kml').build_kml()
+    sys.exit(main())
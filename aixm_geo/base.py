@@ -1,10 +1,14 @@
+import time
 from typing import Union
 
 from lxml import etree
-from pyproj import Geod
 
-import util as util
-from settings import NAMESPACES
+from . import geodesy
+from . import geometry
+from . import records
+from . import references
+from . import util
+from . import xpaths
 
 
 class SinglePointAixm:
@@ -16,11 +20,84 @@ class SinglePointAixm:
     AirportHeliport - Geographic information is a single point (ARP)
     DesignatedPoint - A single geographic point
     """
+    __slots__ = ('_root', '_timeslice', '_scope', '_tag_index', '_numeric', '_stats', '_resolver')
 
-    def __init__(self, root):
-        __slots__ = ['_root', '_timeslice']
+    def __init__(self, root, numeric=False, timeslices=None, stats=None, resolver=None):
         self._root = root
-        self._timeslice = util.parse_timeslice(self._root)
+        if timeslices is None:
+            self._timeslice = util.parse_timeslice(self._root)
+            self._scope = (self._root,)
+        else:
+            # Only the given timeslices, oldest to newest, are searched and newer values take precedence
+            self._timeslice = list(timeslices)
+            self._scope = tuple(reversed(self._timeslice))
+        self._tag_index = None
+        # Numeric features return coordinates as float arrays, Arc and Circle records rather than strings
+        self._numeric = numeric
+        # An optional instrumentation.Stats, which then records the time spent solving arc geodesics
+        self._stats = stats
+        # An optional references.ReferenceResolver, used to describe the features this one refers to
+        self._resolver = resolver
+
+    def get_tag_index(self) -> dict:
+        """
+        Walks the feature once, recording the first element found for each of the fully qualified tags in
+        xpaths.INDEXED_TAGS.  Built on first use.
+        Returns:
+            tag_index (dict): Clark notation tag to the first element in document order with that tag.
+        """
+        if self._tag_index is None:
+            tag_index = {}
+            for scope in self._scope:
+                for element in scope.iter(*xpaths.INDEXED_TAGS):
+                    if element.tag not in tag_index:
+                        tag_index[element.tag] = element
+            self._tag_index = tag_index
+        return self._tag_index
+
+    def find_first(self, xpath: str, subtree: etree.Element = None):
+        """
+        Returns the first element matching the Xpath.  Descendant tag paths searched from the feature root are answered
+        from the tag index, anything else falls back to the precompiled XPath registry.
+
+        Args:
+            xpath (str): Valid Xpath string for the element to find.
+            subtree (etree.Element): The subtree to search.  Defaults to the feature, or to its selected timeslices.
+        Returns:
+            element (Union[etree.Element, None]): The first matching element or None if there is no match.
+        """
+        if subtree is not None:
+            return xpaths.find_first(subtree, xpath)
+
+        steps = xpaths.descendant_steps(xpath)
+        if steps and steps[0] in xpaths.INDEXED_TAGS:
+            element = self.get_tag_index().get(steps[0])
+            if element is None or len(steps) == 1:
+                return element
+            # Search below the first match of the leading step, only rescanning the feature if that misses
+            element = xpaths.find_first(element, '.' + xpath[xpath.index('//', 3):])
+            if element is not None:
+                return element
+
+        for scope in self._scope:
+            element = xpaths.find_first(scope, xpath)
+            if element is not None:
+                return element
+        return None
+
+    def find_all(self, xpath: str) -> list:
+        """
+        Args:
+            xpath (str): Valid Xpath string for the elements to find.
+        Returns:
+            elements (list[etree.Element]): Every matching element in the feature, or in the newest of its selected
+              timeslices which has a match.
+        """
+        for scope in self._scope:
+            elements = xpaths.find_all(scope, xpath)
+            if elements:
+                return elements
+        return []
 
     def get_first_value(self, xpath: str, **kwargs: etree.Element) -> str:
         """Returns the first matching text value found within the subtree which match the Xpath provided.
@@ -32,9 +109,9 @@ class SinglePointAixm:
         Returns:
             value (str): String value of the tag found.
         """
-        subtree = kwargs.pop('subtree', self._root)
+        subtree = kwargs.pop('subtree', None)
         try:
-            value = subtree.find(xpath, namespaces=NAMESPACES).text
+            value = self.find_first(xpath, subtree).text
             if value is None:
                 raise AttributeError
         except AttributeError:
@@ -52,24 +129,94 @@ class SinglePointAixm:
             attribute (Union[str, dict]): The string attribute if attribute_string is defined.
               If not, returns the full dict.
         """
-        subtree = kwargs.pop('subtree', self._root)
+        subtree = kwargs.pop('subtree', None)
         attribute_string = kwargs.pop('attribute_string', None)
 
         if attribute_string:
             try:
-                element = subtree.find(xpath, namespaces=NAMESPACES)
+                element = self.find_first(xpath, subtree)
                 attribute = element.attrib[attribute_string]
             except AttributeError:
                 attribute = "Unknown"
         else:
             try:
-                element = subtree.find(xpath, namespaces=NAMESPACES)
+                element = self.find_first(xpath, subtree)
                 attribute = dict(element.attrib)
             except AttributeError:
                 attribute = "Unknown"
 
         return attribute
 
+    def get_identifier(self) -> str:
+        """
+        Returns:
+            identifier (str): The feature's gml:identifier, usually a UUID.
+        """
+        # The identifier sits outside the timeslices, so always search the whole feature
+        return self.get_first_value('.//gml:identifier', subtree=self._root)
+
+    def get_reference(self, xpath: str) -> Union[str, None]:
+        """
+        Args:
+            xpath (str): Valid Xpath string for the referencing element, e.g. './/aixm:routeFormed'.
+        Returns:
+            identifier (Union[str, None]): The gml:identifier of the referenced feature, or None if there is no
+              reference.
+        """
+        element = self.find_first(xpath)
+        href = None if element is None else references.get_href(element)
+        return None if href is None else references.get_identifier(href)
+
+    def get_reference_label(self, xpath: str) -> Union[str, None]:
+        """
+        Args:
+            xpath (str): Valid Xpath string for the referencing element.
+        Returns:
+            label (Union[str, None]): The referenced feature's designator or name if the resolver holds it, else the
+              reference's xlink:title, else None.
+        """
+        element = self.find_first(xpath)
+        if element is None:
+            return None
+        if self._resolver is not None:
+            href = references.get_href(element)
+            reference = None if href is None else self._resolver.resolve(href)
+            if reference is not None:
+                return reference.label
+        return references.get_title(element)
+
+    def to_record(self) -> records.FeatureRecord:
+        """
+        Extracts the feature's geographic information into a detached FeatureRecord holding no lxml references.
+        Records always hold numeric geometry, whichever mode the feature was built in.
+        Returns:
+            record (records.FeatureRecord): The feature's parsed values.
+        """
+        numeric = self._numeric
+        self._numeric = True
+        try:
+            geo_dict = self.get_geographic_information()
+        finally:
+            self._numeric = numeric
+        return records.from_geo_dict(geo_dict, self.get_identifier(), self.get_first_value('.//aixm:designator'))
+
+    def get_position_array(self, xpath: str, z=None) -> list:
+        """
+        Args:
+            xpath (str): Valid Xpath string for the gml:pos element.
+            z (Union[str, float]): Optional Z value to add to the position.
+        Returns:
+            coordinates (list[np.ndarray]): A list holding the position as a (1, 2) or (1, 3) array, or an empty list
+              if the position is missing.
+        """
+        element = self.find_first(xpath)
+        if element is None or not element.text:
+            return []
+        position = geometry.parse_pos(element.text)
+        if z is not None:
+            position = geometry.append_z(position, z)
+        return [position]
+
     def get_field_elevation(self):
         elevation = self.get_first_value('.//aixm:fieldElevation')
         elevation_uom = self.get_first_value_attribute('.//aixm:fieldElevation', attribute_string='uom')
@@ -99,7 +246,11 @@ class SinglePointAixm:
             crs(str): A string of 'Anticlockwise' or 'Clockwise' depending upon the CRS
             applied and the start and end angles
         """
-        crs = self._timeslice[-1].xpath(".//*[@srsName]", namespaces=NAMESPACES)[0]
+        crs = None
+        for scope in self._timeslice[-1:] + list(self._scope):
+            crs = xpaths.find_first(scope, './/*[@srsName]')
+            if crs is not None:
+                break
 
         split = crs.get("srsName").split(':')[-1]
         if split == '4326':
@@ -122,9 +273,10 @@ class MultiPointAixm(SinglePointAixm):
     Airspace
     RouteSegment
     """
+    __slots__ = ()
 
-    def __init__(self, root):
-        super().__init__(root)
+    def __init__(self, root, numeric=False, timeslices=None, stats=None, resolver=None):
+        super().__init__(root, numeric, timeslices, stats, resolver)
 
     def get_airspace_elevation(self):
         lower_layer = self.get_first_value('.//aixm:theAirspaceVolume//aixm:lowerLimit')
@@ -160,9 +312,6 @@ class MultiPointAixm(SinglePointAixm):
             except TypeError:
                 print('Coordinates can only be extracted from an LXML etree._Element object.')
 
-        for x in unpacked_gml:
-            x.strip("r'\'")
-
         return unpacked_gml
 
     def unpack_gml(self, location: etree.Element) -> list[str]:
@@ -183,26 +332,43 @@ class MultiPointAixm(SinglePointAixm):
         Args:
             self
         Returns:
-            coordinate_string(str): A coordinate string
+            coordinate_string(str): A coordinate string, or coordinate arrays, Arc and Circle records when numeric
         """
+        coordinate_list = []
+        arc_indexes = []
         for child in location.iterdescendants():
             tag = child.tag.split('}')[-1]
             if tag == 'GeodesicString' or tag == 'ElevatedPoint':
-                for x in self.unpack_geodesic_string(child):
-                    yield x
+                coordinate_list.extend(self.unpack_geodesic_string(child))
             elif tag == 'CircleByCenterPoint':
-                yield self.unpack_circle(child)
+                coordinate_list.append(self.unpack_circle(child))
             elif tag == 'ArcByCenterPoint':
-                yield self.unpack_arc(child)
+                # Hold the element's place, every arc in the location is solved together below
+                arc_indexes.append(len(coordinate_list))
+                coordinate_list.append(child)
+
+        if arc_indexes:
+            locations = [coordinate_list[i] for i in arc_indexes]
+            arcs = self.get_arc_records(locations) if self._numeric else self.unpack_arcs(locations)
+            for i, arc in zip(arc_indexes, arcs):
+                coordinate_list[i] = arc
+
+        if self._numeric:
+            coordinate_list = geometry.coalesce(coordinate_list)
+
+        yield from coordinate_list
 
     def unpack_geodesic_string(self, location):
         for child in location.iterdescendants():
             tag = child.tag.split('}')[-1]
             if tag == 'pos':
-                yield child.text
+                yield geometry.parse_pos(child.text) if self._numeric else child.text
             elif tag == 'posList':
-                for x in self.unpack_pos_list(child.text):
-                    yield x
+                if self._numeric:
+                    yield geometry.parse_pos_list(child.text, int(child.get('srsDimension', 2)))
+                else:
+                    for x in self.unpack_pos_list(child.text):
+                        yield x
 
     def unpack_pos_list(self, string_to_manipulate):
         split = string_to_manipulate.split(' ')
@@ -218,33 +384,66 @@ class MultiPointAixm(SinglePointAixm):
         """
         Args:
             location(etree.Element): etree.Element containing specific aixm tags containing geographic information
-            crs(str): CRS to be used for determining arc directions for ArcByCenterPoint.
         Returns:
             coordinate_string(str): A coordinate string
         """
-        centre = self.get_arc_centre_point(location).strip()
-        start_angle = self.get_first_value('.//gml:startAngle', subtree=location)
-        end_angle = self.get_first_value('.//gml:endAngle', subtree=location)
-        # Pyproj uses metres, we will have to convert for distance
-        radius = self.get_first_value('.//gml:radius', subtree=location)
-        radius_uom = self.get_first_value_attribute('.//gml:radius', subtree=location, attribute_string='uom')
+        return self.unpack_arcs([location])[0]
 
-        conversion_dict = {'ft': 0.3048, 'NM': 1852, '[nmi_i]': 1852, 'mi': 1609.4, 'km': 1000}
-
-        if radius_uom != 'm':
-            radius = float(radius) * conversion_dict[radius_uom]
+    def unpack_arcs(self, locations: list) -> list[str]:
+        """
+        Solves the start and end points of several ArcByCenterPoint elements with one batched geodesic calculation.
+        Args:
+            locations(list[etree.Element]): ArcByCenterPoint elements
+        Returns:
+            coordinate_strings(list[str]): A coordinate string for each arc, in the order given
+        """
+        coordinate_strings = []
+        for location, arc in zip(locations, self.get_arc_records(locations)):
+            coordinate_strings.append(
+                f'start={round(arc.start_lat, 5)} {round(arc.start_lon, 5)},'
+                f' end={round(arc.end_lat, 5)} {round(arc.end_lon, 5)},'
+                f' centre={self.get_arc_centre_point(location).strip()}, direction={arc.direction}')
 
-        lat = centre.split(' ')[0]
-        lon = centre.split(' ')[1]
+        return coordinate_strings
 
-        start_coord = Geod(ellps='WGS84').fwd(lon, lat, start_angle, radius)
-        end_coord = Geod(ellps='WGS84').fwd(lon, lat, end_angle, radius)
+    def get_arc_records(self, locations: list) -> list[geometry.Arc]:
+        """
+        Solves the start and end points of several ArcByCenterPoint elements with one batched geodesic calculation.
+        Args:
+            locations(list[etree.Element]): ArcByCenterPoint elements
+        Returns:
+            arcs(list[geometry.Arc]): An Arc record for each arc, in the order given
+        """
+        lats, lons, start_angles, end_angles, radii = [], [], [], [], []
+        for location in locations:
+            centre = self.get_arc_centre_point(location).strip()
+            radius = self.get_first_value('.//gml:radius', subtree=location)
+            radius_uom = self.get_first_value_attribute('.//gml:radius', subtree=location, attribute_string='uom')
+
+            lats.append(float(centre.split(' ')[0]))
+            lons.append(float(centre.split(' ')[1]))
+            start_angles.append(float(self.get_first_value('.//gml:startAngle', subtree=location)))
+            end_angles.append(float(self.get_first_value('.//gml:endAngle', subtree=location)))
+            # Pyproj uses metres, we will have to convert for distance
+            radii.append(util.convert_radius(radius, radius_uom))
+
+        if self._stats is None:
+            start_lats, start_lons, end_lats, end_lons = geodesy.arc_end_points(lats, lons, start_angles, end_angles,
+                                                                                radii)
+        else:
+            start = time.perf_counter()
+            start_lats, start_lons, end_lats, end_lons = geodesy.arc_end_points(lats, lons, start_angles, end_angles,
+                                                                                radii)
+            self._stats.record('geodesic', type(self).__name__, time.perf_counter() - start, self.get_identifier())
 
-        coordinate_string = f'start={round(start_coord[1], 5)} {round(start_coord[0], 5)},' \
-                            f' end={round(end_coord[1], 5)} {round(end_coord[0], 5)}, centre={centre},' \
-                            f' direction={self.determine_arc_direction(float(start_angle), float(end_angle))}'
+        arcs = []
+        for i in range(len(locations)):
+            arcs.append(geometry.Arc(
+                lats[i], lons[i], radii[i], start_angles[i], end_angles[i],
+                self.determine_arc_direction(start_angles[i], end_angles[i]),
+                float(start_lats[i]), float(start_lons[i]), float(end_lats[i]), float(end_lons[i])))
 
-        return coordinate_string
+        return arcs
 
     def get_arc_centre_point(self, location):
         centre = self.get_first_value('.//gml:pos', subtree=location)
@@ -308,12 +507,16 @@ class MultiPointAixm(SinglePointAixm):
             Args:
                 location(etree.Element): etree.Element containing specific aixm tags containing geographic information
             Returns:
-                coordinate_string(str): A coordinate string
+                coordinate_string(Union[str, geometry.Circle]): A coordinate string, or a Circle record when numeric
         """
         centre = self.get_circle_centre_point(location)
         radius = self.get_first_value('.//gml:radius', subtree=location)
         radius_uom = self.get_first_value_attribute('.//gml:radius', subtree=location, attribute_string='uom')
 
+        if self._numeric:
+            lat, lon = centre.split()[:2]
+            return geometry.Circle(float(lat), float(lon), util.convert_radius(radius, radius_uom))
+
         coordinate_string = f'{centre}, radius={radius}, radius_uom={radius_uom}'
 
         return coordinate_string
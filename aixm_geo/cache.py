@@ -0,0 +1,182 @@
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+from . import parallel
+from .settings import VERSION
+
+# Bump whenever the layout of cached results changes without a change of library version
+CACHE_FORMAT = 2
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def default_cache_dir() -> Path:
+    return Path(os.environ.get('XDG_CACHE_HOME', Path.home().joinpath('.cache'))).joinpath('aixm_geo')
+
+
+def file_digest(aixm_file) -> str:
+    """
+    Args:
+        aixm_file: Path to the AIXM file.
+    Returns:
+        digest (str): SHA-256 of the file's contents, read in chunks so large files aren't held in memory.
+    """
+    digest = hashlib.sha256()
+    with open(aixm_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """
+    Stores the results extracted from an AIXM file on disk, keyed by a hash of the file's contents, so a file which has
+    already been processed is loaded without being parsed at all.
+
+    Entries are pickled with protocol 5.  Keys include the library version and the extraction options, so a new
+    version or different options never read a stale entry.  Once the cache grows past max_bytes the least recently
+    used entries are evicted.
+    """
+    __slots__ = ['cache_dir', 'max_bytes']
+
+    def __init__(self, cache_dir=None, max_bytes=1 << 30):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get_geographic_information(self, aixm_file, numeric=False, feature_types=None, bbox=None, workers=None):
+        """
+        Args:
+            aixm_file: Path to the AIXM file.
+            numeric (bool): Whether to extract numeric coordinates rather than coordinate strings.
+            feature_types (Iterable[str]): Only extract these feature types.
+            bbox (tuple): Only extract features meeting this (min_lat, min_lon, max_lat, max_lon) box.
+            workers (int): Extract across this many processes on a miss.  Does not affect the key.
+        Returns:
+            geo_dicts (list[dict]): The geographic information of every supported feature in document order.
+        """
+        def extract():
+            return parallel.get_geographic_information(aixm_file, numeric, feature_types, bbox, workers)
+
+        options = {'numeric': numeric, 'feature_types': feature_types, 'bbox': bbox}
+        return self.load_or_extract(aixm_file, 'geo_dicts', options, extract)
+
+    def get_feature_records(self, aixm_file, feature_types=None, bbox=None, workers=None):
+        """
+        Args:
+            aixm_file: Path to the AIXM file.
+            feature_types (Iterable[str]): Only extract these feature types.
+            bbox (tuple): Only extract features meeting this (min_lat, min_lon, max_lat, max_lon) box.
+            workers (int): Extract across this many processes on a miss.  Does not affect the key.
+        Returns:
+            records (list[records.FeatureRecord]): A record for every supported feature in document order.
+        """
+        def extract():
+            return parallel.get_feature_records(aixm_file, feature_types, bbox, workers)
+
+        options = {'feature_types': feature_types, 'bbox': bbox}
+        return self.load_or_extract(aixm_file, 'records', options, extract)
+
+    def load_or_extract(self, aixm_file, kind: str, options: dict, extract):
+        """
+        Args:
+            aixm_file: Path to the AIXM file.
+            kind (str): Name of the kind of result, e.g. 'records'.
+            options (dict): Extraction options which change the result.
+            extract (Callable): Produces the result on a miss.
+        Returns:
+            results: The cached result, or the newly extracted and stored one.
+        """
+        key = self.get_key(file_digest(aixm_file), kind, options)
+        results = self.load(key)
+        if results is None:
+            results = extract()
+            self.store(key, results)
+        return results
+
+    def get_key(self, digest: str, kind: str, options: dict) -> str:
+        """
+        Args:
+            digest (str): Hash of the AIXM file's contents.
+            kind (str): Name of the kind of result.
+            options (dict): Extraction options which change the result.
+        Returns:
+            key (str): File name safe key for the entry.
+        """
+        # Normalise options so equivalent calls share an entry, e.g. a list or set of the same feature types
+        normalised = []
+        for name, value in sorted(options.items()):
+            if name == 'feature_types' and value:
+                value = tuple(sorted(value))
+            elif name == 'bbox' and value:
+                value = tuple(float(v) for v in value)
+            normalised.append((name, value or None))
+        identity = repr((VERSION, CACHE_FORMAT, digest, kind, normalised))
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    def get_path(self, key: str) -> Path:
+        return self.cache_dir.joinpath(f'{key}.pickle')
+
+    def load(self, key: str):
+        """
+        Args:
+            key (str): The entry's key.
+        Returns:
+            results: The cached results, or None on a miss.  Unreadable entries are removed and count as a miss.
+        """
+        path = self.get_path(key)
+        try:
+            with open(path, 'rb') as f:
+                results = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+            path.unlink(missing_ok=True)
+            return None
+        # Mark as recently used for eviction
+        os.utime(path)
+        return results
+
+    def store(self, key: str, results):
+        """
+        Writes the entry to a temporary file before moving it into place, so readers never see a partial entry, then
+        evicts old entries if the cache is over its size limit.
+        Args:
+            key (str): The entry's key.
+            results: The results to cache.
+        """
+        path = self.get_path(key)
+        temporary_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(temporary_path, 'wb') as f:
+            pickle.dump(results, f, protocol=5)
+        os.replace(temporary_path, path)
+        self.evict(keep=path)
+
+    def evict(self, keep=None):
+        """
+        Removes the least recently used entries until the cache fits within max_bytes.
+        Args:
+            keep (Path): An entry which is never evicted, e.g. the one just stored.
+        """
+        entries = []
+        for path in self.cache_dir.glob('*.pickle'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda x: x[0]):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        for path in self.cache_dir.glob('*.pickle'):
+            path.unlink(missing_ok=True)
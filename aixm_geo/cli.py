@@ -0,0 +1,160 @@
+"""
+Command line entry point.  Converts any number of AIXM files, given as paths or glob patterns, across a pool of worker
+processes and reports progress and throughput.
+
+    aixm-geo "datasets/**/*.xml" --format kmz --output out --workers 16
+"""
+import argparse
+import asyncio
+import glob
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from . import aio
+from .settings import VERSION
+
+
+def expand_inputs(patterns) -> list:
+    """
+    Args:
+        patterns (Iterable[str]): File paths or glob patterns, ** matching any number of directories.
+    Returns:
+        aixm_files (list[Path]): The matching files, each once, in the order given.
+    Raises:
+        FileNotFoundError: If a pattern matches no files.
+    """
+    aixm_files = {}
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        matches = [Path(match) for match in matches if Path(match).is_file()]
+        if not matches:
+            raise FileNotFoundError(f'No AIXM files match {pattern}')
+        for match in matches:
+            aixm_files.setdefault(match.resolve(), match)
+    return list(aixm_files.values())
+
+
+def convert_file(aixm_file, output_path, output_format: str) -> tuple:
+    """
+    Converts one file.  Runs inside the worker processes.
+    Args:
+        aixm_file: Path to the AIXM file.
+        output_path: Directory to write to.
+        output_format (str): One of aio.OUTPUT_SUFFIXES.
+    Returns:
+        result (tuple): Number of features written and the seconds taken.
+    """
+    start = time.perf_counter()
+    count = asyncio.run(aio.convert(aixm_file, output_path, output_format))
+    return count, time.perf_counter() - start
+
+
+def convert_files(aixm_files: list, output_path, output_format='kml', workers=None, progress=None) -> dict:
+    """
+    Converts every file, workers at a time.  A file which fails is reported and the rest carry on.
+    Args:
+        aixm_files (list): Paths to the AIXM files.
+        output_path: Directory to write to.  Each output is named after its AIXM file.
+        output_format (str): One of aio.OUTPUT_SUFFIXES.
+        workers (int): Number of worker processes, the CPU count if None.  1 converts in this process.
+        progress (Callable): Called with (done, total, aixm_file, count, seconds, error) as each file finishes.
+    Returns:
+        summary (dict): Files converted, failures, features written, input bytes and elapsed seconds.
+    """
+    workers = min(workers or os.cpu_count(), len(aixm_files)) or 1
+    summary = {'files': 0, 'failed': [], 'features': 0, 'bytes': 0, 'seconds': 0.0}
+    start = time.perf_counter()
+
+    def finish(aixm_file, get_result):
+        try:
+            count, seconds = get_result()
+        except Exception as error:
+            count, seconds = 0, 0.0
+            summary['failed'].append((str(aixm_file), error))
+        else:
+            summary['files'] += 1
+            summary['features'] += count
+            summary['bytes'] += os.path.getsize(aixm_file)
+            error = None
+        if progress is not None:
+            progress(summary['files'] + len(summary['failed']), len(aixm_files), aixm_file, count, seconds, error)
+
+    if workers == 1:
+        for aixm_file in aixm_files:
+            finish(aixm_file, lambda: convert_file(aixm_file, output_path, output_format))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(convert_file, aixm_file, output_path, output_format): aixm_file
+                       for aixm_file in aixm_files}
+            for future in as_completed(futures):
+                finish(futures[future], future.result)
+
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def print_progress(done, total, aixm_file, count, seconds, error):
+    if error is None:
+        print(f'[{done}/{total}] {aixm_file}: {count} features in {seconds:.2f}s', file=sys.stderr)
+    else:
+        print(f'[{done}/{total}] {aixm_file}: failed - {error}', file=sys.stderr)
+
+
+def format_summary(summary: dict) -> str:
+    seconds = summary['seconds'] or float('nan')
+    megabytes = summary['bytes'] / 1e6
+    return (f'Converted {summary["files"]} files ({len(summary["failed"])} failed), {summary["features"]} features, '
+            f'{megabytes:.1f} MB in {summary["seconds"]:.2f}s - {summary["features"] / seconds:.1f} features/s, '
+            f'{megabytes / seconds:.2f} MB/s')
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='aixm-geo', description='Convert AIXM 5.1 files to KML, KMZ or GeoJSON.')
+    parser.add_argument('inputs', nargs='+', help='AIXM files or glob patterns, quote patterns using **')
+    parser.add_argument('-o', '--output', default='.', help='directory to write to, default the current directory')
+    parser.add_argument('-f', '--format', default='kml', choices=list(aio.OUTPUT_SUFFIXES),
+                        help='output format, geojson is newline-delimited')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='number of files converted at once, default the CPU count')
+    parser.add_argument('-q', '--quiet', action='store_true', help='only print the summary')
+    parser.add_argument('--version', action='version', version=f'%(prog)s {VERSION}')
+    return parser
+
+
+def main(argv=None) -> int:
+    """
+    Args:
+        argv (list[str]): Arguments, sys.argv[1:] if None.
+    Returns:
+        status (int): 0 if every file was converted, 1 if any failed.
+    """
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers must be at least 1')
+    try:
+        aixm_files = expand_inputs(args.inputs)
+    except FileNotFoundError as error:
+        parser.error(str(error))
+
+    # Outputs are named after their input, two inputs of the same name would overwrite each other
+    duplicates = sorted(stem for stem, count in Counter(f.stem for f in aixm_files).items() if count > 1)
+    if duplicates:
+        parser.error(f'Inputs would write to the same output: {", ".join(duplicates)}')
+
+    Path(args.output).mkdir(parents=True, exist_ok=True)
+    summary = convert_files(aixm_files, args.output, args.format, args.workers,
+                            progress=None if args.quiet else print_progress)
+    if args.quiet:
+        for aixm_file, error in summary['failed']:
+            print(f'{aixm_file}: failed - {error}', file=sys.stderr)
+    print(format_summary(summary))
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import numpy as np
+
+from . import geodesy
+from . import geometry
+from .parallel import get_feature_records
+
+# Largest number of point and edge pairs tested at once by points_in_ring, bounding its temporary arrays
+_CHUNK_PAIRS = 1 << 20
+
+
+def points_in_ring(lats: np.ndarray, lons: np.ndarray, ring: np.ndarray) -> np.ndarray:
+    """
+    Even-odd crossing test of many points against one ring, treating latitude and longitude as planar.  Rings are
+    densified finely enough that each edge stays close to the geodesic it replaces.
+
+    Args:
+        lats (np.ndarray): Latitude of each point.
+        lons (np.ndarray): Longitude of each point.
+        ring (np.ndarray): (lat, lon) array of a closed ring.
+    Returns:
+        inside (np.ndarray): Boolean array, True for each point inside the ring.
+    """
+    start_lats, start_lons = ring[:-1, 0], ring[:-1, 1]
+    end_lats, end_lons = ring[1:, 0], ring[1:, 1]
+    # Horizontal edges never cross a ray of constant latitude, dropping them also avoids dividing by zero
+    keep = start_lats != end_lats
+    start_lats, start_lons, end_lats, end_lons = start_lats[keep], start_lons[keep], end_lats[keep], end_lons[keep]
+    slopes = (end_lons - start_lons) / (end_lats - start_lats)
+
+    inside = np.zeros(len(lats), dtype=bool)
+    chunk = max(_CHUNK_PAIRS // max(len(slopes), 1), 1)
+    for start in range(0, len(lats), chunk):
+        point_lats = lats[start:start + chunk, None]
+        point_lons = lons[start:start + chunk, None]
+        crosses = (start_lats > point_lats) != (end_lats > point_lats)
+        crosses &= point_lons < start_lons + (point_lats - start_lats) * slopes
+        inside[start:start + chunk] = np.count_nonzero(crosses, axis=1) % 2 == 1
+    return inside
+
+
+class AirspaceContainment:
+    """
+    Finds which airspace volumes contain each of many points, e.g. ADS-B track points.
+
+    Each airspace is prepared once: its boundary densified into a ring, its envelope and its vertical limits in
+    metres.  A query sorts the points by latitude once, so each airspace only tests the points within its envelope.
+    Altitudes are compared directly with the limits, whatever their reference (see upper_limit_reference), and limits
+    which cannot be converted to metres, e.g. FLOOR, are treated as unbounded.
+    """
+    __slots__ = ['records', 'identifiers', 'envelopes', 'lower_limits', 'upper_limits', '_rings']
+
+    def __init__(self, feature_records, tolerance=geodesy.DEFAULT_TOLERANCE):
+        """
+        Args:
+            feature_records (Iterable[records.FeatureRecord]): Records of any type, only airspaces with geometry are
+              prepared.
+            tolerance (float): Largest chord error of densified arcs and circles in metres.
+        """
+        self.records = [record for record in feature_records
+                        if record.feature_type == 'Airspace' and geometry.envelope(record.geometry) is not None]
+        self._rings = [geodesy.to_ring(ring) for ring in
+                       geodesy.densify_all([record.geometry for record in self.records], tolerance)]
+        self.identifiers = np.array([record.identifier for record in self.records], dtype=str)
+        self.envelopes = np.array([(ring[:, 0].min(), ring[:, 1].min(), ring[:, 0].max(), ring[:, 1].max())
+                                   for ring in self._rings], dtype=np.float64).reshape(-1, 4)
+        self.lower_limits = np.array([-np.inf if record.lower_limit is None else record.lower_limit
+                                      for record in self.records], dtype=np.float64)
+        self.upper_limits = np.array([np.inf if record.upper_limit is None else record.upper_limit
+                                      for record in self.records], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    def from_file(cls, aixm_file, workers=None, tolerance=geodesy.DEFAULT_TOLERANCE):
+        """
+        Args:
+            aixm_file: Path to the AIXM file.
+            workers (int): Extract the airspaces across this many processes.
+            tolerance (float): Largest chord error of densified arcs and circles in metres.
+        Returns:
+            containment (AirspaceContainment): The file's airspaces, prepared for queries.
+        """
+        return cls(get_feature_records(aixm_file, {'Airspace'}, workers=workers), tolerance)
+
+    def get_ring(self, index: int) -> np.ndarray:
+        """
+        Args:
+            index (int): The airspace.
+        Returns:
+            ring (np.ndarray): (lat, lon) array of the airspace's closed, densified boundary.
+        """
+        return self._rings[index]
+
+    def query(self, lats, lons, altitudes=None) -> tuple:
+        """
+        Args:
+            lats (array_like): Latitude of each point.
+            lons (array_like): Longitude of each point.
+            altitudes (array_like): Altitude of each point in metres.  If None, or NaN for a point, only the
+              horizontal boundary is tested.
+        Returns:
+            point_indices, airspace_indices (tuple[np.ndarray]): Every containing (point, airspace) pair, sorted by
+              point and then airspace.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        altitudes = None if altitudes is None else np.asarray(altitudes, dtype=np.float64)
+
+        order = np.argsort(lats, kind='stable')
+        sorted_lats = lats[order]
+        point_indices, airspace_indices = [], []
+        for i, (min_lat, min_lon, max_lat, max_lon) in enumerate(self.envelopes):
+            candidates = order[np.searchsorted(sorted_lats, min_lat, 'left'):
+                               np.searchsorted(sorted_lats, max_lat, 'right')]
+            candidate_lons = lons[candidates]
+            keep = (min_lon <= candidate_lons) & (candidate_lons <= max_lon)
+            if altitudes is not None:
+                candidate_altitudes = altitudes[candidates]
+                keep &= np.isnan(candidate_altitudes) | ((self.lower_limits[i] <= candidate_altitudes)
+                                                         & (candidate_altitudes <= self.upper_limits[i]))
+            candidates = candidates[keep]
+            if not len(candidates):
+                continue
+            inside = candidates[points_in_ring(lats[candidates], lons[candidates], self._rings[i])]
+            point_indices.append(inside)
+            airspace_indices.append(np.full(len(inside), i, dtype=np.int64))
+
+        if not point_indices:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        point_indices = np.concatenate(point_indices).astype(np.int64)
+        airspace_indices = np.concatenate(airspace_indices)
+        pair_order = np.lexsort((airspace_indices, point_indices))
+        return point_indices[pair_order], airspace_indices[pair_order]
+
+    def locate(self, lats, lons, altitudes=None) -> np.ndarray:
+        """
+        Args:
+            lats (array_like): Latitude of each point.
+            lons (array_like): Longitude of each point.
+            altitudes (array_like): Altitude of each point in metres, see query.
+        Returns:
+            airspace_indices (np.ndarray): For each point, the lowest index of an airspace containing it, or -1.  Use
+              identifiers[airspace_indices] for their gml:identifiers.
+        """
+        point_indices, airspace_indices = self.query(lats, lons, altitudes)
+        located = np.full(len(np.asarray(lats)), -1, dtype=np.int64)
+        # Pairs are sorted by airspace within each point, so the first pair of each point holds its lowest index
+        first = np.flatnonzero(np.r_[True, point_indices[1:] != point_indices[:-1]]) if len(point_indices) else []
+        located[point_indices[first]] = airspace_indices[first]
+        return located
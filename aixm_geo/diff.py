@@ -0,0 +1,149 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import NamedTuple
+
+from lxml import etree
+
+from . import util
+from . import xpaths
+from .factory import AixmFeatureFactory
+from .settings import VERSION
+
+# Bump whenever fingerprints are computed differently without a change of library version
+MANIFEST_FORMAT = 2
+
+
+class ManifestDiff(NamedTuple):
+    """The gml:identifiers of features added, removed and changed since the previous manifest."""
+    added: tuple
+    removed: tuple
+    changed: tuple
+
+
+def fingerprint(member, digest=None):
+    """
+    Args:
+        member: A message:hasMember element.
+        digest: Optional hashlib hash to add the member to, so the members of a feature split across several are
+          folded into one fingerprint.
+    Returns:
+        digest: The hash, updated with the canonical XML of the whole feature.  Every timeslice is included, as
+          extraction reads them all, and formatting differences such as attribute order do not change it.
+    """
+    digest = digest or hashlib.blake2b(digest_size=16)
+    digest.update(etree.tostring(member, method='c14n'))
+    return digest
+
+
+def load_manifest(manifest_path) -> dict:
+    """
+    Args:
+        manifest_path: Path to a manifest written by save_manifest.
+    Returns:
+        manifest (dict): gml:identifier to [feature type, fingerprint].  Empty if there is no manifest or it was
+          written by another library version or manifest format, so every feature is then treated as added.
+    """
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        return {}
+    with open(manifest_path, 'r') as f:
+        contents = json.load(f)
+    if contents.get('version') != VERSION or contents.get('format') != MANIFEST_FORMAT:
+        return {}
+    return contents['features']
+
+
+def save_manifest(manifest: dict, manifest_path):
+    """
+    Args:
+        manifest (dict): gml:identifier to [feature type, fingerprint].
+        manifest_path: Path to write the manifest to.
+    """
+    with open(manifest_path, 'w') as f:
+        json.dump({'version': VERSION, 'format': MANIFEST_FORMAT, 'features': manifest}, f)
+
+
+class IncrementalExtractor:
+    """
+    Compares each supported feature in an AIXM file against the manifest of a previous run and only extracts the
+    geographic information of features which were added or have changed.
+
+    The file is streamed twice.  The first pass fingerprints every feature by gml:identifier and a hash of all of its
+    members and timeslices, the second only extracts the members of features which were added or have changed, so
+    unchanged features cost a hash rather than a full extraction.  manifest and diff are complete once the first pass
+    has run, i.e. once get_geographic_information() has been started.
+    """
+    __slots__ = ['_factory', '_previous', '_manifest', '_added', '_changed']
+
+    def __init__(self, aixm_file, previous_manifest=None, numeric=False, feature_types=None, bbox=None):
+        self._factory = AixmFeatureFactory(aixm_file, stream=True, numeric=numeric, feature_types=feature_types,
+                                           bbox=bbox)
+        self._previous = previous_manifest or {}
+        self._manifest = {}
+        self._added = []
+        self._changed = []
+
+    def __iter__(self):
+        return self.get_geographic_information()
+
+    @property
+    def errors(self):
+        return self._factory.errors
+
+    @property
+    def manifest(self):
+        return self._manifest
+
+    @property
+    def diff(self):
+        removed = tuple(identifier for identifier in self._previous if identifier not in self._manifest)
+        return ManifestDiff(tuple(self._added), removed, tuple(self._changed))
+
+    def stream_features(self):
+        """
+        Returns:
+            features (generator): A generator of (gml:identifier, feature type, member) for every supported member
+              which passes the factory's filters, in document order.
+        """
+        for member in self._factory.stream_members():
+            feature_type = util.get_feature_type(member)
+            if not self._factory.accepts(member) or not self._factory.supports(feature_type):
+                continue
+            identifier = xpaths.find_first(member, './/gml:identifier')
+            if identifier is None:
+                continue
+            yield identifier.text.strip(), feature_type, member
+
+    def compare(self):
+        """
+        Fingerprints every feature, folding together the members which share a gml:identifier, and compares them
+        against the previous manifest.
+        Returns:
+            diff (ManifestDiff): The features added, removed and changed.
+        """
+        feature_types, digests = {}, {}
+        for identifier, feature_type, member in self.stream_features():
+            feature_types.setdefault(identifier, feature_type)
+            digests[identifier] = fingerprint(member, digests.get(identifier))
+
+        self._manifest = {identifier: [feature_types[identifier], digest.hexdigest()]
+                          for identifier, digest in digests.items()}
+        self._added = [identifier for identifier in self._manifest if identifier not in self._previous]
+        self._changed = [identifier for identifier, entry in self._manifest.items()
+                         if identifier in self._previous and self._previous[identifier] != entry]
+        return self.diff
+
+    def get_geographic_information(self):
+        """
+        Returns:
+            geo_dicts (generator): A generator of geographic information dicts for every member of the added and
+              changed features, in document order.
+        """
+        self.compare()
+        redraw = set(self._added).union(self._changed)
+        if not redraw:
+            return
+        for identifier, _, member in self.stream_features():
+            if identifier in redraw:
+                yield self._factory.produce(member).get_geographic_information()
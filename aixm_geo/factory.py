@@ -1,23 +1,70 @@
+import time
+
+import numpy as np
 from lxml import etree
 
-import aixm_features as af
-import util as util
-from settings import NAMESPACES
+from . import aixm_features as af
+from . import geometry
+from . import instrumentation
+from . import util
+from .settings import NAMESPACES
+
+_POSITION_TAGS = (f'{{{NAMESPACES["gml"]}}}pos', f'{{{NAMESPACES["gml"]}}}posList')
+_RADIUS_TAG = f'{{{NAMESPACES["gml"]}}}radius'
+
+FEATURE_CLASSES = {
+    'AirportHeliport': af.AirportHeliport,
+    'DesignatedPoint': af.DesignatedPoint,
+    'NavaidComponent': af.NavaidComponent,
+    'RouteSegment': af.RouteSegment,
+    'Airspace': af.Airspace,
+    'VerticalStructure': af.VerticalStructure,
+}
+
+
+def parse_position(element) -> np.ndarray:
+    """
+    Args:
+        element: A gml:pos or gml:posList element.
+    Returns:
+        coordinates (np.ndarray): A float64 array of shape (N, 2) or (N, 3).  Without an srsDimension attribute a
+          gml:pos holds one coordinate of however many values it has, and a gml:posList holds 3D coordinates only if
+          its values cannot be read as pairs.
+    Raises:
+        ValueError: If the values are not numbers or do not divide into coordinates.
+    """
+    dimension = element.get('srsDimension')
+    if dimension is None:
+        count = len(element.text.split())
+        if element.tag == _POSITION_TAGS[0]:
+            dimension = count
+        else:
+            dimension = 3 if count % 2 and not count % 3 else 2
+    if int(dimension) < 2:
+        raise ValueError(f'{element.text!r} is not a position')
+    return geometry.parse_pos_list(element.text, int(dimension))
 
 
 class AixmFeatureFactory:
-    __slots__ = ["_root", '_feature_classes', '_errors']
+    __slots__ = ["_root", '_feature_classes', '_errors', '_stream', '_numeric', '_feature_types', '_bbox', '_stats',
+                 '_resolver', '_fill_resolver']
 
-    def __init__(self, root):
+    def __init__(self, root, stream=False, numeric=False, feature_types=None, bbox=None, stats=None, resolver=None,
+                 fill_resolver=False):
+        self._stream = stream
+        self._numeric = numeric
+        # An optional instrumentation.Stats.  Without one no timing code runs
+        self._stats = stats
+        # An optional references.ReferenceResolver given to every feature.  With fill_resolver every member is added
+        # to it as it is read, so an empty resolver is filled incrementally.  A prebuilt resolver is only read
+        self._resolver = resolver
+        self._fill_resolver = fill_resolver and resolver is not None
+        # Only produce these feature types, e.g. {'Airspace'}.  None produces every supported type.
+        self._feature_types = frozenset(feature_types) if feature_types else None
+        # Only produce features whose envelope meets this (min_lat, min_lon, max_lat, max_lon) box
+        self._bbox = tuple(bbox) if bbox else None
         self.root = root
-        self._feature_classes = {
-            'AirportHeliport': af.AirportHeliport,
-            'DesignatedPoint': af.DesignatedPoint,
-            'NavaidComponent': af.NavaidComponent,
-            'RouteSegment': af.RouteSegment,
-            'Airspace': af.Airspace,
-            'VerticalStructure': af.VerticalStructure,
-        }
+        self._feature_classes = FEATURE_CLASSES
         self._errors = []
 
     def __iter__(self):
@@ -29,7 +76,23 @@ class AixmFeatureFactory:
 
     @root.setter
     def root(self, root):
-        self._root = etree.parse(root)
+        # When streaming, the file is only opened once iteration begins
+        if self._stream:
+            self._root = root
+        elif self._stats is None:
+            self._root = etree.parse(root)
+        else:
+            start = time.perf_counter()
+            self._root = etree.parse(root)
+            self._stats.record('parse', instrumentation.ALL_FEATURES, time.perf_counter() - start)
+
+    @property
+    def stats(self):
+        return self._stats
+
+    @property
+    def resolver(self):
+        return self._resolver
 
     @property
     def errors(self):
@@ -45,14 +108,140 @@ class AixmFeatureFactory:
         Returns:
 
         """
-        aixm_features = self._root.iterfind('.//message:hasMember', NAMESPACES)
+        if self._stream:
+            aixm_features = self.stream_members()
+        else:
+            aixm_features = self._root.iterfind('.//message:hasMember', NAMESPACES)
+        if self._stats is not None:
+            yield from self.get_instrumented_feature_details(aixm_features)
+            return
         for feature in aixm_features:
+            if self._fill_resolver:
+                self._resolver.add_member(feature)
+            if not self.accepts(feature):
+                continue
             aixm_feature = self.produce(feature)
             if aixm_feature:
                 yield aixm_feature
             else:
                 pass
 
+    def get_instrumented_feature_details(self, members):
+        """
+        get_feature_details() recording the time spent parsing each streamed member and building each feature.
+        Args:
+            members (Iterator): message:hasMember elements.
+        Returns:
+            aixm_features (generator): A generator of AIXMFeature objects.
+        """
+        members = iter(members)
+        while True:
+            start = time.perf_counter()
+            member = next(members, None)
+            parse_seconds = time.perf_counter() - start
+            if member is None:
+                break
+            if self._fill_resolver:
+                self._resolver.add_member(member)
+            if not self.accepts(member):
+                continue
+
+            start = time.perf_counter()
+            aixm_feature = self.produce(member)
+            timeslice_seconds = time.perf_counter() - start
+            if aixm_feature:
+                feature_type = util.get_feature_type(member)
+                identifier = aixm_feature.get_identifier()
+                if self._stream:
+                    self._stats.record('parse', feature_type, parse_seconds, identifier)
+                self._stats.record('timeslice', feature_type, timeslice_seconds, identifier)
+                yield aixm_feature
+
+    def get_feature_records(self):
+        """
+        Iterates through the AIXM file and returns a generator of detached FeatureRecord objects.  Records hold no lxml
+        references, so when streaming each member is released as soon as its record has been built.
+        Returns:
+            records (generator): A generator of records.FeatureRecord objects.
+        """
+        if self._stats is None:
+            for aixm_feature in self.get_feature_details():
+                yield aixm_feature.to_record()
+            return
+
+        for aixm_feature in self.get_feature_details():
+            start = time.perf_counter()
+            feature_record = aixm_feature.to_record()
+            self._stats.record('extract', feature_record.feature_type, time.perf_counter() - start,
+                               feature_record.identifier)
+            yield feature_record
+
+    def stream_members(self):
+        """
+        Incrementally parses the AIXM file with etree.iterparse and yields each message:hasMember element as soon as
+        it has been closed.  Once the consumer moves on, the member and any earlier siblings are cleared from the
+        partially built tree so peak memory is bound by the largest feature rather than the size of the file.
+
+        Features produced from a streamed member must therefore be used before the generator is advanced.
+        Returns:
+            members (generator): A generator of message:hasMember elements.
+        """
+        context = etree.iterparse(self._root, events=('end',), tag=f'{{{NAMESPACES["message"]}}}hasMember')
+        for _, member in context:
+            yield member
+            member.clear(keep_tail=True)
+            while member.getprevious() is not None:
+                del member.getparent()[0]
+        del context
+
+    def accepts(self, subroot):
+        """
+        Applies the feature type and bounding box filters to a message:hasMember element before any feature is built.
+        The type comes from the feature element's tag and the box test only parses the raw gml:pos, gml:posList and
+        gml:radius values, so rejected members cost little more than parsing them.
+        Args:
+            subroot: A message:hasMember element.
+
+        Returns:
+            accepted(bool): True if the member passes every filter.
+        """
+        feature_type = util.get_feature_type(subroot)
+        if self._feature_types is not None and feature_type not in self._feature_types:
+            return False
+        # Unsupported types are left for produce() to report rather than spending time on their coordinates
+        if self._bbox is not None and feature_type in self._feature_classes:
+            return self.member_envelope_intersects(subroot)
+        return True
+
+    def member_envelope_intersects(self, subroot):
+        """
+        Args:
+            subroot: A message:hasMember element.
+
+        Returns:
+            intersects(bool): True if the envelope of the positions in the member's latest timeslice which has any,
+              grown by its largest radius, meets the bounding box.  Members without positions never match, members
+              whose positions cannot be read always do and are left for the feature to report.
+        """
+        # Timeslices are taken newest last in document order, sorting them by version would parse every date
+        for scope in reversed(subroot.findall('.//aixm:timeSlice', NAMESPACES) or [subroot]):
+            positions = [element for element in scope.iter(*_POSITION_TAGS) if element.text]
+            if positions:
+                break
+        else:
+            return False
+
+        try:
+            coordinates = np.vstack([parse_position(element) for element in positions])
+            radii = [util.convert_radius(element.text, element.get('uom', 'm')) for element in scope.iter(_RADIUS_TAG)]
+        except ValueError:
+            return True
+        envelope = (coordinates[:, 0].min(), coordinates[:, 1].min(), coordinates[:, 0].max(), coordinates[:, 1].max())
+        if radii:
+            envelope = geometry.expand_envelope(envelope, max(radii))
+
+        return geometry.intersects(envelope, self._bbox)
+
     def produce(self, subroot):
         """
         Produces an individual AIXMFeature object from the subroot
@@ -63,10 +252,23 @@ class AixmFeatureFactory:
 
         """
         feature_type = util.get_feature_type(subroot)
-        try:
-            aixm_feature = self._feature_classes[feature_type](subroot)
-        except KeyError:
-            self.errors = f'aixm:{feature_type} is not a currently supported AIXMFeature type'
+        if self.supports(feature_type):
+            aixm_feature = self._feature_classes[feature_type](subroot, numeric=self._numeric, stats=self._stats,
+                                                                  resolver=self._resolver)
+        else:
             aixm_feature = None
-        finally:
-            return aixm_feature
+        return aixm_feature
+
+    def supports(self, feature_type):
+        """
+        Checks whether an AIXMFeature object can be produced for the feature type, recording an error if not.
+        Args:
+            feature_type(str): The AIXM feature type, as returned by util.get_feature_type.
+
+        Returns:
+            supported(bool): True if the feature type is supported.
+        """
+        supported = feature_type in self._feature_classes
+        if not supported:
+            self.errors = f'aixm:{feature_type} is not a currently supported AIXMFeature type'
+        return supported
@@ -0,0 +1,260 @@
+import numpy as np
+from pyproj import Geod
+
+from . import geometry
+
+# A single WGS84 ellipsoid shared by every geodesic calculation, constructing one is not free
+GEOD = Geod(ellps='WGS84')
+
+# Longest geodesic on WGS84, in metres.  No two points are further apart than this
+HALF_CIRCUMFERENCE = 20003931.46
+
+# Mean radius of the WGS84 ellipsoid in metres, for spherical approximations
+MEAN_RADIUS = 6371008.8
+
+# Largest distance, in metres, between a densified arc or circle and the chords which replace it
+DEFAULT_TOLERANCE = 25.0
+
+# Largest angle between consecutive points of a densified arc or circle in degrees, however coarse the tolerance
+MAX_STEP = 45.0
+
+
+def arc_end_points(lats, lons, start_angles, end_angles, radii) -> tuple:
+    """
+    Solves the start and end points of a batch of arcs with a single call to Geod.fwd.
+
+    Args:
+        lats(array_like): Latitude of each arc centre.
+        lons(array_like): Longitude of each arc centre.
+        start_angles(array_like): Start azimuth of each arc in degrees.
+        end_angles(array_like): End azimuth of each arc in degrees.
+        radii(array_like): Radius of each arc in metres.
+    Returns:
+        start_lats, start_lons, end_lats, end_lons (tuple[np.ndarray]): The solved end points of each arc.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    radii = np.asarray(radii, dtype=float)
+    azimuths = np.concatenate((np.asarray(start_angles, dtype=float), np.asarray(end_angles, dtype=float)))
+
+    end_lons, end_lats, _ = GEOD.fwd(np.tile(lons, 2), np.tile(lats, 2), azimuths, np.tile(radii, 2))
+
+    count = len(lats)
+    return end_lats[:count], end_lons[:count], end_lats[count:], end_lons[count:]
+
+
+def to_unit_vectors(lats, lons) -> np.ndarray:
+    """
+    Args:
+        lats(array_like): Latitude of each point.
+        lons(array_like): Longitude of each point.
+    Returns:
+        vectors(np.ndarray): Array of shape (N, 3) of unit vectors from the centre of a spherical earth.
+    """
+    lats = np.radians(np.asarray(lats, dtype=float))
+    lons = np.radians(np.asarray(lons, dtype=float))
+    cos_lats = np.cos(lats)
+    return np.column_stack((cos_lats * np.cos(lons), cos_lats * np.sin(lons), np.sin(lats)))
+
+
+def distances(lat: float, lon: float, lats, lons) -> np.ndarray:
+    """
+    Measures the geodesic distance from one point to a batch of points with a single call to Geod.inv.
+
+    Args:
+        lat(float): Latitude of the origin.
+        lon(float): Longitude of the origin.
+        lats(array_like): Latitude of each destination.
+        lons(array_like): Longitude of each destination.
+    Returns:
+        distances(np.ndarray): Distance to each destination in metres.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    _, _, distance = GEOD.inv(np.full(len(lats), lon), np.full(len(lats), lat), lons, lats)
+    return np.asarray(distance, dtype=float)
+
+
+def polyline_lengths(polylines) -> np.ndarray:
+    """
+    Measures the geodesic length of many polylines with a single call to Geod.inv over every edge of every polyline.
+
+    Args:
+        polylines (Iterable[np.ndarray]): (lat, lon) array of each polyline's vertices, further columns ignored.
+    Returns:
+        lengths (np.ndarray): Length of each polyline in metres, zero for those with fewer than two vertices.
+    """
+    polylines = [np.asarray(polyline, dtype=float) for polyline in polylines]
+    owners = np.repeat(np.arange(len(polylines)), [len(polyline) for polyline in polylines])
+    if len(owners) < 2:
+        return np.zeros(len(polylines))
+    points = np.vstack([polyline[:, :2] for polyline in polylines if len(polyline)])
+    _, _, edges = GEOD.inv(points[:-1, 1], points[:-1, 0], points[1:, 1], points[1:, 0])
+    # An edge from the last vertex of one polyline to the first of the next belongs to neither
+    within = owners[:-1] == owners[1:]
+    return np.bincount(owners[:-1][within], weights=np.asarray(edges, dtype=float)[within], minlength=len(polylines))
+
+
+def arc_points(lat: float, lon: float, radius: float, azimuths) -> tuple:
+    """
+    Solves points at a fixed distance around a centre with a single call to Geod.fwd.
+
+    Args:
+        lat(float): Latitude of the centre.
+        lon(float): Longitude of the centre.
+        radius(float): Distance of every point from the centre in metres.
+        azimuths(array_like): Azimuth of each point from the centre in degrees.
+    Returns:
+        lats, lons (tuple[np.ndarray]): The solved points, in the order given.
+    """
+    azimuths = np.asarray(azimuths, dtype=float)
+    count = len(azimuths)
+    lons, lats, _ = GEOD.fwd(np.full(count, lon), np.full(count, lat), azimuths, np.full(count, radius))
+    return np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+
+
+def check_tolerance(tolerance: float):
+    """
+    Args:
+        tolerance (float): Largest chord error in metres.
+    Raises:
+        ValueError: If the tolerance is not a positive, finite number.  Zero would need infinitely many chords.
+    """
+    if not np.isfinite(tolerance) or tolerance <= 0:
+        raise ValueError(f'tolerance must be a positive number of metres, not {tolerance}')
+
+
+def get_segment_counts(radii, sweeps, tolerance: float = DEFAULT_TOLERANCE) -> np.ndarray:
+    """
+    Chooses how many chords replace each arc so that no chord strays more than tolerance from it.  A chord spanning
+    angle a of a circle of radius r lies at most r * (1 - cos(a / 2)) from the circle, so the count grows with the
+    radius and the sweep.
+
+    Args:
+        radii(array_like): Radius of each arc in metres.
+        sweeps(array_like): Sweep of each arc in degrees, either sign.
+        tolerance(float): Largest chord error in metres.
+    Returns:
+        counts(np.ndarray): Number of chords for each arc, at least one.
+    Raises:
+        ValueError: If the tolerance is not a positive, finite number.
+    """
+    check_tolerance(tolerance)
+    radii = np.asarray(radii, dtype=float)
+    sweeps = np.abs(np.asarray(sweeps, dtype=float))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        steps = np.degrees(2.0 * np.arccos(np.clip(1.0 - tolerance / radii, -1.0, 1.0)))
+    steps = np.where(np.isnan(steps), MAX_STEP, np.clip(steps, 1e-6, MAX_STEP))
+    return np.maximum(np.ceil(sweeps / steps - 1e-9), 1).astype(np.int64)
+
+
+def get_curve_azimuths(curve, tolerance: float = DEFAULT_TOLERANCE) -> np.ndarray:
+    """
+    Args:
+        curve(Union[geometry.Arc, geometry.Circle]): The arc or circle.
+        tolerance(float): Largest chord error in metres.
+    Returns:
+        azimuths(np.ndarray): Azimuth from the centre of every point of the densified curve, from the arc's start to
+          its end, or once around a circle from north back to north.
+    """
+    if isinstance(curve, geometry.Arc):
+        start, sweep = curve.start_angle, geometry.sweep_angle(curve)
+    else:
+        start, sweep = 0.0, 360.0
+    count = get_segment_counts([curve.radius], [sweep], tolerance)[0]
+    return start + np.linspace(0.0, sweep, count + 1)
+
+
+def densify_all(geometries, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """
+    Densifies the arcs and circles of many geometries, solving every point of every curve with a single call to
+    Geod.fwd.
+
+    Args:
+        geometries(Iterable[list]): Each a list of coordinate arrays, Arc and Circle records in boundary order.
+        tolerance(float): Largest chord error of densified arcs and circles in metres.
+    Returns:
+        coordinates(list[np.ndarray]): (lat, lon) array of every point along each geometry's boundary.  Circles are
+          closed rings.
+    Raises:
+        ValueError: If the tolerance is not a positive, finite number.
+    """
+    check_tolerance(tolerance)
+    geometries = [list(parts) for parts in geometries]
+    centre_lats, centre_lons, radii, azimuths, lengths = [], [], [], [], []
+    for parts in geometries:
+        for part in parts:
+            if not isinstance(part, np.ndarray):
+                curve_azimuths = get_curve_azimuths(part, tolerance)
+                centre_lats.append(part.centre_lat)
+                centre_lons.append(part.centre_lon)
+                radii.append(part.radius)
+                azimuths.append(curve_azimuths)
+                lengths.append(len(curve_azimuths))
+
+    curve_points = iter(())
+    if lengths:
+        lengths = np.asarray(lengths)
+        lons, lats, _ = GEOD.fwd(np.repeat(centre_lons, lengths), np.repeat(centre_lats, lengths),
+                                 np.concatenate(azimuths), np.repeat(radii, lengths))
+        curve_points = iter(np.split(np.column_stack((lats, lons)), np.cumsum(lengths)[:-1]))
+
+    densified = []
+    for parts in geometries:
+        coordinates = []
+        for part in parts:
+            if isinstance(part, np.ndarray):
+                coordinates.append(part[:, :2])
+                continue
+            points = next(curve_points)
+            if isinstance(part, geometry.Circle):
+                # Azimuths 0 and 360 solve to the same point up to rounding, close the ring exactly
+                points[-1] = points[0]
+            coordinates.append(points)
+        densified.append(np.vstack(coordinates) if coordinates else np.empty((0, 2)))
+    return densified
+
+
+def densify(parts: list, tolerance: float = DEFAULT_TOLERANCE) -> np.ndarray:
+    """
+    Args:
+        parts (list): Coordinate arrays, Arc and Circle records in boundary order.
+        tolerance (float): Largest chord error of densified arcs and circles in metres.
+    Returns:
+        coordinates (np.ndarray): (lat, lon) array of every point along the boundary.
+    """
+    return densify_all([parts], tolerance)[0]
+
+
+def densify_arc(arc: geometry.Arc, tolerance: float = DEFAULT_TOLERANCE) -> np.ndarray:
+    """
+    Args:
+        arc (geometry.Arc): The arc.
+        tolerance (float): Largest chord error in metres.
+    Returns:
+        coordinates (np.ndarray): (lat, lon) array of shape (N, 2) running from the arc's start to its end.
+    """
+    return densify([arc], tolerance)
+
+
+def densify_circle(circle: geometry.Circle, tolerance: float = DEFAULT_TOLERANCE) -> np.ndarray:
+    """
+    Args:
+        circle (geometry.Circle): The circle.
+        tolerance (float): Largest chord error in metres.
+    Returns:
+        coordinates (np.ndarray): (lat, lon) array of shape (N, 2), a closed ring.
+    """
+    return densify([circle], tolerance)
+
+
+def to_ring(coordinates: np.ndarray) -> np.ndarray:
+    """
+    Args:
+        coordinates (np.ndarray): (lat, lon) array of a densified boundary.
+    Returns:
+        ring (np.ndarray): The boundary, closed by repeating its first point if it is not already.
+    """
+    if len(coordinates) and not np.array_equal(coordinates[0], coordinates[-1]):
+        return np.vstack((coordinates, coordinates[:1]))
+    return coordinates
@@ -0,0 +1,209 @@
+from typing import NamedTuple, Union
+
+import numpy as np
+
+# Shortest lengths of a degree of latitude (at the equator) and of longitude (scaled by cos(lat)) on WGS84, in metres
+METRES_PER_DEGREE_LAT = 110574.0
+METRES_PER_DEGREE_LON = 111319.0
+
+
+class Arc(NamedTuple):
+    """An ArcByCenterPoint with its end points solved.  Angles are in degrees and the radius in metres."""
+    centre_lat: float
+    centre_lon: float
+    radius: float
+    start_angle: float
+    end_angle: float
+    direction: str
+    start_lat: float
+    start_lon: float
+    end_lat: float
+    end_lon: float
+
+
+class Circle(NamedTuple):
+    """A CircleByCenterPoint.  The radius is in metres."""
+    centre_lat: float
+    centre_lon: float
+    radius: float
+
+
+def parse_pos(text: str) -> np.ndarray:
+    """
+    Args:
+        text (str): The text of a gml:pos element.
+    Returns:
+        coordinates (np.ndarray): A float64 array of shape (1, 2) or (1, 3).
+    """
+    return np.array(text.split(), dtype=np.float64).reshape(1, -1)
+
+
+def parse_pos_list(text: str, dimension: int = 2) -> np.ndarray:
+    """
+    Parses the text of a gml:posList element straight into an array of coordinates.
+
+    Args:
+        text (str): Whitespace separated coordinate values.
+        dimension (int): Number of values per coordinate, as given by srsDimension.
+    Returns:
+        coordinates (np.ndarray): A float64 array of shape (N, dimension).
+    """
+    return np.array(text.split(), dtype=np.float64).reshape(-1, dimension)
+
+
+def append_z(coordinates: np.ndarray, z) -> np.ndarray:
+    """
+    Args:
+        coordinates (np.ndarray): Array of shape (N, 2).
+        z (Union[str, float]): The Z value to give every coordinate.
+    Returns:
+        coordinates (np.ndarray): Array of shape (N, 3).
+    """
+    return np.column_stack((coordinates[:, :2], np.full(len(coordinates), float(z))))
+
+
+def coalesce(parts: list) -> list:
+    """
+    Joins consecutive coordinate arrays of the same dimension so each run of points is held in a single array.
+
+    Args:
+        parts (list): Coordinate arrays, Arc and Circle records in boundary order.
+    Returns:
+        parts (list): The same geometry with adjacent arrays stacked.
+    """
+    coalesced = []
+    run = []
+    for part in parts:
+        if isinstance(part, np.ndarray) and (not run or run[0].shape[1] == part.shape[1]):
+            run.append(part)
+            continue
+        if run:
+            coalesced.append(run[0] if len(run) == 1 else np.vstack(run))
+            run = []
+        if isinstance(part, np.ndarray):
+            run.append(part)
+        else:
+            coalesced.append(part)
+    if run:
+        coalesced.append(run[0] if len(run) == 1 else np.vstack(run))
+    return coalesced
+
+
+def vertex_count(parts: list) -> int:
+    """
+    Args:
+        parts (list): Coordinate arrays, Arc and Circle records.
+    Returns:
+        count (int): Number of coordinates, counting each Arc and Circle once as the coordinate strings do.
+    """
+    return sum(len(part) if isinstance(part, np.ndarray) else 1 for part in parts)
+
+
+def expand_envelope(envelope: tuple, distance: float) -> tuple:
+    """
+    Grows an envelope by a distance in all directions.  The degree lengths used are the shortest found on the WGS84
+    ellipsoid so the result always contains every point within the distance.
+
+    Args:
+        envelope (tuple): (min_lat, min_lon, max_lat, max_lon) in degrees.
+        distance (float): Distance in metres.
+    Returns:
+        envelope (tuple): The expanded (min_lat, min_lon, max_lat, max_lon).
+    """
+    min_lat, min_lon, max_lat, max_lon = envelope
+    lat_pad = distance / METRES_PER_DEGREE_LAT
+    widest_lat = max(abs(min_lat), abs(max_lat)) + lat_pad
+    if widest_lat >= 90.0:
+        return max(min_lat - lat_pad, -90.0), -180.0, min(max_lat + lat_pad, 90.0), 180.0
+
+    lon_pad = distance / (METRES_PER_DEGREE_LON * np.cos(np.radians(widest_lat)))
+    return min_lat - lat_pad, min_lon - lon_pad, max_lat + lat_pad, max_lon + lon_pad
+
+
+def sweep_angle(arc: Arc) -> float:
+    """
+    Args:
+        arc (Arc): The arc.
+    Returns:
+        sweep (float): Degrees travelled from the start to the end angle, positive clockwise (increasing azimuth) and
+          negative anticlockwise.  Equal start and end angles describe a full circle.
+    """
+    if arc.direction == 'clockwise':
+        return (arc.end_angle - arc.start_angle) % 360.0 or 360.0
+    return -((arc.start_angle - arc.end_angle) % 360.0 or 360.0)
+
+
+def sweeps(arc: Arc, azimuth: float) -> bool:
+    """
+    Args:
+        arc (Arc): The arc.
+        azimuth (float): Azimuth from the arc centre in degrees.
+    Returns:
+        sweeps (bool): True if the arc passes through the azimuth, travelling from its start to its end angle in its
+          direction.  Clockwise arcs run with increasing azimuth, as determined by determine_arc_direction.
+    """
+    if arc.direction == 'clockwise':
+        sweep, offset = arc.end_angle - arc.start_angle, azimuth - arc.start_angle
+    else:
+        sweep, offset = arc.start_angle - arc.end_angle, arc.start_angle - azimuth
+    sweep %= 360.0
+    # Equal start and end angles describe a full circle
+    return sweep == 0.0 or offset % 360.0 <= sweep
+
+
+def arc_envelope(arc: Arc) -> tuple:
+    """
+    Bounds an arc by its end points, only reaching out to the circle's northern, eastern, southern or western extreme
+    where the arc actually sweeps through that azimuth.
+
+    Args:
+        arc (Arc): The arc.
+    Returns:
+        envelope (tuple): (min_lat, min_lon, max_lat, max_lon) containing the whole arc.
+    """
+    centre = (arc.centre_lat, arc.centre_lon, arc.centre_lat, arc.centre_lon)
+    circle = expand_envelope(centre, arc.radius)
+    return (
+        circle[0] if sweeps(arc, 180.0) else min(arc.start_lat, arc.end_lat),
+        circle[1] if sweeps(arc, 270.0) else min(arc.start_lon, arc.end_lon),
+        circle[2] if sweeps(arc, 0.0) else max(arc.start_lat, arc.end_lat),
+        circle[3] if sweeps(arc, 90.0) else max(arc.start_lon, arc.end_lon),
+    )
+
+
+def envelope(parts) -> Union[tuple, None]:
+    """
+    Args:
+        parts (Iterable): Coordinate arrays, Arc and Circle records.
+    Returns:
+        envelope (Union[tuple, None]): (min_lat, min_lon, max_lat, max_lon) containing the whole geometry, including
+          the swept part of any Arc and the full circle of any Circle, or None if there is no geometry.
+    """
+    envelopes = []
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            if len(part):
+                envelopes.append((part[:, 0].min(), part[:, 1].min(), part[:, 0].max(), part[:, 1].max()))
+        elif isinstance(part, Arc):
+            envelopes.append(arc_envelope(part))
+        else:
+            centre = (part.centre_lat, part.centre_lon, part.centre_lat, part.centre_lon)
+            envelopes.append(expand_envelope(centre, part.radius))
+
+    if not envelopes:
+        return None
+    envelopes = np.array(envelopes, dtype=np.float64)
+    return (float(envelopes[:, 0].min()), float(envelopes[:, 1].min()),
+            float(envelopes[:, 2].max()), float(envelopes[:, 3].max()))
+
+
+def intersects(envelope_a: tuple, envelope_b: tuple) -> bool:
+    """
+    Args:
+        envelope_a (tuple): (min_lat, min_lon, max_lat, max_lon)
+        envelope_b (tuple): (min_lat, min_lon, max_lat, max_lon)
+    Returns:
+        intersects (bool): True if the envelopes overlap or touch.
+    """
+    return (envelope_a[0] <= envelope_b[2] and envelope_b[0] <= envelope_a[2]
+            and envelope_a[1] <= envelope_b[3] and envelope_b[1] <= envelope_a[3])
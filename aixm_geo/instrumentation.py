@@ -0,0 +1,102 @@
+import heapq
+import json
+
+# Stages recorded by the library.  parse is the XML parse, timeslice building a feature and sorting its timeslices,
+# geodesic solving arc end points, extract get_geographic_information() or to_record() and kml drawing with KMLPlus
+STAGES = ('parse', 'timeslice', 'geodesic', 'extract', 'kml')
+
+# Feature type recorded for work not attributable to a single feature, e.g. parsing a whole document
+ALL_FEATURES = '*'
+
+
+class Stats:
+    """
+    Collects counts, cumulative time and the slowest features per stage and feature type.
+
+    Pass an instance as stats= to AixmFeatureFactory or AixmGeo to enable instrumentation.  Without one, none of the
+    timing code runs.  Hooks are called with (stage, feature_type, seconds, identifier) for every measurement, so
+    measurements can also be streamed elsewhere, e.g. to a metrics client.
+    """
+    __slots__ = ['slowest_count', 'hooks', '_entries']
+
+    def __init__(self, slowest_count=5, hooks=None):
+        self.slowest_count = slowest_count
+        self.hooks = list(hooks) if hooks else []
+        # (stage, feature_type) to [count, seconds, min-heap of the slowest (seconds, identifier)]
+        self._entries = {}
+
+    def record(self, stage: str, feature_type: str, seconds: float, identifier=None):
+        """
+        Args:
+            stage (str): The stage measured, see STAGES.
+            feature_type (str): The AIXM feature type, or ALL_FEATURES.
+            seconds (float): Time spent.
+            identifier (str): The feature measured, e.g. its gml:identifier, if any.
+        """
+        entry = self._entries.get((stage, feature_type))
+        if entry is None:
+            entry = self._entries[(stage, feature_type)] = [0, 0.0, []]
+        entry[0] += 1
+        entry[1] += seconds
+        if identifier is not None and self.slowest_count:
+            if len(entry[2]) < self.slowest_count:
+                heapq.heappush(entry[2], (seconds, identifier))
+            elif seconds > entry[2][0][0]:
+                heapq.heapreplace(entry[2], (seconds, identifier))
+
+        for hook in self.hooks:
+            hook(stage, feature_type, seconds, identifier)
+
+    def get_count(self, stage: str, feature_type: str = None) -> int:
+        """
+        Args:
+            stage (str): The stage.
+            feature_type (str): Only count this feature type.  None counts every type.
+        Returns:
+            count (int): Number of measurements recorded.
+        """
+        return sum(entry[0] for (entry_stage, entry_type), entry in self._entries.items()
+                   if entry_stage == stage and feature_type in (None, entry_type))
+
+    def get_seconds(self, stage: str, feature_type: str = None) -> float:
+        """
+        Args:
+            stage (str): The stage.
+            feature_type (str): Only total this feature type.  None totals every type.
+        Returns:
+            seconds (float): Cumulative time recorded.
+        """
+        return sum(entry[1] for (entry_stage, entry_type), entry in self._entries.items()
+                   if entry_stage == stage and feature_type in (None, entry_type))
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            stats (dict): {stage: {feature_type: {'count', 'seconds', 'slowest': [[identifier, seconds], ...]}}} with
+              the slowest features first.
+        """
+        stats = {}
+        for (stage, feature_type), (count, seconds, slowest) in self._entries.items():
+            stats.setdefault(stage, {})[feature_type] = {
+                'count': count,
+                'seconds': seconds,
+                'slowest': [[identifier, slow_seconds] for slow_seconds, identifier in sorted(slowest, reverse=True)],
+            }
+        return stats
+
+    def to_json(self, path=None, indent=2):
+        """
+        Args:
+            path: Optional path to write the JSON to.
+            indent (int): JSON indentation.
+        Returns:
+            stats (str): The stats as JSON.
+        """
+        stats = json.dumps(self.to_dict(), indent=indent)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(stats)
+        return stats
+
+    def clear(self):
+        self._entries.clear()
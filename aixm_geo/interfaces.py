@@ -9,6 +9,7 @@ class IAixmFeature(ABC):
     *DesignatedPoint
     *Navaid etc.
     """
+    __slots__ = ()
 
     @abstractmethod
     def get_geographic_information(self) -> dict:
@@ -0,0 +1,199 @@
+import io
+import zipfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from kmlplus.geo import PointFactory
+from kmlplus.shapes import Cylinder, Polyhedron
+
+from . import util
+
+KML_HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+              '<kml xmlns="http://www.opengis.net/kml/2.2"><Document>\n')
+KML_FOOTER = '</Document></kml>\n'
+
+DEFAULT_COLOUR = '7Fc0c0c0'
+
+# Write buffer for .kml output, shapes are written as they arrive rather than held until the end
+_BUFFER_SIZE = 1 << 20
+
+
+def get_altitude_mode(altitude_mode) -> str:
+    if altitude_mode is not None and altitude_mode.lower() == 'relativetoground':
+        return 'relativeToGround'
+    return 'absolute'
+
+
+def format_coordinates(coordinates) -> str:
+    return ' '.join(f'{x},{y},{z}' for x, y, z in coordinates)
+
+
+class StreamingKml:
+    """
+    A drop in replacement for kmlplus.kml.KmlPlus which writes each folder and placemark to a buffered file handle as
+    soon as it is drawn.  KmlPlus holds the whole document in memory and saves it again after every shape, this writer
+    keeps memory flat however many features are written.
+
+    Shape coordinates are still produced by KMLPlus, only the document handling differs.  A file name ending .kmz is
+    written straight into a zip archive as doc.kml.  Call close(), or use the writer as a context manager, to finish
+    the document.
+    """
+    __slots__ = ['path', '_archive', '_stream']
+
+    def __init__(self, output=None, file_name='KmlPlus.kml'):
+        self.path = Path(output).joinpath(file_name) if output else Path(file_name)
+        if self.path.suffix.lower() == '.kmz':
+            self._archive = zipfile.ZipFile(self.path, 'w', compression=zipfile.ZIP_DEFLATED)
+            self._stream = io.TextIOWrapper(self._archive.open('doc.kml', 'w', force_zip64=True), encoding='utf-8')
+        else:
+            self._archive = None
+            self._stream = open(self.path, 'w', encoding='utf-8', buffering=_BUFFER_SIZE)
+        self._stream.write(KML_HEADER)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self._stream is None:
+            return
+        self._stream.write(KML_FOOTER)
+        self._stream.close()
+        if self._archive is not None:
+            self._archive.close()
+        self._stream = None
+
+    def write_folder(self, name: str, placemarks: list):
+        self._stream.write(f'<Folder><name>{escape(name)}</name>{"".join(placemarks)}</Folder>\n')
+
+    def get_polygon(self, name: str, coordinates: list, altitude_mode: str, colour_hex=DEFAULT_COLOUR, fill=1,
+                    outline=1, extrude=0) -> str:
+        return (f'<Placemark><name>{escape(name)}</name><Style><PolyStyle><color>{colour_hex}</color>'
+                f'<fill>{fill}</fill><outline>{outline}</outline></PolyStyle></Style><Polygon><extrude>{extrude}'
+                f'</extrude><altitudeMode>{altitude_mode}</altitudeMode><outerBoundaryIs><LinearRing><coordinates>'
+                f'{format_coordinates(coordinates)}</coordinates></LinearRing></outerBoundaryIs></Polygon>'
+                f'</Placemark>')
+
+    def point(self, coordinate_list: list, **kwargs):
+        """
+        Args:
+            coordinate_list (list): A list containing a single coordinate.
+        Keyword Args:
+            As kmlplus.kml.KmlPlus.point - fol, z, uom, point_name, colour_hex, extrude and altitude_mode.
+        """
+        point = PointFactory(coordinate_list, z=kwargs.get('z', None), uom=kwargs.get('uom', 'M')).process_coordinates()
+        placemark = (f'<Placemark><name>{escape(str(kwargs.get("point_name", "KmlPlus Point")))}</name><Style>'
+                     f'<IconStyle><color>{kwargs.get("colour_hex", DEFAULT_COLOUR)}</color></IconStyle></Style>'
+                     f'<Point><coordinates>{point[0].x},{point[0].y},{point[0].z}</coordinates>'
+                     f'<extrude>{kwargs.get("extrude", 0)}</extrude>'
+                     f'<altitudeMode>{get_altitude_mode(kwargs.get("altitude_mode"))}</altitudeMode></Point>'
+                     f'</Placemark>')
+        self.write_folder(str(kwargs.get('fol', 'KmlPlus Point')), [placemark])
+
+    def polyhedron(self, lower_coordinate_list: list, upper_coordinate_list: list, **kwargs):
+        """
+        Args:
+            lower_coordinate_list (list): Coordinates of the lower polygon.
+            upper_coordinate_list (list): Coordinates of the upper polygon.
+        Keyword Args:
+            As kmlplus.kml.KmlPlus.polyhedron - fol, lower_layer, upper_layer, lower_layer_uom, upper_layer_uom,
+            colour_hex, fill, outline, extrude and altitude_mode.
+        """
+        lower, upper, sides = Polyhedron(
+            lower_coordinate_list,
+            upper_coordinate_list,
+            lower_layer=kwargs.get('lower_layer', None),
+            upper_layer=kwargs.get('upper_layer', None),
+            lower_layer_uom=kwargs.get('lower_layer_uom', 'M'),
+            upper_layer_uom=kwargs.get('upper_layer_uom', 'M'),
+        ).to_kml()
+        self.write_solid(str(kwargs.get('fol', 'KmlPlus Polyhedron')), lower, upper, sides, 'Lower Polygon',
+                         'Upper Polygon', 'KmlPlus Polygon', **kwargs)
+
+    def cylinder(self, coordinate_list: list, radius: float, **kwargs):
+        """
+        Args:
+            coordinate_list (list): A list containing a single coordinate, the centre of the cylinder.
+            radius (float): The radius of the cylinder.
+        Keyword Args:
+            As kmlplus.kml.KmlPlus.cylinder - fol, radius_uom, lower_layer, upper_layer, lower_layer_uom,
+            upper_layer_uom, sample, uom, colour_hex, fill, outline and altitude_mode.
+        """
+        lower, upper, sides = Cylinder(
+            (coordinate_list, radius),
+            (coordinate_list, radius),
+            radius_uom=kwargs.get('radius_uom', 'M'),
+            lower_layer=kwargs.get('lower_layer', None),
+            upper_layer=kwargs.get('upper_layer', None),
+            lower_layer_uom=kwargs.get('lower_layer_uom', 'FT'),
+            upper_layer_uom=kwargs.get('upper_layer_uom', 'FT'),
+            sample=kwargs.get('sample', 100), uom=kwargs.get('uom', 'M'),
+        ).to_kml()
+        self.write_solid(str(kwargs.get('fol', 'KmlPlus Cylinder')), lower, upper, sides, 'KmlPlus Circle',
+                         'Upper Circle', 'A side', **kwargs)
+
+    def write_solid(self, folder_name, lower, upper, sides, lower_name, upper_name, side_name, **kwargs):
+        altitude_mode = get_altitude_mode(kwargs.get('altitude_mode'))
+        style = {
+            'colour_hex': kwargs.get('colour_hex', DEFAULT_COLOUR),
+            'fill': kwargs.get('fill', 1),
+            'outline': kwargs.get('outline', 1),
+        }
+        placemarks = [
+            self.get_polygon(lower_name, lower, altitude_mode, extrude=kwargs.get('extrude', 0), **style),
+            self.get_polygon(upper_name, upper, altitude_mode, extrude=kwargs.get('extrude', 0), **style),
+        ]
+        placemarks.extend(self.get_polygon(side_name, side, altitude_mode, **style) for side in sides)
+        self.write_folder(folder_name, placemarks)
+
+
+def draw_feature(aixm_feature_dict, kml_obj):
+    """
+    Args:
+        aixm_feature_dict (dict): Geographic information of a feature with coordinate strings.
+        kml_obj (Union[kmlplus.kml.KmlPlus, StreamingKml]): The document to draw to.
+    """
+    geometry_type = util.determine_geometry_type(aixm_feature_dict)
+    if geometry_type == 'cylinder':
+        draw_cylinder(aixm_feature_dict, kml_obj)
+    elif geometry_type == 'point':
+        if aixm_feature_dict['type'] == 'VerticalStructure':
+            draw_vertical_structure_point(aixm_feature_dict, kml_obj)
+        else:
+            kml_obj.point(aixm_feature_dict["coordinates"], fol=aixm_feature_dict['name'],
+                          point_name=aixm_feature_dict['name'])
+    elif geometry_type == 'polyhedron':
+        draw_airspace(aixm_feature_dict, kml_obj)
+
+
+def draw_vertical_structure_point(aixm_feature_dict, kml_obj):
+    kml_obj.point(aixm_feature_dict["coordinates"], uom=aixm_feature_dict['elevation_uom'],
+                  fol=aixm_feature_dict['name'], point_name=aixm_feature_dict['name'],
+                  altitude_mode='relativeToGround', extrude=1)
+
+
+def draw_airspace(aixm_feature_dict, kml_obj):
+    kml_obj.polyhedron(aixm_feature_dict["coordinates"],
+                       aixm_feature_dict["coordinates"],
+                       upper_layer=float(aixm_feature_dict['upper_layer']),
+                       lower_layer=float(aixm_feature_dict['lower_layer']),
+                       uom=aixm_feature_dict['lower_layer_uom'], fol=aixm_feature_dict['name'],
+                       altitude_mode=util.altitude_mode(aixm_feature_dict))
+
+
+def draw_cylinder(aixm_feature_dict, kml_obj):
+
+    coordinates = aixm_feature_dict['coordinates'][0].split(',')[0].strip()
+    radius = aixm_feature_dict['coordinates'][0].split(',')[1].split('=')[-1]
+    radius_uom = util.switch_radius_uom(aixm_feature_dict['coordinates'][0].split(',')[2].split('=')[-1])
+    lower_layer = aixm_feature_dict['lower_layer']
+    upper_layer = aixm_feature_dict['upper_layer']
+
+    kml_obj.cylinder(coordinates, float(radius),
+                     radius_uom=radius_uom, lower_layer=float(lower_layer),
+                     upper_layer=float(upper_layer),
+                     fol=aixm_feature_dict['name'], lower_layer_uom=aixm_feature_dict['lower_layer_uom'],
+                     upper_layer_uom=aixm_feature_dict['upper_layer_uom'],
+                     altitude_mode=util.altitude_mode(aixm_feature_dict))
@@ -0,0 +1,109 @@
+import json
+from typing import Union
+
+import numpy as np
+
+from . import geodesy
+from . import util
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def to_positions(coordinates: np.ndarray) -> list:
+    """
+    Args:
+        coordinates (np.ndarray): (lat, lon) or (lat, lon, z) array.
+    Returns:
+        positions (list): GeoJSON positions, which are (lon, lat) or (lon, lat, z).
+    """
+    positions = coordinates.copy()
+    positions[:, [0, 1]] = coordinates[:, [1, 0]]
+    return positions.tolist()
+
+
+def get_geometry(geo_dict: dict, tolerance: float = geodesy.DEFAULT_TOLERANCE) -> Union[dict, None]:
+    """
+    Args:
+        geo_dict (dict): Geographic information from a numeric feature.
+        tolerance (float): Largest chord error of densified arcs and circles in metres.
+    Returns:
+        geometry (Union[dict, None]): A GeoJSON geometry, using the same geometry types as the KML output, or None if
+          the feature has no geometry.
+    """
+    parts = geo_dict['coordinates']
+    if not parts:
+        return None
+
+    # determine_geometry_type fills in vertical limits for some features, leave the caller's dict untouched
+    geometry_type = util.determine_geometry_type(dict(geo_dict))
+    geometry_type = geometry_type.lower() if geometry_type else None
+    if geometry_type == 'point':
+        return {'type': 'Point', 'coordinates': to_positions(parts[0][:1])[0]}
+    if geometry_type == 'linestring':
+        return {'type': 'LineString', 'coordinates': to_positions(geodesy.densify(parts, tolerance))}
+
+    ring = geodesy.to_ring(geodesy.densify(parts, tolerance))
+    return {'type': 'Polygon', 'coordinates': [to_positions(ring)]}
+
+
+def to_feature(geo_dict: dict, tolerance: float = geodesy.DEFAULT_TOLERANCE) -> dict:
+    """
+    Args:
+        geo_dict (dict): Geographic information from a numeric feature.
+        tolerance (float): Largest chord error of densified arcs and circles in metres.
+    Returns:
+        feature (dict): A GeoJSON Feature.  Every value other than the coordinates, including the vertical limits and
+          their units, is kept as a property.
+    """
+    properties = {}
+    for key, value in geo_dict.items():
+        if key != 'coordinates':
+            properties[key] = value.item() if isinstance(value, np.generic) else value
+    return {'type': 'Feature', 'geometry': get_geometry(geo_dict, tolerance), 'properties': properties}
+
+
+def encode(feature: dict) -> bytes:
+    """
+    Args:
+        feature (dict): A GeoJSON Feature.
+    Returns:
+        line (bytes): The feature as a single line of JSON, encoded with orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(feature, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(feature, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def iter_lines(geo_dicts, tolerance: float = geodesy.DEFAULT_TOLERANCE):
+    """
+    Args:
+        geo_dicts (Iterable[dict]): Geographic information from numeric features.
+        tolerance (float): Largest chord error of densified arcs and circles in metres.
+    Returns:
+        lines (generator): A generator of newline-delimited GeoJSON Features as bytes.
+    """
+    for geo_dict in geo_dicts:
+        if geo_dict:
+            yield encode(to_feature(geo_dict, tolerance))
+
+
+def write_ndjson(geo_dicts, path, tolerance: float = geodesy.DEFAULT_TOLERANCE) -> int:
+    """
+    Writes one GeoJSON Feature per line as the geographic information arrives, so output of any size is produced
+    incrementally.
+    Args:
+        geo_dicts (Iterable[dict]): Geographic information from numeric features.
+        path: Path to write to.
+        tolerance (float): Largest chord error of densified arcs and circles in metres.
+    Returns:
+        count (int): Number of features written.
+    """
+    count = 0
+    with open(path, 'wb', buffering=1 << 20) as f:
+        for line in iter_lines(geo_dicts, tolerance):
+            f.write(line)
+            count += 1
+    return count
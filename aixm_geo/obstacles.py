@@ -0,0 +1,439 @@
+from typing import NamedTuple, Union
+
+import numpy as np
+
+from . import geodesy
+from . import geometry
+from .parallel import get_feature_records
+
+# Largest number of query points descended through the tree at once, bounding the temporary arrays
+_CHUNK_QUERIES = 4096
+
+# Shortest piece, in metres, a corridor's edges are cut into however narrow the corridor
+_MIN_PIECE = 1000.0
+
+# Longest piece, in metres, the edges of line and polygon obstacles are cut into before they are indexed
+_OBSTACLE_PIECE = 1000.0
+
+
+class Clearance(NamedTuple):
+    """The obstacles near one feature, and the highest of them.  max_elevation is NaN if none have an elevation."""
+    identifier: str
+    obstacle_count: int
+    max_elevation: float
+    highest_obstacle: Union[str, None]
+
+
+def to_chords(distances) -> np.ndarray:
+    """
+    Args:
+        distances (array_like): Great circle distances in metres.
+    Returns:
+        chords (np.ndarray): Straight line distance between unit vectors the same angle apart.
+    """
+    angles = np.clip(np.asarray(distances, dtype=np.float64) / geodesy.MEAN_RADIUS, 0.0, np.pi)
+    return 2.0 * np.sin(angles / 2.0)
+
+
+def angles_between(vectors_a: np.ndarray, vectors_b: np.ndarray) -> np.ndarray:
+    """
+    Args:
+        vectors_a (np.ndarray): Array of shape (N, 3) of unit vectors.
+        vectors_b (np.ndarray): Array of shape (N, 3) of unit vectors.
+    Returns:
+        angles (np.ndarray): Angle in radians between each pair, accurate for nearby points unlike arccos.
+    """
+    chords = np.sqrt(((vectors_a - vectors_b) ** 2).sum(axis=1))
+    return 2.0 * np.arcsin(np.clip(chords / 2.0, 0.0, 1.0))
+
+
+def normalise(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1)[:, None]
+
+
+def segment_angles(points: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Args:
+        points (np.ndarray): Array of shape (N, 3) of unit vectors.
+        starts (np.ndarray): Array of shape (N, 3), the start of the great circle segment each point is measured to.
+        ends (np.ndarray): Array of shape (N, 3), the end of each segment.
+    Returns:
+        angles (np.ndarray): Angle in radians from each point to the nearest point of its segment.
+    """
+    angles = np.minimum(angles_between(points, starts), angles_between(points, ends))
+    normals = np.cross(starts, ends)
+    lengths = np.linalg.norm(normals, axis=1)
+    # Segments whose ends coincide have no great circle, the distance to an end is exact
+    spans = lengths > 1e-15
+    normals = normals[spans] / lengths[spans, None]
+    points, starts, ends = points[spans], starts[spans], ends[spans]
+    # The foot of the perpendicular lies within the segment if it is on the inner side of both ends
+    within = (((np.cross(starts, points) * normals).sum(axis=1) >= 0)
+              & ((np.cross(points, ends) * normals).sum(axis=1) >= 0))
+    cross_track = np.arcsin(np.clip(np.abs((points * normals).sum(axis=1)), 0.0, 1.0))
+    angles[spans] = np.where(within, np.minimum(cross_track, angles[spans]), angles[spans])
+    return angles
+
+
+def segment_pair_angles(starts_a: np.ndarray, ends_a: np.ndarray, starts_b: np.ndarray,
+                        ends_b: np.ndarray) -> np.ndarray:
+    """
+    Args:
+        starts_a (np.ndarray): Array of shape (N, 3), the start of each great circle segment of the first set.
+        ends_a (np.ndarray): Array of shape (N, 3), the end of each segment of the first set.
+        starts_b (np.ndarray): Array of shape (N, 3), the start of the segment each is measured to.
+        ends_b (np.ndarray): Array of shape (N, 3), the end of the segment each is measured to.
+    Returns:
+        angles (np.ndarray): Angle in radians between the nearest points of each pair of segments, 0 where they
+          cross.  Segments are assumed shorter than a quarter of a great circle.
+    """
+    # Segments which do not cross are nearest at an end of one or the other
+    angles = np.minimum.reduce((segment_angles(starts_a, starts_b, ends_b), segment_angles(ends_a, starts_b, ends_b),
+                                segment_angles(starts_b, starts_a, ends_a), segment_angles(ends_b, starts_a, ends_a)))
+    normals_a, normals_b = np.cross(starts_a, ends_a), np.cross(starts_b, ends_b)
+    # Each segment's ends lie either side of the other's great circle, and the crossing is the one between them
+    crossing = (((starts_a * normals_b).sum(axis=1) * (ends_a * normals_b).sum(axis=1) < 0)
+                & ((starts_b * normals_a).sum(axis=1) * (ends_b * normals_a).sum(axis=1) < 0)
+                & (((starts_a + ends_a) * (starts_b + ends_b)).sum(axis=1) > 0))
+    angles[crossing] = 0.0
+    return angles
+
+
+def cut_edges(starts: np.ndarray, ends: np.ndarray, piece_angle: float) -> tuple:
+    """
+    Args:
+        starts (np.ndarray): Array of shape (N, 3), the unit vector each great circle edge starts at.
+        ends (np.ndarray): Array of shape (N, 3), the unit vector each edge ends at.
+        piece_angle (float): Longest piece in radians, give or take the uneven spacing.
+    Returns:
+        starts, ends, counts (tuple[np.ndarray]): The start and end of every piece, edge by edge, and the number of
+          pieces each edge was cut into.  An edge whose ends coincide is one piece.
+    """
+    counts = np.maximum(np.ceil(angles_between(starts, ends) / piece_angle), 1).astype(np.int64)
+    # Normalised straight line steps stay on the great circle, spaced a little unevenly
+    fractions = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    fractions = np.column_stack((fractions, fractions + 1)) / np.repeat(counts, counts)[:, None]
+    starts, ends = np.repeat(starts, counts, axis=0), np.repeat(ends, counts, axis=0)
+    steps = ends - starts
+    return normalise(starts + fractions[:, :1] * steps), normalise(starts + fractions[:, 1:] * steps), counts
+
+
+def kd_order(points: np.ndarray, depth: int) -> np.ndarray:
+    """
+    Orders points as an implicit k-d tree.  At each depth every node's run of points is split about its median along
+    the axis of greatest spread, so node i at depth d holds the points between positions i * N // 2 ** d and
+    (i + 1) * N // 2 ** d.
+
+    Args:
+        points (np.ndarray): Array of shape (N, 3) of points.
+        depth (int): Number of levels of splits.
+    Returns:
+        order (np.ndarray): Indices of the points in tree order.
+    """
+    count = len(points)
+    order = np.arange(count)
+    for level in range(depth):
+        bounds = node_bounds(count, level + 1)
+        for node in range(2 ** level):
+            start, middle, stop = bounds[2 * node:2 * node + 3]
+            run = order[start:stop]
+            values = points[run]
+            axis = np.argmax(values.max(axis=0) - values.min(axis=0))
+            order[start:stop] = run[np.argpartition(values[:, axis], middle - start)]
+    return order
+
+
+def node_bounds(count: int, level: int) -> np.ndarray:
+    """
+    Args:
+        count (int): Number of points in the tree.
+        level (int): Depth of the nodes, 0 for the root.
+    Returns:
+        bounds (np.ndarray): The 2 ** level + 1 positions at which the level's runs of points start and stop.
+    """
+    return np.arange(2 ** level + 1, dtype=np.int64) * count // 2 ** level
+
+
+class ObstacleIndex:
+    """
+    Finds the VerticalStructure obstacles near many points or along many polylines at once, e.g. around every
+    AirportHeliport ARP or along every RouteSegment.
+
+    The edges of every line and polygon obstacle are cut into pieces no longer than _OBSTACLE_PIECE, a point obstacle
+    being a single piece of no length.  The midpoint of each piece is held as a unit vector on a spherical earth of
+    radius geodesy.MEAN_RADIUS, in an implicit, balanced k-d tree.  A batch of queries descends the tree together,
+    one vectorised box test per level with the search widened by the longest half piece, and the pieces of the
+    leaves reached are measured exactly.  An obstacle crossing a query between distant vertices is therefore found,
+    though the inside of a polygon obstacle is not searched, only its boundary.  Distances are great circle distances
+    on the sphere, within a fraction of a percent of the geodesic on WGS84.  Elevations are in metres, NaN where an
+    obstacle has none.
+    """
+    __slots__ = ['records', 'identifiers', 'elevations', '_vectors', '_starts', '_ends', '_reach', '_owners',
+                 '_levels', '_leaf_bounds']
+
+    def __init__(self, feature_records, leaf_size=16, tolerance=geodesy.DEFAULT_TOLERANCE):
+        """
+        Args:
+            feature_records (Iterable[records.FeatureRecord]): Records of any type, only vertical structures with
+              geometry are indexed.
+            leaf_size (int): Most points held by a leaf of the tree, at least 2.
+            tolerance (float): Largest chord error of densified arcs and circles in metres.
+        """
+        records = [record for record in feature_records if record.feature_type == 'VerticalStructure']
+        # Densifying first finds the obstacles without geometry in the same pass
+        coordinates = geodesy.densify_all([record.geometry for record in records], tolerance)
+        self.records = [record for record, points in zip(records, coordinates) if len(points)]
+        coordinates = [points for points in coordinates if len(points)]
+        self.identifiers = np.array([record.identifier for record in self.records], dtype=str)
+        self.elevations = np.array([np.nan if record.elevation is None else record.elevation
+                                    for record in self.records], dtype=np.float64)
+
+        lengths = np.array([len(points) for points in coordinates], dtype=np.int64)
+        owners = np.repeat(np.arange(len(coordinates), dtype=np.int64), lengths)
+        coordinates = np.vstack(coordinates) if coordinates else np.empty((0, 2))
+        vectors = geodesy.to_unit_vectors(coordinates[:, 0], coordinates[:, 1]).reshape(-1, 3)
+
+        # Each pair of consecutive vertices of an obstacle is an edge, a lone vertex an edge from itself to itself
+        firsts = np.cumsum(lengths) - lengths
+        edges = np.concatenate((np.flatnonzero(owners[:-1] == owners[1:]), firsts[lengths == 1]))
+        edges.sort()
+        lone = np.zeros(len(vectors), dtype=bool)
+        lone[firsts[lengths == 1]] = True
+        starts, ends, counts = cut_edges(vectors[edges], vectors[np.where(lone[edges], edges, edges + 1)],
+                                         _OBSTACLE_PIECE / geodesy.MEAN_RADIUS)
+        owners = np.repeat(owners[edges], counts)
+        vectors = normalise(starts + ends) if len(starts) else starts
+        self._reach = float(angles_between(starts, ends).max()) / 2.0 * geodesy.MEAN_RADIUS if len(starts) else 0.0
+
+        count = len(vectors)
+        depth = int(np.ceil(np.log2(count / leaf_size))) if count > leaf_size else 0
+        order = kd_order(vectors, depth)
+        self._vectors = vectors[order]
+        self._starts = starts[order]
+        self._ends = ends[order]
+        self._owners = owners[order]
+        self._levels = []
+        if count:
+            for level in range(depth + 1):
+                starts = node_bounds(count, level)[:-1]
+                self._levels.append((np.minimum.reduceat(self._vectors, starts, axis=0),
+                                     np.maximum.reduceat(self._vectors, starts, axis=0)))
+        self._leaf_bounds = node_bounds(count, depth)
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    def from_file(cls, aixm_file, workers=None, leaf_size=16, tolerance=geodesy.DEFAULT_TOLERANCE):
+        """
+        Args:
+            aixm_file: Path to the AIXM file.
+            workers (int): Extract the obstacles across this many processes.
+            leaf_size (int): Most points held by a leaf of the tree.
+            tolerance (float): Largest chord error of densified arcs and circles in metres.
+        Returns:
+            obstacle_index (ObstacleIndex): The file's obstacles, prepared for queries.
+        """
+        return cls(get_feature_records(aixm_file, {'VerticalStructure'}, workers=workers), leaf_size, tolerance)
+
+    def candidates(self, vectors: np.ndarray, chords: np.ndarray) -> tuple:
+        """
+        Args:
+            vectors (np.ndarray): Array of shape (N, 3) of query unit vectors.
+            chords (np.ndarray): Search radius of each query as a chord length.
+        Returns:
+            query_indices, positions (tuple[np.ndarray]): Every (query, point) pair whose leaf lies within the query's
+              radius.  Positions are in tree order.
+        """
+        queries = np.arange(len(vectors))
+        nodes = np.zeros(len(vectors), dtype=np.int64)
+        for level, (lows, highs) in enumerate(self._levels):
+            if level:
+                queries = np.repeat(queries, 2)
+                nodes = (nodes[:, None] * 2 + np.arange(2)).ravel()
+            query_vectors = vectors[queries]
+            gaps = np.maximum(lows[nodes] - query_vectors, 0.0) + np.maximum(query_vectors - highs[nodes], 0.0)
+            keep = (gaps ** 2).sum(axis=1) <= chords[queries] ** 2
+            queries, nodes = queries[keep], nodes[keep]
+
+        starts = self._leaf_bounds[nodes]
+        counts = self._leaf_bounds[nodes + 1] - starts
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return np.repeat(queries, counts), np.repeat(starts, counts) + offsets
+
+    def search(self, vectors: np.ndarray, radii: np.ndarray, within) -> tuple:
+        """
+        Args:
+            vectors (np.ndarray): Array of shape (N, 3) of query unit vectors.
+            radii (np.ndarray): Search radius of each query in metres, widened by the longest half piece to find the
+              candidate pieces.
+            within (Callable): Given the query indices and tree positions of candidate pairs, returns a boolean array
+              of the pairs which match.
+        Returns:
+            query_indices, obstacle_indices (tuple[np.ndarray]): Every matching (query, obstacle) pair, sorted by query
+              and then obstacle.
+        """
+        chords = to_chords(radii + self._reach)
+        pairs = [np.empty(0, dtype=np.int64)]
+        if self._levels:
+            for start in range(0, len(vectors), _CHUNK_QUERIES):
+                queries, positions = self.candidates(vectors[start:start + _CHUNK_QUERIES],
+                                                     chords[start:start + _CHUNK_QUERIES])
+                queries += start
+                keep = within(queries, positions)
+                pairs.append(queries[keep] * len(self.records) + self._owners[positions[keep]])
+        # An obstacle with many pieces near a query is one match
+        pairs = np.unique(np.concatenate(pairs))
+        return pairs // max(len(self.records), 1), pairs % max(len(self.records), 1)
+
+    def query_radius(self, lats, lons, radii) -> tuple:
+        """
+        Args:
+            lats (array_like): Latitude of each point.
+            lons (array_like): Longitude of each point.
+            radii (array_like): Search radius in metres, one for every point or one for each.
+        Returns:
+            point_indices, obstacle_indices (tuple[np.ndarray]): Every (point, obstacle) pair where some part of the
+              obstacle lies within the point's radius, sorted by point and then obstacle.
+        """
+        vectors = geodesy.to_unit_vectors(lats, lons).reshape(-1, 3)
+        radii = np.broadcast_to(np.asarray(radii, dtype=np.float64), len(vectors))
+        limits = radii / geodesy.MEAN_RADIUS
+
+        def within(queries, positions):
+            return segment_angles(vectors[queries], self._starts[positions], self._ends[positions]) <= limits[queries]
+
+        return self.search(vectors, radii, within)
+
+    def query_corridor(self, polylines, half_width: float) -> tuple:
+        """
+        Each edge of a polyline is cut into pieces no longer than the corridor is wide, and each piece searches the
+        circle around its midpoint which covers it and its corridor, before the obstacles' pieces are measured to the
+        piece itself.
+
+        Args:
+            polylines (Iterable[np.ndarray]): (lat, lon) arrays of each polyline's vertices, further columns ignored.
+            half_width (float): Largest distance in metres from the polyline, either side.
+        Returns:
+            polyline_indices, obstacle_indices (tuple[np.ndarray]): Every (polyline, obstacle) pair where some part of
+              the obstacle lies within half_width of the polyline, sorted by polyline and then obstacle.
+        """
+        piece_angle = max(2.0 * half_width, _MIN_PIECE) / geodesy.MEAN_RADIUS
+        starts, ends, owners = [], [], []
+        for i, polyline in enumerate(polylines):
+            polyline = np.asarray(polyline, dtype=np.float64)
+            if not len(polyline):
+                continue
+            vectors = geodesy.to_unit_vectors(polyline[:, 0], polyline[:, 1])
+            if len(vectors) == 1:
+                vectors = np.vstack((vectors, vectors))
+            piece_starts, piece_ends, _ = cut_edges(vectors[:-1], vectors[1:], piece_angle)
+            starts.append(piece_starts)
+            ends.append(piece_ends)
+            owners.append(np.full(len(piece_starts), i, dtype=np.int64))
+        if not owners:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        starts, ends, owners = np.vstack(starts), np.vstack(ends), np.concatenate(owners)
+
+        centres = normalise(starts + ends)
+        radii = angles_between(starts, ends) / 2.0 * geodesy.MEAN_RADIUS + half_width
+        limit = half_width / geodesy.MEAN_RADIUS
+
+        def within(queries, positions):
+            return segment_pair_angles(starts[queries], ends[queries], self._starts[positions],
+                                       self._ends[positions]) <= limit
+
+        pieces, obstacle_indices = self.search(centres, radii, within)
+        pairs = np.unique(owners[pieces] * max(len(self.records), 1) + obstacle_indices)
+        return pairs // max(len(self.records), 1), pairs % max(len(self.records), 1)
+
+    def max_elevations(self, query_indices: np.ndarray, obstacle_indices: np.ndarray, count: int) -> tuple:
+        """
+        Args:
+            query_indices (np.ndarray): Query of each pair, from query_radius or query_corridor.
+            obstacle_indices (np.ndarray): Obstacle of each pair.
+            count (int): Number of queries.
+        Returns:
+            max_elevations, highest_indices (tuple[np.ndarray]): For each query, the highest elevation in metres of the
+              obstacles paired with it and the index of that obstacle.  NaN and -1 where none has an elevation.
+        """
+        elevations = self.elevations[obstacle_indices]
+        known = ~np.isnan(elevations)
+        query_indices, obstacle_indices, elevations = query_indices[known], obstacle_indices[known], elevations[known]
+        # Sorted by query and then elevation, the last pair of each query holds its highest obstacle
+        order = np.lexsort((elevations, query_indices))
+        last = order[np.r_[query_indices[order][1:] != query_indices[order][:-1], True]] if len(order) else order
+        max_elevations = np.full(count, np.nan)
+        highest_indices = np.full(count, -1, dtype=np.int64)
+        max_elevations[query_indices[last]] = elevations[last]
+        highest_indices[query_indices[last]] = obstacle_indices[last]
+        return max_elevations, highest_indices
+
+    def get_clearances(self, identifiers, query_indices: np.ndarray, obstacle_indices: np.ndarray) -> list:
+        """
+        Args:
+            identifiers (Sequence[str]): gml:identifier of the feature behind each query.
+            query_indices (np.ndarray): Query of each pair, from query_radius or query_corridor.
+            obstacle_indices (np.ndarray): Obstacle of each pair.
+        Returns:
+            clearances (list[Clearance]): One for each query, in order.
+        """
+        counts = np.bincount(query_indices, minlength=len(identifiers))
+        max_elevations, highest_indices = self.max_elevations(query_indices, obstacle_indices, len(identifiers))
+        return [Clearance(identifier, int(counts[i]), float(max_elevations[i]),
+                          None if highest_indices[i] < 0 else str(self.identifiers[highest_indices[i]]))
+                for i, identifier in enumerate(identifiers)]
+
+
+def airport_clearances(obstacles: ObstacleIndex, feature_records, radius: float) -> list:
+    """
+    Args:
+        obstacles (ObstacleIndex): The prepared obstacles.
+        feature_records (Iterable[records.FeatureRecord]): Records of any type, only airports with an ARP are queried.
+        radius (float): Search radius around each ARP in metres.
+    Returns:
+        clearances (list[Clearance]): The obstacles within radius of each airport's ARP.
+    """
+    airports = [record for record in feature_records
+                if record.feature_type == 'AirportHeliport' and geometry.envelope(record.geometry) is not None]
+    points = np.array([record.geometry[0][0, :2] for record in airports], dtype=np.float64).reshape(-1, 2)
+    pairs = obstacles.query_radius(points[:, 0], points[:, 1], radius)
+    return obstacles.get_clearances([record.identifier for record in airports], *pairs)
+
+
+def route_clearances(obstacles: ObstacleIndex, feature_records, half_width: float,
+                     tolerance=geodesy.DEFAULT_TOLERANCE) -> list:
+    """
+    Args:
+        obstacles (ObstacleIndex): The prepared obstacles.
+        feature_records (Iterable[records.FeatureRecord]): Records of any type, only route segments with geometry are
+          queried.
+        half_width (float): Largest distance in metres either side of each segment.
+        tolerance (float): Largest chord error of densified arcs and circles in metres.
+    Returns:
+        clearances (list[Clearance]): The obstacles within each route segment's corridor.
+    """
+    segments = [record for record in feature_records
+                if record.feature_type == 'RouteSegment' and geometry.envelope(record.geometry) is not None]
+    pairs = obstacles.query_corridor(geodesy.densify_all([record.geometry for record in segments], tolerance),
+                                     half_width)
+    return obstacles.get_clearances([record.identifier for record in segments], *pairs)
+
+
+def clearances_in_file(aixm_file, radius: float, half_width: float, workers=None,
+                       tolerance=geodesy.DEFAULT_TOLERANCE) -> tuple:
+    """
+    Args:
+        aixm_file: Path to the AIXM file.
+        radius (float): Search radius around each AirportHeliport ARP in metres.
+        half_width (float): Largest distance in metres either side of each RouteSegment.
+        workers (int): Extract the features across this many processes.
+        tolerance (float): Largest chord error of densified arcs and circles in metres.
+    Returns:
+        airports, routes (tuple[list[Clearance]]): The obstacles near each airport and along each route segment.
+    """
+    feature_records = get_feature_records(aixm_file, {'VerticalStructure', 'AirportHeliport', 'RouteSegment'},
+                                          workers=workers)
+    obstacles = ObstacleIndex(feature_records, tolerance=tolerance)
+    return (airport_clearances(obstacles, feature_records, radius),
+            route_clearances(obstacles, feature_records, half_width, tolerance))
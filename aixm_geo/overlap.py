@@ -0,0 +1,179 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from . import geodesy
+from .containment import AirspaceContainment, points_in_ring
+
+# Distance in degrees within which a point is treated as lying on a ring.  Neighbouring airspaces usually share
+# boundary coordinates exactly, so sharing a border is not an overlap
+BOUNDARY_TOLERANCE = 1e-7
+
+# Largest number of point or edge pairs compared at once, bounding the temporary arrays
+_CHUNK_PAIRS = 1 << 20
+
+
+class Overlap(NamedTuple):
+    """A pair of airspaces whose volumes intersect, and the altitude band they share in metres."""
+    index_a: int
+    index_b: int
+    identifier_a: str
+    identifier_b: str
+    lower_limit: float
+    upper_limit: float
+
+
+def candidate_pairs(envelopes: np.ndarray, lower_limits: np.ndarray, upper_limits: np.ndarray) -> np.ndarray:
+    """
+    Sort and sweep.  Envelopes are sorted by minimum longitude, so each envelope only needs comparing with the run
+    of envelopes which start before it ends.
+
+    Args:
+        envelopes (np.ndarray): Array of shape (N, 4) of (min_lat, min_lon, max_lat, max_lon).
+        lower_limits (np.ndarray): Lower limit of each volume.
+        upper_limits (np.ndarray): Upper limit of each volume.
+    Returns:
+        pairs (np.ndarray): Array of shape (M, 2) of indices, lower index first, of every pair whose envelopes meet and
+          whose vertical ranges share a band of some thickness.
+    """
+    order = np.argsort(envelopes[:, 1], kind='stable')
+    min_lons = envelopes[order, 1]
+    pairs = []
+    for position, i in enumerate(order):
+        stop = np.searchsorted(min_lons, envelopes[i, 3], 'right')
+        others = order[position + 1:stop]
+        others = others[(envelopes[others, 0] <= envelopes[i, 2]) & (envelopes[i, 0] <= envelopes[others, 2])
+                        & (np.maximum(lower_limits[others], lower_limits[i])
+                           < np.minimum(upper_limits[others], upper_limits[i]))]
+        if len(others):
+            pairs.append(np.column_stack((np.minimum(others, i), np.maximum(others, i))))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.concatenate(pairs).astype(np.int64)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+def boundary_distances(points: np.ndarray, ring: np.ndarray) -> np.ndarray:
+    """
+    Args:
+        points (np.ndarray): (lat, lon) array of points.
+        ring (np.ndarray): (lat, lon) array of a closed ring.
+    Returns:
+        distances (np.ndarray): Planar distance in degrees from each point to the nearest edge of the ring.
+    """
+    starts, vectors = ring[None, :-1], (ring[1:] - ring[:-1])[None]
+    lengths = np.maximum((vectors ** 2).sum(axis=2), 1e-300)
+    distances = np.empty(len(points))
+    chunk = max(_CHUNK_PAIRS // max(len(ring) - 1, 1), 1)
+    for start in range(0, len(points), chunk):
+        offsets = points[start:start + chunk, None, :] - starts
+        fractions = np.clip((offsets * vectors).sum(axis=2) / lengths, 0.0, 1.0)
+        nearest = offsets - fractions[:, :, None] * vectors
+        distances[start:start + chunk] = np.sqrt((nearest ** 2).sum(axis=2)).min(axis=1)
+    return distances
+
+
+def edges_cross(edges_a: tuple, edges_b: tuple) -> bool:
+    """
+    Args:
+        edges_a (tuple[np.ndarray]): (lat, lon) arrays of the start and end of each edge.
+        edges_b (tuple[np.ndarray]): (lat, lon) arrays of the start and end of each edge.
+    Returns:
+        cross (bool): True if an edge of edges_a properly crosses an edge of edges_b.  Edges which only touch or run
+          along one another do not cross.
+    """
+    def orientation(starts, ends, points):
+        return ((ends[..., 0] - starts[..., 0]) * (points[..., 1] - starts[..., 1])
+                - (ends[..., 1] - starts[..., 1]) * (points[..., 0] - starts[..., 0]))
+
+    b_starts, b_ends = edges_b[0][None, :, :], edges_b[1][None, :, :]
+    chunk = max(_CHUNK_PAIRS // max(len(b_starts[0]), 1), 1)
+    for start in range(0, len(edges_a[0]), chunk):
+        a_starts, a_ends = edges_a[0][start:start + chunk, None, :], edges_a[1][start:start + chunk, None, :]
+        a_sides = orientation(a_starts, a_ends, b_starts) * orientation(a_starts, a_ends, b_ends)
+        b_sides = orientation(b_starts, b_ends, a_starts) * orientation(b_starts, b_ends, a_ends)
+        if ((a_sides < 0) & (b_sides < 0)).any():
+            return True
+    return False
+
+
+def get_edges(ring: np.ndarray, low: np.ndarray, high: np.ndarray) -> tuple:
+    """
+    Args:
+        ring (np.ndarray): (lat, lon) array of a closed ring.
+        low (np.ndarray): (min_lat, min_lon) of a box.
+        high (np.ndarray): (max_lat, max_lon) of the box.
+    Returns:
+        starts, ends (tuple[np.ndarray]): The start and end of each of the ring's edges whose envelope meets the box.
+    """
+    starts, ends = ring[:-1], ring[1:]
+    keep = ((np.minimum(starts, ends) <= high) & (np.maximum(starts, ends) >= low)).all(axis=1)
+    return starts[keep], ends[keep]
+
+
+def strictly_inside(ring_a: np.ndarray, ring_b: np.ndarray) -> tuple:
+    """
+    Args:
+        ring_a (np.ndarray): (lat, lon) array of a closed ring.
+        ring_b (np.ndarray): (lat, lon) array of a closed ring.
+    Returns:
+        inside, on_boundary (tuple[bool]): Whether any vertex or edge midpoint of ring_a lies inside ring_b away from
+          its boundary, and whether every one of them lies on ring_b's boundary.
+    """
+    points = np.vstack((ring_a[:-1], (ring_a[:-1] + ring_a[1:]) / 2.0))
+    on_boundary = boundary_distances(points, ring_b) <= BOUNDARY_TOLERANCE
+    inside = points_in_ring(points[:, 0], points[:, 1], ring_b) & ~on_boundary
+    return bool(inside.any()), bool(on_boundary.all())
+
+
+def rings_overlap(ring_a: np.ndarray, ring_b: np.ndarray) -> bool:
+    """
+    Args:
+        ring_a (np.ndarray): (lat, lon) array of a closed ring.
+        ring_b (np.ndarray): (lat, lon) array of a closed ring.
+    Returns:
+        overlap (bool): True if the interiors of the rings intersect.  Rings which only share boundary do not overlap.
+    """
+    # Only edges within the shared part of the envelopes can meet
+    low = np.maximum(ring_a.min(axis=0), ring_b.min(axis=0)) - BOUNDARY_TOLERANCE
+    high = np.minimum(ring_a.max(axis=0), ring_b.max(axis=0)) + BOUNDARY_TOLERANCE
+    if (low > high).any():
+        return False
+    if edges_cross(get_edges(ring_a, low, high), get_edges(ring_b, low, high)):
+        return True
+
+    a_inside, a_on_boundary = strictly_inside(ring_a, ring_b)
+    if a_inside:
+        return True
+    b_inside, b_on_boundary = strictly_inside(ring_b, ring_a)
+    # Rings which lie entirely along one another are the same shape
+    return b_inside or (a_on_boundary and b_on_boundary)
+
+
+def find_overlaps(airspaces: AirspaceContainment) -> list:
+    """
+    Args:
+        airspaces (containment.AirspaceContainment): The prepared airspaces.
+    Returns:
+        overlaps (list[Overlap]): Every pair of airspaces whose volumes intersect, ordered by their indices.
+    """
+    overlaps = []
+    lower_limits, upper_limits = airspaces.lower_limits, airspaces.upper_limits
+    for i, j in candidate_pairs(airspaces.envelopes, lower_limits, upper_limits):
+        if rings_overlap(airspaces.get_ring(i), airspaces.get_ring(j)):
+            overlaps.append(Overlap(int(i), int(j), str(airspaces.identifiers[i]), str(airspaces.identifiers[j]),
+                                    float(max(lower_limits[i], lower_limits[j])),
+                                    float(min(upper_limits[i], upper_limits[j]))))
+    return overlaps
+
+
+def find_overlaps_in_file(aixm_file, workers=None, tolerance=geodesy.DEFAULT_TOLERANCE) -> list:
+    """
+    Args:
+        aixm_file: Path to the AIXM file.
+        workers (int): Extract the airspaces across this many processes.
+        tolerance (float): Largest chord error of densified arcs and circles in metres.
+    Returns:
+        overlaps (list[Overlap]): Every pair of the file's airspaces whose volumes intersect.
+    """
+    return find_overlaps(AirspaceContainment.from_file(aixm_file, workers=workers, tolerance=tolerance))
@@ -0,0 +1,149 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from lxml import etree
+
+from . import util
+from .factory import AixmFeatureFactory, FEATURE_CLASSES
+
+
+def extract_chunk(chunk: list, numeric=False) -> list:
+    """
+    Rebuilds each serialised message:hasMember subtree in the chunk and extracts its geographic information.  Runs
+    inside the worker processes.
+    Args:
+        chunk(list[bytes]): Serialised message:hasMember elements.
+        numeric(bool): Whether to extract numeric coordinates rather than coordinate strings.
+    Returns:
+        geo_dicts(list[dict]): The geographic information of each feature, in the order given.
+    """
+    geo_dicts = []
+    for serialised_member in chunk:
+        subroot = etree.fromstring(serialised_member)
+        aixm_feature = FEATURE_CLASSES[util.get_feature_type(subroot)](subroot, numeric=numeric)
+        geo_dicts.append(aixm_feature.get_geographic_information())
+    return geo_dicts
+
+
+def extract_record_chunk(chunk: list) -> list:
+    """
+    Rebuilds each serialised message:hasMember subtree in the chunk and extracts a detached FeatureRecord from it.
+    Runs inside the worker processes.
+    Args:
+        chunk(list[bytes]): Serialised message:hasMember elements.
+    Returns:
+        records(list[records.FeatureRecord]): A record for each feature, in the order given.
+    """
+    feature_records = []
+    for serialised_member in chunk:
+        subroot = etree.fromstring(serialised_member)
+        feature_records.append(FEATURE_CLASSES[util.get_feature_type(subroot)](subroot).to_record())
+    return feature_records
+
+
+class ParallelFeatureExtractor:
+    """
+    Runs get_geographic_information() for every supported feature across a pool of worker processes.
+
+    The AIXM file is streamed in the parent process and each supported message:hasMember subtree is serialised and
+    batched into chunks which are sent to the workers.  Results are yielded in document order regardless of which
+    worker finishes first.
+    """
+    __slots__ = ['_factory', '_workers', '_chunk_size', '_numeric']
+
+    def __init__(self, aixm_file, workers=None, chunk_size=64, numeric=False, feature_types=None, bbox=None):
+        self._factory = AixmFeatureFactory(aixm_file, stream=True, feature_types=feature_types, bbox=bbox)
+        self._numeric = numeric
+        self._workers = workers or os.cpu_count()
+        self._chunk_size = chunk_size
+
+    def __iter__(self):
+        return self.get_geographic_information()
+
+    @property
+    def errors(self):
+        return self._factory.errors
+
+    def get_chunks(self):
+        """
+        Serialises the supported message:hasMember elements into lists of up to chunk_size members.
+        Returns:
+            chunks (generator): A generator of lists of serialised members.
+        """
+        chunk = []
+        for member in self._factory.stream_members():
+            if self._factory.accepts(member) and self._factory.supports(util.get_feature_type(member)):
+                chunk.append(etree.tostring(member))
+                if len(chunk) == self._chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    def get_geographic_information(self):
+        """
+        Returns:
+            geo_dicts (generator): A generator of geographic information dicts in document order.
+        """
+        return self.map_chunks(partial(extract_chunk, numeric=self._numeric))
+
+    def get_feature_records(self):
+        """
+        Returns:
+            records (generator): A generator of records.FeatureRecord objects in document order.
+        """
+        return self.map_chunks(extract_record_chunk)
+
+    def map_chunks(self, extract):
+        """
+        Args:
+            extract (Callable): Picklable function run by the workers on each chunk, returning a list of results.
+        Returns:
+            results (generator): A generator of the results of every chunk in document order.
+        """
+        with ProcessPoolExecutor(max_workers=self._workers) as executor:
+            # Only keep a couple of chunks per worker in flight so large files aren't serialised up front
+            pending = deque()
+            for chunk in self.get_chunks():
+                pending.append(executor.submit(extract, chunk))
+                if len(pending) >= self._workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+
+def get_geographic_information(aixm_file, numeric=False, feature_types=None, bbox=None, workers=None) -> list:
+    """
+    Args:
+        aixm_file: Path to the AIXM file.
+        numeric (bool): Whether to extract numeric coordinates rather than coordinate strings.
+        feature_types (Iterable[str]): Only extract these feature types.
+        bbox (tuple): Only extract features meeting this (min_lat, min_lon, max_lat, max_lon) box.
+        workers (int): Extract across this many processes, or in this process if fewer than 2.
+    Returns:
+        geo_dicts (list[dict]): The geographic information of every supported feature in document order.
+    """
+    if workers and workers > 1:
+        return list(ParallelFeatureExtractor(aixm_file, workers=workers, numeric=numeric, feature_types=feature_types,
+                                             bbox=bbox))
+    return [aixm_feature.get_geographic_information() for aixm_feature in
+            AixmFeatureFactory(aixm_file, stream=True, numeric=numeric, feature_types=feature_types, bbox=bbox)]
+
+
+def get_feature_records(aixm_file, feature_types=None, bbox=None, workers=None) -> list:
+    """
+    Args:
+        aixm_file: Path to the AIXM file.
+        feature_types (Iterable[str]): Only extract these feature types.
+        bbox (tuple): Only extract features meeting this (min_lat, min_lon, max_lat, max_lon) box.
+        workers (int): Extract across this many processes, or in this process if fewer than 2.
+    Returns:
+        records (list[records.FeatureRecord]): A record for every supported feature in document order.
+    """
+    if workers and workers > 1:
+        return list(ParallelFeatureExtractor(aixm_file, workers=workers, feature_types=feature_types,
+                                             bbox=bbox).get_feature_records())
+    return list(AixmFeatureFactory(aixm_file, stream=True, feature_types=feature_types,
+                                   bbox=bbox).get_feature_records())
@@ -0,0 +1,60 @@
+from typing import NamedTuple, Union
+
+from . import util
+
+# Keys of the geographic information dicts which are held in dedicated FeatureRecord fields
+_RECORD_KEYS = frozenset((
+    'type', 'name', 'coordinates', 'elevation', 'elevation_uom', 'lower_layer', 'lower_layer_uom', 'upper_layer',
+    'upper_layer_uom', 'upper_layer_reference',
+))
+
+
+class FeatureRecord(NamedTuple):
+    """
+    A compact, detached copy of a feature's parsed values.  Records hold no lxml references, so the document can be
+    freed as soon as they have been extracted, and they pickle cheaply for multiprocessing.
+
+    Geometry is held as in numeric mode, a tuple of float64 coordinate arrays, Arc and Circle records.  Elevations
+    and vertical limits are in metres, or None where the feature has none or the value is not numeric (e.g. FLOOR).
+    """
+    feature_type: str
+    identifier: str
+    name: str
+    designator: Union[str, None]
+    geometry: tuple
+    elevation: Union[float, None]
+    lower_limit: Union[float, None]
+    upper_limit: Union[float, None]
+    upper_limit_reference: Union[str, None]
+    properties: dict
+
+
+def from_geo_dict(geo_dict: dict, identifier: str, designator: str) -> FeatureRecord:
+    """
+    Args:
+        geo_dict (dict): Geographic information from a numeric feature.
+        identifier (str): The feature's gml:identifier.
+        designator (str): The feature's aixm:designator.
+    Returns:
+        record (FeatureRecord): The record holding the values of geo_dict.
+    """
+    elevation = lower_limit = upper_limit = None
+    if 'elevation' in geo_dict:
+        elevation = util.to_metres(geo_dict['elevation'], geo_dict['elevation_uom'])
+    if 'lower_layer' in geo_dict:
+        lower_limit = util.to_metres(geo_dict['lower_layer'], geo_dict['lower_layer_uom'])
+    if 'upper_layer' in geo_dict:
+        upper_limit = util.to_metres(geo_dict['upper_layer'], geo_dict['upper_layer_uom'])
+
+    return FeatureRecord(
+        feature_type=geo_dict['type'],
+        identifier=identifier,
+        name=geo_dict.get('name', 'Unknown'),
+        designator=None if designator == 'Unknown' else designator,
+        geometry=tuple(geo_dict['coordinates']),
+        elevation=elevation,
+        lower_limit=lower_limit,
+        upper_limit=upper_limit,
+        upper_limit_reference=geo_dict.get('upper_layer_reference'),
+        properties={key: value for key, value in geo_dict.items() if key not in _RECORD_KEYS},
+    )
@@ -0,0 +1,217 @@
+from typing import NamedTuple, Union
+
+from . import util
+from . import xpaths
+from .settings import NAMESPACES
+
+_IDENTIFIER_TAG = f'{{{NAMESPACES["gml"]}}}identifier'
+_HREF = f'{{{NAMESPACES["xlink"]}}}href'
+_TITLE = f'{{{NAMESPACES["xlink"]}}}title'
+
+# Positions which locate a feature, in order of preference
+_POSITION_XPATHS = ('.//aixm:location//gml:pos', './/aixm:ARP//gml:pos')
+
+# Routes have no aixm:designator, it is built from these parts, e.g. U, A and 4 for UA4
+_ROUTE_DESIGNATOR_PARTS = ('designatorPrefix', 'designatorSecondLetter', 'designatorNumber')
+
+
+class Reference(NamedTuple):
+    """
+    The values of a feature needed to describe a reference to it.  Held detached from the document, so references
+    remain resolvable after a streamed member has been cleared.
+    """
+    feature_type: str
+    identifier: str
+    designator: Union[str, None]
+    name: Union[str, None]
+    position: Union[tuple, None]
+
+    @property
+    def label(self) -> str:
+        """The designator, else the name, else the identifier."""
+        return self.designator or self.name or self.identifier
+
+
+class Contributor(NamedTuple):
+    """An airspace contributing to a composed airspace, see aixm_features.Airspace.get_contributors."""
+    operation: str
+    sequence: Union[int, None]
+    dependency: str
+    identifier: str
+    reference: Union[Reference, None]
+
+
+def get_identifier(href: str) -> str:
+    """
+    Args:
+        href (str): An xlink:href, e.g. 'urn:uuid:a14a8751-...' or '#uuid.a14a8751-...'.
+    Returns:
+        identifier (str): The gml:identifier the href refers to.
+    """
+    if href.startswith('urn:uuid:'):
+        return href[9:]
+    if href.startswith('#'):
+        href = href[1:]
+        return href[5:] if href.startswith('uuid.') else href
+    return href
+
+
+def get_href(element) -> Union[str, None]:
+    """
+    Args:
+        element (etree.Element): The referencing element, e.g. aixm:routeFormed.
+    Returns:
+        href (Union[str, None]): The element's xlink:href, or that of its first descendant with one.
+    """
+    href = element.get(_HREF)
+    if href is None:
+        for descendant in element.iterdescendants():
+            href = descendant.get(_HREF)
+            if href is not None:
+                break
+    return href
+
+
+def get_title(element) -> Union[str, None]:
+    """
+    Args:
+        element (etree.Element): The referencing element.
+    Returns:
+        title (Union[str, None]): The xlink:title accompanying the element's xlink:href, if any.
+    """
+    if element.get(_HREF) is not None:
+        return element.get(_TITLE)
+    for descendant in element.iterdescendants():
+        if descendant.get(_HREF) is not None:
+            return descendant.get(_TITLE)
+    return None
+
+
+def to_reference(member) -> Union[Reference, None]:
+    """
+    Args:
+        member (etree.Element): A message:hasMember element of any feature type.
+    Returns:
+        reference (Union[Reference, None]): The feature's values, newer timeslices taking precedence, or None if it
+          has no gml:identifier.
+    """
+    feature = member[-1]
+    identifier = feature.find(_IDENTIFIER_TAG)
+    if identifier is None or not identifier.text:
+        return None
+
+    scope = list(reversed(util.parse_timeslice(member))) or [feature]
+
+    def first_text(xpath):
+        for timeslice in scope:
+            element = xpaths.find_first(timeslice, xpath)
+            if element is not None and element.text:
+                return element.text.strip()
+        return None
+
+    feature_type = util.get_feature_type(member)
+    designator = first_text('.//aixm:designator')
+    if designator is None and feature_type == 'Route':
+        parts = [first_text(f'.//aixm:{part}') for part in _ROUTE_DESIGNATOR_PARTS]
+        designator = ''.join(part for part in parts if part) or None
+
+    position = None
+    for xpath in _POSITION_XPATHS:
+        pos = first_text(xpath)
+        if pos:
+            lat, lon = pos.split()[:2]
+            position = (float(lat), float(lon))
+            break
+
+    return Reference(feature_type, identifier.text.strip(), designator, first_text('.//aixm:name'), position)
+
+
+class ReferenceResolver:
+    """
+    Maps gml:identifier to a Reference for every feature in a document, of any type, so xlink:href references such as
+    route segment end points, the route a segment forms or an airspace's contributors resolve with a dict lookup
+    rather than a search of the document.
+
+    Build it once with from_file or from_tree, or pass an empty resolver to AixmFeatureFactory with fill_resolver=True
+    to fill it while streaming.  A resolver filled while streaming only resolves references to features earlier in the
+    document.
+    """
+    __slots__ = ['_references']
+
+    def __init__(self, references=None):
+        self._references = {} if references is None else dict(references)
+
+    def __len__(self):
+        return len(self._references)
+
+    def __contains__(self, href):
+        return get_identifier(href) in self._references
+
+    def __getitem__(self, href) -> Reference:
+        return self._references[get_identifier(href)]
+
+    @classmethod
+    def from_file(cls, aixm_file) -> 'ReferenceResolver':
+        """
+        Args:
+            aixm_file: Path to the AIXM file, which is streamed.
+        Returns:
+            resolver (ReferenceResolver): A resolver for every feature in the file.
+        """
+        # Imported here, factory builds features which import this module
+        from .factory import AixmFeatureFactory
+
+        resolver = cls()
+        for member in AixmFeatureFactory(aixm_file, stream=True).stream_members():
+            resolver.add_member(member)
+        return resolver
+
+    @classmethod
+    def from_tree(cls, root) -> 'ReferenceResolver':
+        """
+        Args:
+            root (etree.ElementTree): A parsed AIXM document.
+        Returns:
+            resolver (ReferenceResolver): A resolver for every feature in the document.
+        """
+        resolver = cls()
+        for member in root.iterfind('.//message:hasMember', NAMESPACES):
+            resolver.add_member(member)
+        return resolver
+
+    def add_member(self, member) -> Union[Reference, None]:
+        """
+        Indexes a message:hasMember element.  A feature seen again, e.g. in a later member holding a newer timeslice,
+        is merged into the earlier entry, see add.
+        Args:
+            member (etree.Element): A message:hasMember element of any feature type.
+        Returns:
+            reference (Union[Reference, None]): The reference indexed, or None if the feature has no identifier.
+        """
+        reference = to_reference(member)
+        if reference is not None:
+            reference = self.add(reference)
+        return reference
+
+    def add(self, reference: Reference) -> Reference:
+        """
+        Args:
+            reference (Reference): The reference to index.  Its values which are not None replace those of any earlier
+              entry for the feature, so a later delta holding only some values keeps the rest.
+        Returns:
+            reference (Reference): The merged reference indexed.
+        """
+        existing = self._references.get(reference.identifier)
+        if existing is not None:
+            reference = Reference(*(new if new is not None else old for new, old in zip(reference, existing)))
+        self._references[reference.identifier] = reference
+        return reference
+
+    def resolve(self, href: str) -> Union[Reference, None]:
+        """
+        Args:
+            href (str): An xlink:href or gml:identifier.
+        Returns:
+            reference (Union[Reference, None]): The referenced feature, or None if it is not in the resolver.
+        """
+        return self._references.get(get_identifier(href))
@@ -0,0 +1,247 @@
+import heapq
+from typing import NamedTuple, Union
+
+import numpy as np
+
+from . import geodesy
+from .parallel import get_feature_records
+
+
+class RoutePath(NamedTuple):
+    """
+    A path through the route network.  points holds the gml:identifier of every point passed, one more than the
+    segments, and forwards whether each segment is flown from its start to its end.
+    """
+    length: float
+    points: tuple
+    segments: tuple
+    forwards: tuple
+
+
+def to_csr(starts: np.ndarray, ends: np.ndarray, node_count: int) -> tuple:
+    """
+    Args:
+        starts (np.ndarray): Start node of each segment.
+        ends (np.ndarray): End node of each segment.
+        node_count (int): Number of nodes.
+    Returns:
+        offsets, neighbours, segments, forwards (tuple[np.ndarray]): Compressed sparse rows of the undirected graph.
+          The links of node i are entries offsets[i] to offsets[i + 1] - 1, each holding the node reached, the segment
+          crossed and whether it is crossed from its start to its end.
+    """
+    sources = np.concatenate((starts, ends))
+    order = np.argsort(sources, kind='stable')
+    neighbours = np.concatenate((ends, starts))[order]
+    segments = np.tile(np.arange(len(starts), dtype=np.int64), 2)[order]
+    forwards = np.repeat([True, False], len(starts))[order]
+    offsets = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=node_count), out=offsets[1:])
+    return offsets, neighbours, segments, forwards
+
+
+def get_components(starts: np.ndarray, ends: np.ndarray, node_count: int) -> np.ndarray:
+    """
+    Args:
+        starts (np.ndarray): Start node of each segment.
+        ends (np.ndarray): End node of each segment.
+        node_count (int): Number of nodes.
+    Returns:
+        components (np.ndarray): For each node, the lowest node it is connected to.
+    """
+    parents = list(range(node_count))
+
+    def find(node):
+        while parents[node] != node:
+            parents[node] = parents[parents[node]]
+            node = parents[node]
+        return node
+
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        start, end = find(start), find(end)
+        if start != end:
+            parents[max(start, end)] = min(start, end)
+    return np.array([find(node) for node in range(node_count)], dtype=np.int64)
+
+
+class RouteNetwork:
+    """
+    The network formed by RouteSegment features, joined at the points their aixm:start and aixm:end refer to.
+
+    Segments are held as arrays of start and end nodes, lengths and route identifiers, and the graph as compressed
+    sparse rows, so connectivity and shortest path queries never return to the file.  Segments are treated as
+    usable in either direction.  Lengths are the geodesic length of each segment's geometry in metres, measured with
+    a single call to Geod.inv.  Segments without geometry, or without both end points, are left out.
+    """
+    __slots__ = ['records', 'point_identifiers', 'segment_identifiers', 'route_identifiers', 'starts', 'ends',
+                 'lengths', 'offsets', 'neighbours', 'link_segments', 'link_forwards', 'components', '_nodes',
+                 '_polylines']
+
+    def __init__(self, feature_records, tolerance=geodesy.DEFAULT_TOLERANCE):
+        """
+        Args:
+            feature_records (Iterable[records.FeatureRecord]): Records of any type, only route segments are joined.
+            tolerance (float): Largest chord error of densified arcs and circles in metres.
+        """
+        records = [record for record in feature_records if record.feature_type == 'RouteSegment'
+                   and record.properties.get('start_identifier') and record.properties.get('end_identifier')]
+        polylines = geodesy.densify_all([record.geometry for record in records], tolerance)
+        self.records = [record for record, polyline in zip(records, polylines) if len(polyline)]
+        self._polylines = [polyline for polyline in polylines if len(polyline)]
+
+        self.segment_identifiers = np.array([record.identifier for record in self.records], dtype=str)
+        self.route_identifiers = np.array([record.properties.get('route_identifier') or ''
+                                           for record in self.records], dtype=str)
+        ends = np.array([(record.properties['start_identifier'], record.properties['end_identifier'])
+                         for record in self.records], dtype=str).reshape(-1, 2)
+        self.point_identifiers, nodes = np.unique(ends, return_inverse=True)
+        nodes = nodes.reshape(-1, 2).astype(np.int64)
+        self.starts, self.ends = nodes[:, 0], nodes[:, 1]
+        self._nodes = {identifier: i for i, identifier in enumerate(self.point_identifiers.tolist())}
+        self.lengths = geodesy.polyline_lengths(self._polylines)
+
+        node_count = len(self.point_identifiers)
+        self.offsets, self.neighbours, self.link_segments, self.link_forwards = to_csr(self.starts, self.ends,
+                                                                                       node_count)
+        self.components = get_components(self.starts, self.ends, node_count)
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    def from_file(cls, aixm_file, workers=None, tolerance=geodesy.DEFAULT_TOLERANCE):
+        """
+        Args:
+            aixm_file: Path to the AIXM file.
+            workers (int): Extract the route segments across this many processes.
+            tolerance (float): Largest chord error of densified arcs and circles in metres.
+        Returns:
+            network (RouteNetwork): The file's route segments, joined into a network.
+        """
+        return cls(get_feature_records(aixm_file, {'RouteSegment'}, workers=workers), tolerance)
+
+    def get_node(self, point_identifier: str) -> int:
+        """
+        Args:
+            point_identifier (str): gml:identifier of a point, e.g. a DesignatedPoint or Navaid.
+        Returns:
+            node (int): The point's node.
+        Raises:
+            KeyError: If no segment starts or ends at the point.
+        """
+        return self._nodes[point_identifier]
+
+    def connected(self, point_a: str, point_b: str) -> bool:
+        """
+        Args:
+            point_a (str): gml:identifier of a point.
+            point_b (str): gml:identifier of a point.
+        Returns:
+            connected (bool): True if some path of segments joins the points.  False if either joins no segment.
+        """
+        if point_a not in self._nodes or point_b not in self._nodes:
+            return False
+        return bool(self.components[self._nodes[point_a]] == self.components[self._nodes[point_b]])
+
+    def shortest_path(self, point_a: str, point_b: str) -> Union[RoutePath, None]:
+        """
+        Dijkstra's algorithm over the compressed rows, skipping points in other components altogether.
+
+        Args:
+            point_a (str): gml:identifier of the point to start from.
+            point_b (str): gml:identifier of the point to reach.
+        Returns:
+            path (Union[RoutePath, None]): The shortest path by geodesic length, or None if the points are not
+              connected.
+        """
+        if not self.connected(point_a, point_b):
+            return None
+        source, target = self._nodes[point_a], self._nodes[point_b]
+        distances = np.full(len(self.point_identifiers), np.inf)
+        links = np.full(len(self.point_identifiers), -1, dtype=np.int64)
+        distances[source] = 0.0
+        queue = [(0.0, source)]
+        while queue:
+            distance, node = heapq.heappop(queue)
+            if node == target:
+                break
+            if distance > distances[node]:
+                continue
+            for link in range(self.offsets[node], self.offsets[node + 1]):
+                neighbour = self.neighbours[link]
+                reached = distance + self.lengths[self.link_segments[link]]
+                if reached < distances[neighbour]:
+                    distances[neighbour] = reached
+                    links[neighbour] = link
+                    heapq.heappush(queue, (reached, int(neighbour)))
+
+        nodes, path_links = [target], []
+        while nodes[-1] != source:
+            link = links[nodes[-1]]
+            path_links.append(link)
+            segment = self.link_segments[link]
+            nodes.append(int(self.starts[segment] if self.link_forwards[link] else self.ends[segment]))
+        nodes.reverse()
+        path_links.reverse()
+        return RoutePath(float(distances[target]), tuple(self.point_identifiers[nodes].tolist()),
+                         tuple(self.segment_identifiers[self.link_segments[path_links]].tolist()),
+                         tuple(self.link_forwards[path_links].tolist()))
+
+    def get_polyline(self, segments, forwards) -> np.ndarray:
+        """
+        Args:
+            segments (Iterable[int]): Indices of consecutive segments.
+            forwards (Iterable[bool]): Whether each segment runs from its start to its end.
+        Returns:
+            coordinates (np.ndarray): (lat, lon) array of the segments' geometry joined end to end, without repeating
+              the points they share.
+        """
+        parts = []
+        for segment, forward in zip(segments, forwards):
+            polyline = self._polylines[segment] if forward else self._polylines[segment][::-1]
+            parts.append(polyline[1:] if parts else polyline)
+        return np.vstack(parts) if parts else np.empty((0, 2))
+
+    def get_path_polyline(self, path: RoutePath) -> np.ndarray:
+        """
+        Args:
+            path (RoutePath): A path from shortest_path.
+        Returns:
+            coordinates (np.ndarray): (lat, lon) array of the path's geometry from start to end.
+        """
+        indices = {identifier: i for i, identifier in enumerate(self.segment_identifiers.tolist())}
+        return self.get_polyline([indices[identifier] for identifier in path.segments], path.forwards)
+
+    def get_route_polylines(self, route_identifier: str) -> list:
+        """
+        Chains a route's segments end to end, starting each chain from a point which ends only one of them where
+        there is one.
+
+        Args:
+            route_identifier (str): gml:identifier of the Route.
+        Returns:
+            polylines (list[np.ndarray]): (lat, lon) array of each unbroken run of the route's segments.  A route
+              with gaps or branches gives several.
+        """
+        remaining = set(np.flatnonzero(self.route_identifiers == route_identifier).tolist())
+        touching = {}
+        for segment in sorted(remaining):
+            touching.setdefault(int(self.starts[segment]), []).append(segment)
+            touching.setdefault(int(self.ends[segment]), []).append(segment)
+
+        polylines = []
+        while remaining:
+            ends = [node for node, segments in touching.items() if len(remaining.intersection(segments)) == 1]
+            node = min(ends) if ends else int(self.starts[min(remaining)])
+            segments, forwards = [], []
+            while True:
+                following = [segment for segment in touching[node] if segment in remaining]
+                if not following:
+                    break
+                segment = following[0]
+                remaining.discard(segment)
+                forward = bool(self.starts[segment] == node)
+                segments.append(segment)
+                forwards.append(forward)
+                node = int(self.ends[segment] if forward else self.starts[segment])
+            polylines.append(self.get_polyline(segments, forwards))
+        return polylines
@@ -7,3 +7,6 @@ NAMESPACES = {
     'message': "http://www.aixm.aero/schema/5.1/message",
     'xsi': "http://www.w3.org/2001/XMLSchema-instance"
 }
+
+# Library version, keep in step with setup.py.  Cached extractions are invalidated whenever it changes
+VERSION = '0.0.2'
@@ -0,0 +1,182 @@
+import numpy as np
+
+from . import geodesy
+from . import geometry
+from .factory import AixmFeatureFactory
+
+
+def str_order(envelopes: np.ndarray, node_capacity: int) -> np.ndarray:
+    """
+    Sort-Tile-Recursive ordering.  Envelopes are sorted by centre longitude into vertical slices, and each slice by
+    centre latitude, so runs of node_capacity consecutive envelopes are spatially compact.
+
+    Args:
+        envelopes (np.ndarray): Array of shape (N, 4) of (min_lat, min_lon, max_lat, max_lon).
+        node_capacity (int): Number of entries per node.
+    Returns:
+        order (np.ndarray): Indices of the envelopes in packing order.
+    """
+    count = len(envelopes)
+    centre_lats = (envelopes[:, 0] + envelopes[:, 2]) / 2
+    centre_lons = (envelopes[:, 1] + envelopes[:, 3]) / 2
+
+    slice_count = max(int(np.ceil(np.sqrt(count / node_capacity))), 1)
+    slice_size = slice_count * node_capacity
+    by_lon = np.argsort(centre_lons, kind='stable')
+    slices = np.split(by_lon, range(slice_size, count, slice_size))
+    return np.concatenate([s[np.argsort(centre_lats[s], kind='stable')] for s in slices])
+
+
+def clamp_distances(lat: float, lon: float, envelopes: np.ndarray) -> np.ndarray:
+    """
+    Args:
+        lat (float): Latitude of the query point.
+        lon (float): Longitude of the query point.
+        envelopes (np.ndarray): Array of shape (N, 4) of (min_lat, min_lon, max_lat, max_lon).
+    Returns:
+        distances (np.ndarray): Geodesic distance in metres from the point to the nearest point of each envelope, zero
+          for envelopes containing the point.
+    """
+    lats = np.clip(lat, envelopes[:, 0], envelopes[:, 2])
+    lons = np.clip(lon, envelopes[:, 1], envelopes[:, 3])
+    return geodesy.distances(lat, lon, lats, lons)
+
+
+class SpatialIndex:
+    """
+    An in-memory, STR packed R-tree over the envelopes of FeatureRecords.  The tree is built once and held as one
+    array of node envelopes per level, so each query is a handful of vectorised envelope tests rather than a scan of
+    every feature.
+
+    Envelopes cover the swept part of every Arc and the whole of every Circle, see geometry.envelope.  Radius and
+    nearest neighbour queries measure geodesic distance to a feature's envelope, which is exact for point features.
+    """
+    __slots__ = ['_records', '_envelopes', '_levels', '_node_capacity']
+
+    def __init__(self, feature_records, node_capacity=16):
+        records, envelopes = [], []
+        for record in feature_records:
+            envelope = geometry.envelope(record.geometry)
+            # Features without geometry can never match a spatial query
+            if envelope is not None:
+                records.append(record)
+                envelopes.append(envelope)
+
+        self._node_capacity = node_capacity
+        envelopes = np.array(envelopes, dtype=np.float64).reshape(-1, 4)
+        order = str_order(envelopes, node_capacity)
+        self._records = [records[i] for i in order]
+        self._envelopes = envelopes[order]
+        self._levels = self.pack(self._envelopes)
+
+    def __len__(self):
+        return len(self._records)
+
+    @classmethod
+    def from_file(cls, aixm_file, feature_types=None, node_capacity=16):
+        """
+        Args:
+            aixm_file: Path to the AIXM file.
+            feature_types (Iterable[str]): Only index these feature types.  None indexes every supported type.
+            node_capacity (int): Number of entries per node.
+        Returns:
+            spatial_index (SpatialIndex): An index of every supported feature in the file.
+        """
+        factory = AixmFeatureFactory(aixm_file, stream=True, feature_types=feature_types)
+        return cls(factory.get_feature_records(), node_capacity=node_capacity)
+
+    @property
+    def records(self):
+        return self._records
+
+    def pack(self, envelopes: np.ndarray) -> list:
+        """
+        Args:
+            envelopes (np.ndarray): The leaf envelopes in packing order.
+        Returns:
+            levels (list[np.ndarray]): Node envelopes for each level, leaves first.  The children of node i are entries
+              i * node_capacity to (i + 1) * node_capacity - 1 of the level below.
+        """
+        levels = [envelopes]
+        while len(levels[-1]) > self._node_capacity:
+            level = levels[-1]
+            starts = np.arange(0, len(level), self._node_capacity)
+            levels.append(np.column_stack((
+                np.minimum.reduceat(level[:, 0], starts), np.minimum.reduceat(level[:, 1], starts),
+                np.maximum.reduceat(level[:, 2], starts), np.maximum.reduceat(level[:, 3], starts),
+            )))
+        return levels
+
+    def candidates(self, bbox: tuple) -> np.ndarray:
+        """
+        Args:
+            bbox (tuple): (min_lat, min_lon, max_lat, max_lon)
+        Returns:
+            indices (np.ndarray): Indices of the records whose envelope meets the box, in packing order.
+        """
+        min_lat, min_lon, max_lat, max_lon = bbox
+        nodes = np.arange(len(self._levels[-1]))
+        for depth in range(len(self._levels) - 1, -1, -1):
+            envelopes = self._levels[depth][nodes]
+            nodes = nodes[(envelopes[:, 0] <= max_lat) & (min_lat <= envelopes[:, 2])
+                          & (envelopes[:, 1] <= max_lon) & (min_lon <= envelopes[:, 3])]
+            if depth:
+                children = (nodes[:, None] * self._node_capacity + np.arange(self._node_capacity)).ravel()
+                nodes = children[children < len(self._levels[depth - 1])]
+        return nodes
+
+    def query_bbox(self, bbox: tuple) -> list:
+        """
+        Args:
+            bbox (tuple): (min_lat, min_lon, max_lat, max_lon)
+        Returns:
+            records (list[records.FeatureRecord]): Every record whose envelope meets the box.
+        """
+        return [self._records[i] for i in self.candidates(bbox)]
+
+    def query_radius(self, lat: float, lon: float, radius: float) -> list:
+        """
+        Args:
+            lat (float): Latitude of the query point.
+            lon (float): Longitude of the query point.
+            radius (float): Search radius in metres.
+        Returns:
+            records (list[records.FeatureRecord]): Every record within the radius, nearest first.
+        """
+        indices = self.candidates(geometry.expand_envelope((lat, lon, lat, lon), radius))
+        if not len(indices):
+            return []
+        distances = clamp_distances(lat, lon, self._envelopes[indices])
+        within = np.flatnonzero(distances <= radius)
+        within = within[np.argsort(distances[within], kind='stable')]
+        return [self._records[indices[i]] for i in within]
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> list:
+        """
+        Args:
+            lat (float): Latitude of the query point.
+            lon (float): Longitude of the query point.
+            k (int): Number of records to return.
+        Returns:
+            nearest (list[tuple]): Up to k (record, distance in metres) pairs, nearest first.
+        """
+        k = min(k, len(self._records))
+        if k <= 0:
+            return []
+
+        # Grow a search box until it holds k records, then the k nearest must lie within the distance of the
+        # furthest of them
+        radius = 1000.0
+        while True:
+            indices = self.candidates(geometry.expand_envelope((lat, lon, lat, lon), radius))
+            if len(indices) >= k or radius > geodesy.HALF_CIRCUMFERENCE:
+                break
+            radius *= 4
+        distances = clamp_distances(lat, lon, self._envelopes[indices])
+        reach = np.partition(distances, k - 1)[k - 1]
+        if reach > radius:
+            indices = self.candidates(geometry.expand_envelope((lat, lon, lat, lon), reach))
+            distances = clamp_distances(lat, lon, self._envelopes[indices])
+
+        nearest = np.argsort(distances, kind='stable')[:k]
+        return [(self._records[indices[i]], float(distances[i])) for i in nearest]
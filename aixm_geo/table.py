@@ -0,0 +1,189 @@
+import numpy as np
+
+from . import geodesy
+from . import geometry
+from .parallel import get_feature_records
+
+# Columns by dtype.  Missing strings are empty and missing numbers NaN
+STRING_COLUMNS = ('feature_type', 'identifier', 'name', 'designator', 'upper_limit_reference')
+FLOAT_COLUMNS = ('elevation', 'lower_limit', 'upper_limit', 'min_lat', 'min_lon', 'max_lat', 'max_lon')
+COLUMNS = STRING_COLUMNS + FLOAT_COLUMNS
+
+
+class FeatureTable:
+    """
+    Holds the attributes of many features as typed NumPy columns so they can be filtered and aggregated with vectorised
+    operations, e.g. table[(table['feature_type'] == 'Airspace') & (table['upper_limit'] > 3000.0)].
+
+    Geometry is held as one (lat, lon) coordinate buffer with arcs and circles densified.  The coordinates of feature i
+    are coordinates[offsets[i]:offsets[i + 1]].  Limits and elevations are in metres, see records.FeatureRecord.
+    """
+    __slots__ = ['columns', 'coordinates', 'offsets']
+
+    def __init__(self, columns: dict, coordinates: np.ndarray, offsets: np.ndarray):
+        self.columns = columns
+        self.coordinates = coordinates
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, key):
+        """
+        Args:
+            key (Union[str, int, np.ndarray, slice]): A column name, or a row index, boolean mask, index array or
+              slice of rows.
+        Returns:
+            result (Union[np.ndarray, FeatureTable]): The column, or a new table holding the selected rows.  A single
+              row index gives a table of one row.
+        Raises:
+            IndexError: If a row index is out of range.
+        """
+        if isinstance(key, str):
+            return self.columns[key]
+        return self.take(np.atleast_1d(np.arange(len(self))[key]))
+
+    @classmethod
+    def from_records(cls, feature_records, tolerance=geodesy.DEFAULT_TOLERANCE):
+        """
+        Args:
+            feature_records (Iterable[records.FeatureRecord]): The records to tabulate.
+            tolerance (float): Largest chord error of densified arcs and circles in metres.
+        Returns:
+            table (FeatureTable): A row for each record, in the order given.
+        """
+        values = {column: [] for column in COLUMNS}
+        geometries = []
+        for record in feature_records:
+            for column in STRING_COLUMNS:
+                values[column].append(getattr(record, column) or '')
+            for column in ('elevation', 'lower_limit', 'upper_limit'):
+                value = getattr(record, column)
+                values[column].append(np.nan if value is None else value)
+            envelope = geometry.envelope(record.geometry) or (np.nan,) * 4
+            for column, value in zip(('min_lat', 'min_lon', 'max_lat', 'max_lon'), envelope):
+                values[column].append(value)
+            geometries.append(record.geometry)
+
+        # Every arc and circle in the table is solved in one batch
+        buffers = geodesy.densify_all(geometries, tolerance)
+        lengths = [len(coordinates) for coordinates in buffers]
+        columns = {column: np.array(values[column], dtype=str) for column in STRING_COLUMNS}
+        columns.update({column: np.array(values[column], dtype=np.float64) for column in FLOAT_COLUMNS})
+        coordinates = np.vstack(buffers) if buffers else np.empty((0, 2))
+        offsets = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+        return cls(columns, coordinates, offsets)
+
+    @classmethod
+    def from_file(cls, aixm_file, feature_types=None, bbox=None, workers=None, tolerance=geodesy.DEFAULT_TOLERANCE):
+        """
+        Args:
+            aixm_file: Path to the AIXM file.
+            feature_types (Iterable[str]): Only tabulate these feature types.
+            bbox (tuple): Only tabulate features meeting this (min_lat, min_lon, max_lat, max_lon) box.
+            workers (int): Extract records across this many processes.
+            tolerance (float): Largest chord error of densified arcs and circles in metres.
+        Returns:
+            table (FeatureTable): A row for every supported feature in the file.
+        """
+        return cls.from_records(get_feature_records(aixm_file, feature_types, bbox, workers), tolerance)
+
+    def get_coordinates(self, index: int) -> np.ndarray:
+        """
+        Args:
+            index (int): The row.
+        Returns:
+            coordinates (np.ndarray): (lat, lon) array of the row's geometry, a view of the coordinate buffer.
+        """
+        return self.coordinates[self.offsets[index]:self.offsets[index + 1]]
+
+    def take(self, indices) -> 'FeatureTable':
+        """
+        Args:
+            indices (array_like): Rows to keep, in the order wanted.
+        Returns:
+            table (FeatureTable): A new table holding the rows and their coordinates.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        starts = self.offsets[indices]
+        lengths = self.offsets[indices + 1] - starts
+        offsets = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+        # Index of every coordinate of every selected row, gathered in one step
+        gather = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        columns = {column: values[indices] for column, values in self.columns.items()}
+        return FeatureTable(columns, self.coordinates[gather], offsets)
+
+    def save(self, path):
+        """
+        Args:
+            path: Path of the .npz file to write.
+        """
+        np.savez_compressed(path, coordinates=self.coordinates, offsets=self.offsets, **self.columns)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Args:
+            path: Path of a .npz file written by save.
+        Returns:
+            table (FeatureTable): The saved table.
+        """
+        with np.load(path, allow_pickle=False) as npz:
+            columns = {column: npz[column] for column in COLUMNS}
+            return cls(columns, npz['coordinates'], npz['offsets'])
+
+    def to_arrow(self):
+        """
+        Requires pyarrow.
+        Returns:
+            table (pyarrow.Table): The columns, with the geometry as a large_list<struct<lat, lon>> column.
+        """
+        import pyarrow as pa
+
+        points = pa.StructArray.from_arrays([pa.array(self.coordinates[:, 0]), pa.array(self.coordinates[:, 1])],
+                                            names=['lat', 'lon'])
+        geometry_column = pa.LargeListArray.from_arrays(pa.array(self.offsets, type=pa.int64()), points)
+        arrays = [pa.array(self.columns[column]) for column in COLUMNS] + [geometry_column]
+        return pa.Table.from_arrays(arrays, names=list(COLUMNS) + ['geometry'])
+
+    @classmethod
+    def from_arrow(cls, arrow_table):
+        """
+        Args:
+            arrow_table (pyarrow.Table): A table produced by to_arrow.
+        Returns:
+            table (FeatureTable): The table's columns and geometry.
+        """
+        columns = {column: arrow_table.column(column).to_numpy() for column in COLUMNS}
+        for column in STRING_COLUMNS:
+            columns[column] = columns[column].astype(str)
+
+        geometry_column = arrow_table.column('geometry').combine_chunks()
+        offsets = geometry_column.offsets.to_numpy().astype(np.int64)
+        offsets -= offsets[0]
+        points = geometry_column.flatten()
+        coordinates = np.column_stack((points.field('lat').to_numpy(), points.field('lon').to_numpy()))
+        return cls(columns, coordinates.reshape(-1, 2), offsets)
+
+    def save_parquet(self, path):
+        """
+        Requires pyarrow.
+        Args:
+            path: Path of the .parquet file to write.
+        """
+        import pyarrow.parquet as pq
+
+        pq.write_table(self.to_arrow(), path)
+
+    @classmethod
+    def load_parquet(cls, path):
+        """
+        Requires pyarrow.
+        Args:
+            path: Path of a .parquet file written by save_parquet.
+        Returns:
+            table (FeatureTable): The saved table.
+        """
+        import pyarrow.parquet as pq
+
+        return cls.from_arrow(pq.read_table(path))
@@ -0,0 +1,231 @@
+from typing import NamedTuple, Union
+
+import numpy as np
+
+from . import util
+from . import xpaths
+from .settings import NAMESPACES
+from .factory import AixmFeatureFactory, FEATURE_CLASSES
+
+# Interpretations which carry the complete state of a feature, and those which only carry changes to it
+STATE_INTERPRETATIONS = frozenset(('BASELINE', 'SNAPSHOT'))
+DELTA_INTERPRETATIONS = frozenset(('PERMDELTA', 'TEMPDELTA'))
+
+# Stand-ins for open ended validity, e.g. <gml:endPosition indeterminatePosition="unknown"/>
+BEGINNING_OF_TIME = np.datetime64('0001-01-01T00:00:00', 'ms')
+END_OF_TIME = np.datetime64('9999-12-31T23:59:59', 'ms')
+
+
+class Timeline(NamedTuple):
+    """
+    The timeslices of a single feature, sorted by validTime begin, sequenceNumber then correctionNumber, split into
+    states and deltas.  begin and end arrays line up with the timeslices they were parsed from.
+    """
+    feature_type: str
+    member: object
+    states: tuple
+    state_begin: np.ndarray
+    state_end: np.ndarray
+    deltas: tuple
+    delta_begin: np.ndarray
+    delta_end: np.ndarray
+    delta_permanent: np.ndarray
+
+
+def to_datetime64(value) -> np.datetime64:
+    """
+    Args:
+        value (Union[str, datetime, np.datetime64]): A time, with strings in ISO 8601 form e.g. 2012-07-10T07:05:00Z.
+    Returns:
+        time (np.datetime64): The time at millisecond precision.
+    """
+    if isinstance(value, str):
+        value = value.strip().rstrip('Z')
+    return np.datetime64(value, 'ms')
+
+
+def parse_valid_time(timeslice) -> tuple:
+    """
+    Args:
+        timeslice: An aixm:timeSlice element.
+    Returns:
+        valid_time (tuple): (begin, end) as np.datetime64.  Unknown bounds are open ended and a gml:TimeInstant is
+          treated as valid from that instant onwards.
+    """
+    begin = xpaths.find_first(timeslice, './*/gml:validTime/*/gml:beginPosition')
+    if begin is None:
+        begin = xpaths.find_first(timeslice, './*/gml:validTime/*/gml:timePosition')
+    end = xpaths.find_first(timeslice, './*/gml:validTime/*/gml:endPosition')
+
+    begin = to_datetime64(begin.text) if begin is not None and begin.text else BEGINNING_OF_TIME
+    end = to_datetime64(end.text) if end is not None and end.text else END_OF_TIME
+    return begin, end
+
+
+def build_timeline(member, feature_type: str) -> Timeline:
+    """
+    Parses the validity of every timeslice in a feature once, so later lookups are array searches.  Timeslices
+    superseded by a higher correctionNumber are dropped, as are those cancelled by a correction without a valid time.
+    Args:
+        member: A message:hasMember element.
+        feature_type (str): The AIXM feature type, as returned by util.get_feature_type.
+    Returns:
+        timeline (Timeline): The feature's timeslices split into states and deltas.
+    """
+    # The latest correction of each (interpretation, sequenceNumber) supersedes the timeslices it corrects
+    latest = {}
+    for timeslice in member.findall('.//aixm:timeSlice', NAMESPACES):
+        interpretation = xpaths.find_first(timeslice, './*/aixm:interpretation')
+        interpretation = interpretation.text.strip() if interpretation is not None and interpretation.text else None
+        sequence_number = xpaths.find_first(timeslice, './*/aixm:sequenceNumber')
+        correction = xpaths.find_first(timeslice, './*/aixm:correctionNumber')
+        correction_number = int(correction.text) if correction is not None and correction.text else 0
+        if sequence_number is None or not sequence_number.text:
+            # Without a sequenceNumber a timeslice cannot be corrected, it is kept as it is
+            key = timeslice
+            sequence_number = 0
+        else:
+            sequence_number = int(sequence_number.text)
+            key = (interpretation, sequence_number)
+        if key in latest and latest[key][2] > correction_number:
+            continue
+        latest[key] = (interpretation, sequence_number, correction_number, timeslice)
+
+    states, deltas = [], []
+    for interpretation, sequence_number, correction_number, timeslice in latest.values():
+        valid_time = xpaths.find_first(timeslice, './*/gml:validTime')
+        if correction_number and valid_time is not None and valid_time.get('nilReason') == 'inapplicable':
+            # A correction without a valid time cancels the timeslice it corrects
+            continue
+        begin, end = parse_valid_time(timeslice)
+
+        entry = (begin, sequence_number, correction_number, end, interpretation, timeslice)
+        if interpretation in DELTA_INTERPRETATIONS:
+            deltas.append(entry)
+        else:
+            # Timeslices without a known interpretation are treated as complete states
+            states.append(entry)
+
+    states.sort(key=lambda x: x[:3])
+    deltas.sort(key=lambda x: x[:3])
+    return Timeline(
+        feature_type=feature_type,
+        member=member,
+        states=tuple(x[5] for x in states),
+        state_begin=np.array([x[0] for x in states], dtype='datetime64[ms]'),
+        state_end=np.array([x[3] for x in states], dtype='datetime64[ms]'),
+        deltas=tuple(x[5] for x in deltas),
+        delta_begin=np.array([x[0] for x in deltas], dtype='datetime64[ms]'),
+        delta_end=np.array([x[3] for x in deltas], dtype='datetime64[ms]'),
+        delta_permanent=np.array([x[4] == 'PERMDELTA' for x in deltas], dtype=bool),
+    )
+
+
+class TemporalIndex:
+    """
+    Indexes the timeslices of every supported feature in an AIXM file by gml:identifier so the state of a feature, or
+    of the whole dataset, can be resolved at any instant without re-scanning the document.
+
+    AIXM 5.1 timeslices have no versionBegin, so they are ordered by gml:validTime begin and then sequenceNumber.  The
+    state at time T is the latest BASELINE or SNAPSHOT beginning at or before T and still valid, overlaid by any
+    PERMDELTA beginning between it and T and then by any TEMPDELTA valid at T.
+    """
+    __slots__ = ['_factory', '_timelines', '_numeric']
+
+    def __init__(self, aixm_file, numeric=False, feature_types=None, bbox=None):
+        self._factory = AixmFeatureFactory(aixm_file, feature_types=feature_types, bbox=bbox)
+        self._numeric = numeric
+        self._timelines = {}
+        self.build()
+
+    def __len__(self):
+        return len(self._timelines)
+
+    def __contains__(self, identifier):
+        return identifier in self._timelines
+
+    @property
+    def errors(self):
+        return self._factory.errors
+
+    @property
+    def identifiers(self):
+        return list(self._timelines)
+
+    def build(self):
+        """
+        Parses the timeslice validity of every accepted, supported feature in the file.
+        """
+        for member in self._factory.root.iterfind('.//message:hasMember', NAMESPACES):
+            feature_type = util.get_feature_type(member)
+            if not self._factory.accepts(member) or not self._factory.supports(feature_type):
+                continue
+            identifier = xpaths.find_first(member, './/gml:identifier')
+            if identifier is None:
+                continue
+            self._timelines[identifier.text.strip()] = build_timeline(member, feature_type)
+
+    def get_timeline(self, identifier: str) -> Union[Timeline, None]:
+        """
+        Args:
+            identifier (str): The feature's gml:identifier.
+        Returns:
+            timeline (Union[Timeline, None]): The indexed timeslices of the feature, or None if it isn't indexed.
+        """
+        return self._timelines.get(identifier)
+
+    def effective_timeslices(self, identifier: str, time) -> Union[list, None]:
+        """
+        Args:
+            identifier (str): The feature's gml:identifier.
+            time (Union[str, datetime, np.datetime64]): The instant to resolve.
+        Returns:
+            timeslices (Union[list, None]): The state timeslice followed by the deltas applying at the time, oldest to
+              newest, or None if the feature is not effective at the time.
+        """
+        timeline = self._timelines.get(identifier)
+        if timeline is None:
+            return None
+        time = to_datetime64(time)
+
+        # States with begin <= time are those before the insertion point
+        latest = np.searchsorted(timeline.state_begin, time, side='right') - 1
+        if latest < 0 or timeline.state_end[latest] <= time:
+            return None
+        state_begin = timeline.state_begin[latest]
+
+        active = (timeline.delta_begin <= time) & (timeline.delta_end > time)
+        # Permanent deltas older than the state have already been incorporated into it
+        permanent = active & timeline.delta_permanent & (timeline.delta_begin >= state_begin)
+        temporary = active & ~timeline.delta_permanent
+        return ([timeline.states[latest]] + [timeline.deltas[i] for i in np.flatnonzero(permanent)]
+                + [timeline.deltas[i] for i in np.flatnonzero(temporary)])
+
+    def state_at(self, identifier: str, time):
+        """
+        Args:
+            identifier (str): The feature's gml:identifier.
+            time (Union[str, datetime, np.datetime64]): The instant to resolve.
+        Returns:
+            aixm_feature: The AIXMFeature object built only from the timeslices effective at the time, or None if the
+              feature is not effective at the time.
+        """
+        timeslices = self.effective_timeslices(identifier, time)
+        if timeslices is None:
+            return None
+        timeline = self._timelines[identifier]
+        return FEATURE_CLASSES[timeline.feature_type](
+            timeline.member, numeric=self._numeric, timeslices=timeslices)
+
+    def snapshot(self, time):
+        """
+        Args:
+            time (Union[str, datetime, np.datetime64]): The instant to resolve.
+        Returns:
+            aixm_features (generator): A generator of AIXMFeature objects for every feature effective at the time.
+        """
+        time = to_datetime64(time)
+        for identifier in self._timelines:
+            aixm_feature = self.state_at(identifier, time)
+            if aixm_feature is not None:
+                yield aixm_feature
@@ -2,7 +2,8 @@ from datetime import datetime
 
 from lxml.etree import _Element
 
-from settings import NAMESPACES
+from . import geometry
+from .settings import NAMESPACES
 
 
 def get_feature_type(timeslices: list) -> str:
@@ -63,6 +64,39 @@ def convert_elevation(z_value: str, current_uom: str) -> float:
     return z_value, current_uom
 
 
+def to_metres(z_value, uom: str):
+    """
+    Converts a vertical value, as found in the geographic information dicts, to metres.
+
+    Args:
+        z_value (Union[str, float]): The value, which may also be GND or UNL.
+        uom (str): The unit of measurement, one of M, FT or FL.
+    Returns:
+        z_value (Union[float, None]): The value in metres or None if the value or unit cannot be converted.
+    """
+    z_value, uom = convert_elevation(z_value, uom)
+    conversion_dict = {'M': 1.0, 'FT': 0.3048}
+    try:
+        return float(z_value) * conversion_dict[uom]
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def convert_radius(radius: str, radius_uom: str) -> float:
+    """
+    Args:
+        radius (str): The radius value.
+        radius_uom (str): The radius unit of measurement.
+    Returns:
+        radius (float): The radius in metres.
+    """
+    conversion_dict = {'ft': 0.3048, 'NM': 1852, '[nmi_i]': 1852, 'mi': 1609.4, 'km': 1000}
+
+    if radius_uom != 'm':
+        return float(radius) * conversion_dict[radius_uom]
+    return float(radius)
+
+
 def altitude_mode(aixm_dict):
     altitude_mode = 'absolute'
     if aixm_dict['upper_layer_reference'] == 'SFC':
@@ -77,35 +111,64 @@ def switch_radius_uom(radius_uom):
 
 
 def determine_geometry_type(aixm_feature_dict):
+    coordinates = aixm_feature_dict["coordinates"]
+    # Numeric features hold runs of points in arrays, count the points rather than the parts
+    numeric = bool(coordinates) and not isinstance(coordinates[0], str)
+    coordinate_count = geometry.vertex_count(coordinates) if numeric else len(coordinates)
+
     geometry_type = None
     if aixm_feature_dict['type'] == 'RouteSegment':
         geometry_type = 'LineString'
 
     elif aixm_feature_dict['type'] == 'VerticalStructure':
-        if len(aixm_feature_dict['coordinates']) > 1:
+        if coordinate_count > 1:
             aixm_feature_dict['lower_layer'] = 0.0
             aixm_feature_dict['upper_layer'] = aixm_feature_dict['elevation']
             geometry_type = 'Polygon'
         else:
             geometry_type = 'point'
-    elif len(aixm_feature_dict["coordinates"]) == 1:
-        if 'radius=' in aixm_feature_dict['coordinates'][0]:
+    elif coordinate_count == 1:
+        if is_circle(coordinates[0]):
             if aixm_feature_dict["upper_layer"]:
                 geometry_type = 'cylinder'
         else:
             geometry_type = 'point'
 
-    elif len(aixm_feature_dict["coordinates"]) == 2:
-        for coordinate in aixm_feature_dict["coordinates"]:
-            if 'start=' in coordinate:
+    elif coordinate_count == 2:
+        for coordinate in coordinates:
+            if is_arc(coordinate):
                 return 'polyhedron'
         if geometry_type is None:
             return 'linestring'
 
-    elif len(aixm_feature_dict["coordinates"]) > 2:
+    elif coordinate_count > 2:
         if aixm_feature_dict["upper_layer"]:
             geometry_type = 'polyhedron'
         else:
             geometry_type = 'polygon'
 
     return geometry_type
+
+
+def is_circle(coordinate) -> bool:
+    """
+    Args:
+        coordinate (Union[str, np.ndarray, geometry.Arc, geometry.Circle]): A coordinate string or numeric part.
+    Returns:
+        circle (bool): True if the coordinate describes a CircleByCenterPoint.
+    """
+    if isinstance(coordinate, str):
+        return 'radius=' in coordinate
+    return isinstance(coordinate, geometry.Circle)
+
+
+def is_arc(coordinate) -> bool:
+    """
+    Args:
+        coordinate (Union[str, np.ndarray, geometry.Arc, geometry.Circle]): A coordinate string or numeric part.
+    Returns:
+        arc (bool): True if the coordinate describes an ArcByCenterPoint.
+    """
+    if isinstance(coordinate, str):
+        return 'start=' in coordinate
+    return isinstance(coordinate, geometry.Arc)
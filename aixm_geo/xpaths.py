@@ -0,0 +1,119 @@
+import re
+
+from lxml import etree
+
+from .settings import NAMESPACES
+
+# Matches paths which only select a single descendant tag, e.g. './/aixm:designator'
+_DESCENDANT_TAG = re.compile(r'^\.//(\w+:\w+)$')
+# Matches paths made only of descendant tag steps, e.g. './/aixm:ARP//gml:pos'
+_DESCENDANT_STEPS = re.compile(r'^\.//\w+:\w+(//\w+:\w+)*$')
+
+_first_registry = {}
+_all_registry = {}
+_descendant_steps = {}
+
+
+def compile_first(xpath: str) -> etree.XPath:
+    """
+    Returns a precompiled etree.XPath selecting the first element matched by the xpath, compiling and registering it
+    on first use.  Single descendant tag paths are compiled to a descendant axis step with a positional predicate so
+    libxml2 can stop at the first match.
+
+    Args:
+        xpath (str): Valid Xpath string, as accepted by etree.Element.find.
+    Returns:
+        compiled (etree.XPath): The compiled XPath, evaluating to a list of at most one element.
+    """
+    try:
+        return _first_registry[xpath]
+    except KeyError:
+        match = _DESCENDANT_TAG.match(xpath)
+        if match:
+            compiled = etree.XPath(f'descendant::{match.group(1)}[1]', namespaces=NAMESPACES)
+        else:
+            compiled = etree.XPath(f'({xpath})[1]', namespaces=NAMESPACES)
+        _first_registry[xpath] = compiled
+        return compiled
+
+
+def compile_all(xpath: str) -> etree.XPath:
+    """
+    Args:
+        xpath (str): Valid Xpath string, as accepted by etree.Element.findall.
+    Returns:
+        compiled (etree.XPath): The registered etree.XPath, evaluating to every matching element in document order.
+    """
+    try:
+        return _all_registry[xpath]
+    except KeyError:
+        compiled = _all_registry[xpath] = etree.XPath(xpath, namespaces=NAMESPACES)
+        return compiled
+
+
+def descendant_steps(xpath: str):
+    """
+    Splits a path made only of descendant tag steps into the fully qualified tag of each step.
+
+    Args:
+        xpath (str): Xpath string such as './/aixm:ARP//gml:pos'.
+    Returns:
+        steps (Union[tuple[str], None]): Clark notation tags, e.g. ('{...}ARP', '{...}pos'), or None if the path
+          uses anything other than descendant tag steps.
+    """
+    try:
+        return _descendant_steps[xpath]
+    except KeyError:
+        steps = None
+        if _DESCENDANT_STEPS.match(xpath):
+            steps = []
+            for step in xpath[3:].split('//'):
+                prefix, tag = step.split(':')
+                steps.append(f'{{{NAMESPACES[prefix]}}}{tag}')
+            steps = tuple(steps)
+        _descendant_steps[xpath] = steps
+        return steps
+
+
+def find_first(subtree: etree.Element, xpath: str):
+    """
+    Args:
+        subtree (etree.Element): The subtree to search.
+        xpath (str): Valid Xpath string for the element to find.
+    Returns:
+        element (Union[etree.Element, None]): The first matching element or None if there is no match.
+    """
+    result = compile_first(xpath)(subtree)
+    return result[0] if result else None
+
+
+def find_all(subtree: etree.Element, xpath: str) -> list:
+    """
+    Args:
+        subtree (etree.Element): The subtree to search.
+        xpath (str): Valid Xpath string for the elements to find.
+    Returns:
+        elements (list[etree.Element]): Every matching element in document order.
+    """
+    return compile_all(xpath)(subtree)
+
+
+# Paths looked up on every feature, compiled once at import rather than on the first feature
+for _xpath in (
+        './/aixm:designator', './/aixm:name', './/aixm:type', './/aixm:fieldElevation', './/aixm:elevation',
+        './/aixm:ARP//gml:pos', './/aixm:location//gml:pos', './/aixm:upperLimitReference',
+        './/aixm:theAirspaceVolume//aixm:lowerLimit', './/aixm:theAirspaceVolume//aixm:upperLimit',
+        './/gml:pos', './/gml:posList', './/gml:radius', './/gml:startAngle', './/gml:endAngle', './/*[@srsName]',
+        './/gml:identifier',
+):
+    compile_first(_xpath)
+
+for _xpath in ('.//aixm:curveExtent', './/aixm:AirspaceGeometryComponent', './/aixm:part'):
+    compile_all(_xpath)
+
+# Tags recorded by each feature's tag index.  Filtering the walk to these keeps it in libxml2, indexing every tag
+# costs more than the searches it saves.
+INDEXED_TAGS = frozenset(descendant_steps(_xpath)[0] for _xpath in (
+        './/aixm:designator', './/aixm:name', './/aixm:type', './/aixm:fieldElevation', './/aixm:elevation',
+        './/aixm:ARP', './/aixm:location', './/aixm:upperLimitReference', './/aixm:theAirspaceVolume',
+))
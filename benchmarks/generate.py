@@ -0,0 +1,112 @@
+"""
+Synthetic dataset generator.  Replicates every message:hasMember of test_data/donlon.xml scale times, giving each copy
+fresh gml:identifiers, gml:ids and xlink:href references, and shifting its coordinates so copies do not coincide.
+
+Run from the repository root:  python benchmarks/generate.py 100 donlon_100.xml
+"""
+import argparse
+import copy
+import uuid
+from pathlib import Path
+
+from lxml import etree
+
+DONLON = Path(__file__).resolve().parents[1].joinpath('test_data', 'donlon.xml')
+
+GML = 'http://www.opengis.net/gml/3.2'
+MESSAGE = 'http://www.aixm.aero/schema/5.1/message'
+XLINK_HREF = '{http://www.w3.org/1999/xlink}href'
+GML_ID = f'{{{GML}}}id'
+IDENTIFIER_TAG = f'{{{GML}}}identifier'
+POSITION_TAGS = (f'{{{GML}}}pos', f'{{{GML}}}posList')
+HAS_MEMBER_TAG = f'{{{MESSAGE}}}hasMember'
+
+
+def get_offset(copy_number: int) -> tuple:
+    """
+    Args:
+        copy_number (int): The copy being generated, copy 0 is the original.
+    Returns:
+        offset (tuple): (lat, lon) shift in degrees, spread over roughly +/- 1 degree.
+    """
+    if copy_number == 0:
+        return 0.0, 0.0
+    return ((copy_number * 37) % 200 - 100) * 0.01, ((copy_number * 61) % 200 - 100) * 0.01
+
+
+def shift_positions(text: str, dimension: int, offset: tuple) -> str:
+    values = text.split()
+    for i in range(0, len(values) - 1, dimension):
+        values[i] = repr(round(float(values[i]) + offset[0], 10))
+        values[i + 1] = repr(round(float(values[i + 1]) + offset[1], 10))
+    return ' '.join(values)
+
+
+def perturb(member, copy_number: int, identifiers: dict):
+    """
+    Gives a copy of a member fresh identifiers and shifted coordinates in place.
+    Args:
+        member: A copy of a message:hasMember element.
+        copy_number (int): The copy being generated.
+        identifiers (dict): Original gml:identifier to the identifier used in this copy.
+    """
+    offset = get_offset(copy_number)
+    for element in member.iter():
+        if element.tag == IDENTIFIER_TAG and element.text:
+            element.text = identifiers.get(element.text.strip(), element.text)
+        elif element.tag in POSITION_TAGS and element.text:
+            element.text = shift_positions(element.text, int(element.get('srsDimension', 2)), offset)
+
+        gml_id = element.get(GML_ID)
+        if gml_id is not None:
+            element.set(GML_ID, f'{gml_id}_{copy_number}')
+        href = element.get(XLINK_HREF)
+        if href is not None and href.startswith('urn:uuid:'):
+            element.set(XLINK_HREF, 'urn:uuid:' + identifiers.get(href[9:], href[9:]))
+
+
+def generate(scale: int, output_path, source=DONLON) -> int:
+    """
+    Writes the synthetic dataset incrementally, so only the source document is ever held in memory.
+    Args:
+        scale (int): Number of copies of every member.
+        output_path: Path to write the dataset to.
+        source: The AIXM file to replicate.
+    Returns:
+        member_count (int): Number of message:hasMember elements written.
+    """
+    root = etree.parse(str(source)).getroot()
+    members = [child for child in root if child.tag == HAS_MEMBER_TAG]
+    header = [child for child in root if child.tag != HAS_MEMBER_TAG and isinstance(child.tag, str)]
+    originals = [identifier.text.strip() for member in members for identifier in member.iter(IDENTIFIER_TAG)
+                 if identifier.text]
+
+    with etree.xmlfile(str(output_path), encoding='utf-8') as xf:
+        xf.write_declaration()
+        with xf.element(root.tag, attrib=dict(root.attrib), nsmap=root.nsmap):
+            for child in header:
+                xf.write(child)
+            for copy_number in range(scale):
+                if copy_number == 0:
+                    identifiers = {}
+                else:
+                    identifiers = {original: str(uuid.uuid5(uuid.NAMESPACE_URL, f'{original}/{copy_number}'))
+                                   for original in originals}
+                for member in members:
+                    member = copy.deepcopy(member)
+                    if copy_number:
+                        perturb(member, copy_number, identifiers)
+                    xf.write(member)
+    return len(members) * scale
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic AIXM dataset from donlon.xml')
+    parser.add_argument('scale', type=int, help='Number of copies of every feature')
+    parser.add_argument('output', help='Path of the AIXM file to write')
+    args = parser.parse_args()
+    print(f'{generate(args.scale, args.output)} members written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
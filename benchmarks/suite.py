@@ -0,0 +1,144 @@
+"""
+Benchmark suite.  For each scale a synthetic dataset is generated from donlon.xml (see generate.py) and parsing, factory
+iteration, get_geographic_information() per feature type and KML writing are timed separately.  Each scale runs in a
+fresh process so its peak RSS is its own.
+
+Results are written as JSON so runs can be compared across versions.
+
+Run from the repository root:  python benchmarks/suite.py --scales 10 100 1000 --output results.json
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import generate  # noqa: E402
+from aixm_geo.aixm_geo import AixmGeo  # noqa: E402
+from aixm_geo.factory import AixmFeatureFactory  # noqa: E402
+from aixm_geo.kml_writer import StreamingKml  # noqa: E402
+from aixm_geo.settings import VERSION  # noqa: E402
+
+
+def get_peak_rss() -> int:
+    """
+    Returns:
+        peak_rss (int): Peak resident set size of this process in bytes.
+    """
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak_rss if sys.platform == 'darwin' else peak_rss * 1024
+
+
+def get_stage(seconds: float, feature_count: int) -> dict:
+    return {
+        'features': feature_count,
+        'seconds': seconds,
+        'features_per_second': feature_count / seconds if seconds else None,
+    }
+
+
+def run_scale(scale: int, work_dir: str, kml_limit: int) -> dict:
+    """
+    Runs every stage at one scale.  Runs inside a fresh worker process.
+    Args:
+        scale (int): Number of copies of donlon.xml's features.
+        work_dir (str): Directory for the generated dataset and KML output.
+        kml_limit (int): Maximum number of features to write to KML, every feature if None.
+    Returns:
+        result (dict): Timings, throughput and peak RSS for the scale.
+    """
+    aixm_file = Path(work_dir).joinpath(f'donlon_{scale}.xml')
+    if not aixm_file.exists():
+        generate.generate(scale, aixm_file)
+
+    start = time.perf_counter()
+    factory = AixmFeatureFactory(aixm_file)
+    parse_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    features = list(factory)
+    factory_seconds = time.perf_counter() - start
+
+    by_type = defaultdict(list)
+    for feature in features:
+        by_type[type(feature).__name__].append(feature)
+    extraction = {}
+    geo_dicts = []
+    for feature_type, typed_features in sorted(by_type.items()):
+        start = time.perf_counter()
+        typed_dicts = [feature.get_geographic_information() for feature in typed_features]
+        extraction[feature_type] = get_stage(time.perf_counter() - start, len(typed_features))
+        geo_dicts.extend(typed_dicts)
+
+    kml_dicts = geo_dicts if kml_limit is None else geo_dicts[:kml_limit]
+    kml_dir = Path(work_dir).joinpath(f'kml_{scale}')
+    kml_dir.mkdir(exist_ok=True)
+    aixm_geo = AixmGeo(aixm_file, str(kml_dir), 'benchmark.kml')
+    start = time.perf_counter()
+    # The streaming writer is timed, KMLPlus would save the whole document again after every shape
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), \
+            StreamingKml(output=str(kml_dir), file_name='benchmark.kml') as kml_obj:
+        aixm_geo.draw_features(kml_obj, kml_dicts)
+    kml_seconds = time.perf_counter() - start
+
+    return {
+        'scale': scale,
+        'file_bytes': aixm_file.stat().st_size,
+        'features': len(features),
+        'stages': {
+            'parse': get_stage(parse_seconds, len(features)),
+            'factory': get_stage(factory_seconds, len(features)),
+            'extraction': extraction,
+            'kml': get_stage(kml_seconds, len(kml_dicts)),
+        },
+        'peak_rss_bytes': get_peak_rss(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark AIXMGeo against scaled copies of donlon.xml')
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--kml-limit', type=int, default=None,
+                        help='Maximum number of features written to KML, every feature by default')
+    parser.add_argument('--work-dir', help='Directory for generated datasets, reused between runs if given')
+    parser.add_argument('--output', help='Path to write the JSON results to, stdout by default')
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        work_dir = args.work_dir or stack.enter_context(tempfile.TemporaryDirectory())
+        results = []
+        for scale in args.scales:
+            # A fresh, spawned process per scale keeps each peak RSS independent of the others
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                results.append(executor.submit(run_scale, scale, work_dir, args.kml_limit).result())
+            print(f'scale {scale}: {results[-1]["features"]} features', file=sys.stderr)
+
+    report = {
+        'version': VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == '__main__':
+    main()
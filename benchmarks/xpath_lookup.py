@@ -0,0 +1,58 @@
+"""
+Micro-benchmark comparing the precompiled XPath registry with the uncompiled Element.find lookups it replaced.
+
+Run from the repository root:  python benchmarks/xpath_lookup.py
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from aixm_geo import xpaths  # noqa: E402
+from aixm_geo.factory import AixmFeatureFactory  # noqa: E402
+from aixm_geo.settings import NAMESPACES  # noqa: E402
+
+DONLON = Path(__file__).resolve().parents[1].joinpath('test_data', 'donlon.xml')
+
+
+def find_first_uncompiled(subtree, xpath):
+    return subtree.find(xpath, namespaces=NAMESPACES)
+
+
+def find_all_uncompiled(subtree, xpath):
+    return subtree.findall(xpath, namespaces=NAMESPACES)
+
+
+def time_features(features, number=10):
+    start = time.perf_counter()
+    for _ in range(number):
+        for feature in features:
+            feature.get_geographic_information()
+    return (time.perf_counter() - start) / number
+
+
+def main(repeat=30):
+    features = list(AixmFeatureFactory(DONLON))
+    compiled = xpaths.find_first, xpaths.find_all
+
+    # Alternate between the two lookups so both see the same machine conditions, keeping the best of each
+    registry_time = uncompiled_time = float('inf')
+    for _ in range(repeat):
+        registry_time = min(registry_time, time_features(features))
+        xpaths.find_first, xpaths.find_all = find_first_uncompiled, find_all_uncompiled
+        try:
+            uncompiled_time = min(uncompiled_time, time_features(features))
+        finally:
+            xpaths.find_first, xpaths.find_all = compiled
+
+    per_feature = 1e6 / len(features)
+    print(f'features:          {len(features)}')
+    print(f'Element.find:      {uncompiled_time * per_feature:8.1f} us/feature')
+    print(f'XPath registry:    {registry_time * per_feature:8.1f} us/feature')
+    print(f'saving:            {(uncompiled_time - registry_time) * per_feature:8.1f} us/feature '
+          f'({100 * (1 - registry_time / uncompiled_time):.1f}%)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from lxml import etree
+
+from aixm_geo import aio
+
+KML_NAMESPACES = {'kml': 'http://www.opengis.net/kml/2.2'}
+
+
+class TestAio(TestCase):
+    def setUp(self) -> None:
+        self.file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+        self.temporary_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.temporary_dir.cleanup()
+
+    def test_aiter_features(self):
+        async def collect():
+            return [geo_dict async for geo_dict in aio.aiter_features(self.file_loc, queue_size=4)]
+
+        geo_dicts = asyncio.run(collect())
+        self.assertEqual(49, len(geo_dicts))
+        self.assertIn('TEMPO', [geo_dict.get('name') for geo_dict in geo_dicts])
+
+    def test_aiter_features_stops_early(self):
+        async def take(count):
+            taken = []
+            async for geo_dict in aio.aiter_features(self.file_loc, queue_size=2):
+                taken.append(geo_dict)
+                if len(taken) == count:
+                    break
+            return taken
+
+        self.assertEqual(3, len(asyncio.run(take(3))))
+
+    def test_convert_many(self):
+        output = Path(self.temporary_dir.name)
+        counts = asyncio.run(aio.convert_many([self.file_loc], output, output_format='geojson'))
+        self.assertEqual([49], counts)
+        features = [json.loads(line) for line in output.joinpath('donlon.ndjson').read_text().splitlines()]
+        self.assertEqual(49, len(features))
+
+        counts = asyncio.run(aio.convert_many([self.file_loc], output, output_format='kml', queue_size=8))
+        self.assertEqual([49], counts)
+        root = etree.parse(str(output.joinpath('donlon.kml'))).getroot()
+        self.assertTrue(root.xpath('//kml:Folder', namespaces=KML_NAMESPACES))
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(aio.convert(self.file_loc, self.temporary_dir.name, output_format='shp'))
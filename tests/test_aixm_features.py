@@ -1 +1,31 @@
+from pathlib import Path
+from unittest import TestCase
 
+import numpy as np
+
+from aixm_geo.factory import AixmFeatureFactory
+
+
+class TestNumericGeometry(TestCase):
+    def setUp(self) -> None:
+        file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+        self.string_dicts = [f.get_geographic_information() for f in AixmFeatureFactory(file_loc)]
+        self.numeric_dicts = [f.get_geographic_information() for f in AixmFeatureFactory(file_loc, numeric=True)]
+
+    def test_points_match_coordinate_strings(self):
+        for string_dict, numeric_dict in zip(self.string_dicts, self.numeric_dicts):
+            if string_dict['type'] in ('DesignatedPoint', 'AirportHeliport', 'RouteSegment'):
+                expected = np.array([c.split() for c in string_dict['coordinates']], dtype=float)
+                self.assertEqual(1, len(numeric_dict['coordinates']))
+                np.testing.assert_array_equal(expected, numeric_dict['coordinates'][0])
+
+    def test_arcs_and_circles_are_records(self):
+        ear1 = next(d for d in self.numeric_dicts if d.get('name') == 'EAR1 (EAR1_BRAVO)')
+        arc = ear1['coordinates'][1]
+        self.assertEqual('clockwise', arc.direction)
+        self.assertAlmostEqual(46300.0, arc.radius)
+        self.assertEqual((55.23116, -36.89437), (round(arc.start_lat, 5), round(arc.start_lon, 5)))
+
+        eap2 = next(d for d in self.numeric_dicts if d.get('name') == 'EAP2 (EAP2_VAARDNOR)')
+        circle = eap2['coordinates'][0]
+        self.assertEqual((52.36666666666667, -22.1, 27780.0), tuple(circle))
@@ -1,7 +1,10 @@
 from pathlib import Path
 from unittest import TestCase
 
+from pyproj import Geod
+
 from aixm_geo.base import MultiPointAixm, SinglePointAixm
+from aixm_geo import xpaths
 from aixm_geo.factory import AixmFeatureFactory
 from aixm_geo.settings import NAMESPACES
 
@@ -28,6 +31,16 @@ class TestSinglePointAixm(TestCase):
         self.assertTrue(isinstance(attribute, dict))
         self.assertEqual('unknown', attribute['indeterminatePosition'])
 
+    def test_registry_matches_find(self):
+        for xpath in ('.//aixm:name', './/aixm:ARP//gml:pos', './/gml:endPosition', './/aixm:notATag'):
+            self.assertIs(self.ah._root.find(xpath, namespaces=NAMESPACES), xpaths.find_first(self.ah._root, xpath))
+        self.assertIs(xpaths.compile_first('.//aixm:name'), xpaths.compile_first('.//aixm:name'))
+
+    def test_find_first_uses_tag_index(self):
+        for xpath in ('.//aixm:name', './/aixm:ARP//gml:pos', './/aixm:designator', './/aixm:elevation'):
+            self.assertIs(xpaths.find_first(self.ah._root, xpath), self.ah.find_first(xpath))
+        self.assertIn('{http://www.aixm.aero/schema/5.1}name', self.ah.get_tag_index())
+
     def test_get_elevation(self):
         elevation = self.ah.get_field_elevation()
         self.assertEqual(elevation, (0.0, 'M'))
@@ -41,3 +54,20 @@ class TestMultiPointAixm(TestCase):
         airspace_feature = AixmFeatureFactory(file_loc).root.xpath("/message:AIXMBasicMessage/message:hasMember/"
                                                                    "aixm:Airspace", namespaces=NAMESPACES)
         self.airspace = MultiPointAixm(airspace_feature[0])
+
+    def test_unpack_arcs_matches_scalar_geod(self):
+        file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+        arcs = AixmFeatureFactory(file_loc).root.xpath('//aixm:Airspace//gml:ArcByCenterPoint', namespaces=NAMESPACES)
+        self.assertTrue(len(arcs) > 0)
+
+        geod = Geod(ellps='WGS84')
+        for arc in arcs:
+            airspace = MultiPointAixm(arc.xpath('ancestor::message:hasMember', namespaces=NAMESPACES)[0])
+            centre = airspace.get_arc_centre_point(arc).strip().split(' ')
+            radius = float(airspace.get_first_value('.//gml:radius', subtree=arc)) * 1852
+            start_angle = airspace.get_first_value('.//gml:startAngle', subtree=arc)
+            lon, lat, _ = geod.fwd(centre[1], centre[0], start_angle, radius)
+
+            coordinate_string = airspace.unpack_arcs([arc])[0]
+            self.assertTrue(coordinate_string.startswith(f'start={round(lat, 5)} {round(lon, 5)},'))
+            self.assertEqual(coordinate_string, airspace.unpack_arc(arc))
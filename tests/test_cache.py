@@ -0,0 +1,56 @@
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from unittest import TestCase, mock
+
+from aixm_geo import cache, parallel
+from aixm_geo.cache import FeatureCache
+from aixm_geo.factory import AixmFeatureFactory
+
+
+class TestFeatureCache(TestCase):
+    def setUp(self) -> None:
+        self.file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        self.feature_cache = FeatureCache(self.temporary_dir.name)
+
+    def tearDown(self) -> None:
+        self.temporary_dir.cleanup()
+
+    def test_hit_skips_parsing(self):
+        extracted = self.feature_cache.get_geographic_information(self.file_loc)
+        self.assertEqual([f.get_geographic_information() for f in AixmFeatureFactory(self.file_loc)], extracted)
+
+        with mock.patch.object(parallel, 'AixmFeatureFactory', side_effect=AssertionError('parsed on a cache hit')):
+            self.assertEqual(extracted, self.feature_cache.get_geographic_information(self.file_loc))
+
+    def test_records_round_trip(self):
+        records = self.feature_cache.get_feature_records(self.file_loc, feature_types=['Airspace'])
+        cached = self.feature_cache.get_feature_records(self.file_loc, feature_types=['Airspace'])
+        self.assertEqual([r.identifier for r in records], [r.identifier for r in cached])
+        self.assertEqual(1, len(list(Path(self.temporary_dir.name).glob('*.pickle'))))
+
+    def test_options_version_and_format_change_key(self):
+        digest = cache.file_digest(self.file_loc)
+        key = self.feature_cache.get_key(digest, 'records', {'feature_types': ['Airspace', 'RouteSegment']})
+        self.assertEqual(key, self.feature_cache.get_key(digest, 'records',
+                                                         {'feature_types': {'RouteSegment', 'Airspace'}}))
+        self.assertNotEqual(key, self.feature_cache.get_key(digest, 'records', {'feature_types': ['Airspace']}))
+        with mock.patch.object(cache, 'VERSION', '999'):
+            self.assertNotEqual(key, self.feature_cache.get_key(digest, 'records',
+                                                                {'feature_types': ['Airspace', 'RouteSegment']}))
+        with mock.patch.object(cache, 'CACHE_FORMAT', cache.CACHE_FORMAT - 1):
+            self.assertNotEqual(key, self.feature_cache.get_key(digest, 'records',
+                                                                {'feature_types': ['Airspace', 'RouteSegment']}))
+
+    def test_eviction_keeps_newest_entries(self):
+        # Room for three entries
+        self.feature_cache.max_bytes = 3 * len(pickle.dumps(b'x' * 50, protocol=5))
+        for i, key in enumerate(('a', 'b', 'c')):
+            self.feature_cache.store(key, b'x' * 50)
+            os.utime(self.feature_cache.get_path(key), (i, i))
+        self.feature_cache.load('a')
+        self.feature_cache.store('d', b'x' * 50)
+        remaining = sorted(path.stem for path in Path(self.temporary_dir.name).glob('*.pickle'))
+        self.assertEqual(['a', 'c', 'd'], remaining)
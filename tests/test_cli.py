@@ -0,0 +1,66 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from aixm_geo import cli
+
+
+class TestCli(TestCase):
+    def setUp(self) -> None:
+        self.file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+        self.temporary_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.temporary_dir.cleanup()
+
+    def test_convert_glob(self):
+        pattern = str(self.file_loc.parent.joinpath('*.xml'))
+        output = Path(self.temporary_dir.name).joinpath('out')
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            status = cli.main([pattern, '--output', str(output), '--format', 'geojson', '--workers', '2'])
+
+        self.assertEqual(0, status)
+        self.assertIn('[1/1]', stderr.getvalue())
+        self.assertIn('49 features', stdout.getvalue())
+        lines = output.joinpath('donlon.ndjson').read_text().splitlines()
+        self.assertEqual(49, len([json.loads(line) for line in lines]))
+
+    def test_expand_inputs(self):
+        # A file given directly and by pattern is converted once
+        aixm_files = cli.expand_inputs([str(self.file_loc), str(self.file_loc.parent.joinpath('don*.xml'))])
+        self.assertEqual(1, len(aixm_files))
+        with self.assertRaises(FileNotFoundError):
+            cli.expand_inputs([str(self.file_loc.parent.joinpath('missing*.xml'))])
+
+    def test_failures_are_reported(self):
+        broken = Path(self.temporary_dir.name).joinpath('broken.xml')
+        broken.write_text('<not aixm')
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()) as stderr:
+            status = cli.main([str(broken), '-o', self.temporary_dir.name, '-f', 'geojson', '-w', '1', '-q'])
+
+        self.assertEqual(1, status)
+        self.assertIn('broken.xml: failed', stderr.getvalue())
+
+    def test_installed_entry_point(self):
+        # A copy of the package, as installed, with only its install location added to the path
+        site_packages = Path(self.temporary_dir.name).joinpath('site-packages')
+        shutil.copytree(Path(cli.__file__).parent, site_packages.joinpath('aixm_geo'),
+                        ignore=shutil.ignore_patterns('__pycache__'))
+        output = Path(self.temporary_dir.name).joinpath('out')
+        script = 'import sys, aixm_geo.cli; sys.exit(aixm_geo.cli.main(sys.argv[1:]))'
+        completed = subprocess.run(
+            [sys.executable, '-c', script, str(self.file_loc), '-o', str(output), '-f', 'geojson', '-w', '1', '-q'],
+            cwd=self.temporary_dir.name, env=dict(os.environ, PYTHONPATH=str(site_packages)), capture_output=True,
+            text=True)
+
+        self.assertEqual(0, completed.returncode, completed.stderr)
+        self.assertIn('49 features', completed.stdout)
+        self.assertEqual(49, len(output.joinpath('donlon.ndjson').read_text().splitlines()))
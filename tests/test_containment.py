@@ -0,0 +1,55 @@
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+
+from aixm_geo import geodesy, geometry
+from aixm_geo.containment import AirspaceContainment, points_in_ring
+from aixm_geo.records import FeatureRecord
+
+
+def get_airspace(identifier, parts, lower_limit, upper_limit):
+    return FeatureRecord('Airspace', identifier, identifier, identifier, tuple(parts), None, lower_limit,
+                         upper_limit, 'MSL', {})
+
+
+class TestAirspaceContainment(TestCase):
+    def setUp(self) -> None:
+        square = np.array([[50.0, 0.0], [51.0, 0.0], [51.0, 1.0], [50.0, 1.0], [50.0, 0.0]])
+        self.containment = AirspaceContainment([
+            get_airspace('square', [square], 0.0, 3000.0),
+            get_airspace('circle', [geometry.Circle(50.5, 0.5, 10000.0)], 1000.0, None),
+            get_airspace('empty', [], 0.0, 1000.0),
+        ])
+
+    def test_points_in_ring(self):
+        ring = np.array([[0.0, 0.0], [0.0, 2.0], [2.0, 2.0], [2.0, 1.0], [1.0, 1.0], [1.0, 0.0], [0.0, 0.0]])
+        inside = points_in_ring(np.array([0.5, 1.5, 1.5, 3.0]), np.array([0.5, 1.5, 0.5, 0.5]), ring)
+        self.assertEqual([True, True, False, False], inside.tolist())
+
+    def test_query(self):
+        self.assertEqual(2, len(self.containment))
+        lats = np.array([50.5, 50.5, 50.1, 52.0, 50.5])
+        lons = np.array([0.5, 0.5, 0.1, 0.5, 0.5])
+        altitudes = np.array([500.0, 2000.0, 2000.0, 2000.0, np.nan])
+        point_indices, airspace_indices = self.containment.query(lats, lons, altitudes)
+        self.assertEqual([(0, 0), (1, 0), (1, 1), (2, 0), (4, 0), (4, 1)],
+                         list(zip(point_indices.tolist(), airspace_indices.tolist())))
+
+        # Unbounded upper limit, and only the horizontal boundary without altitudes
+        self.assertEqual([1, -1], self.containment.locate([50.5, 52.0], [0.5, 0.5], [50000.0, 0.0]).tolist())
+        self.assertEqual(['square', 'square'],
+                         self.containment.identifiers[self.containment.locate([50.5, 50.9], [0.5, 0.9])].tolist())
+
+    def test_from_file(self):
+        file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+        containment = AirspaceContainment.from_file(file_loc)
+        ring = containment.get_ring(0)
+        np.testing.assert_array_equal(ring[0], ring[-1])
+        # A point just inside each airspace's boundary is found in it
+        for i in range(len(containment)):
+            ring = containment.get_ring(i)
+            centre = ring[:-1].mean(axis=0)
+            lat, lon = ring[0] + (centre - ring[0]) * 1e-3
+            point_indices, airspace_indices = containment.query([lat], [lon])
+            self.assertIn(i, airspace_indices.tolist())
@@ -0,0 +1,92 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from lxml import etree
+
+from aixm_geo.diff import IncrementalExtractor, load_manifest, save_manifest
+from aixm_geo.settings import NAMESPACES
+
+# The DONLON AirportHeliport, a BASELINE followed by a TEMPDELTA
+DONLON = '1b54b2d6-a5ff-4e57-94c2-f4047a381c64'
+
+
+class TestIncrementalExtractor(TestCase):
+    def setUp(self) -> None:
+        self.file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        self.manifest_path = Path(self.temporary_dir.name).joinpath('manifest.json')
+
+    def tearDown(self) -> None:
+        self.temporary_dir.cleanup()
+
+    def test_first_run_adds_everything(self):
+        extractor = IncrementalExtractor(self.file_loc, previous_manifest=load_manifest(self.manifest_path))
+        geo_dicts = list(extractor)
+        self.assertEqual(49, len(geo_dicts))
+        self.assertEqual(49, len(extractor.diff.added))
+        self.assertEqual((), extractor.diff.changed + extractor.diff.removed)
+
+    def test_only_changed_features_are_extracted(self):
+        first = IncrementalExtractor(self.file_loc)
+        list(first)
+        save_manifest(first.manifest, self.manifest_path)
+
+        # Rename one airspace and drop the last designated point from a copy of the file
+        next_airac = Path(self.temporary_dir.name).joinpath('next.xml')
+        shutil.copy(self.file_loc, next_airac)
+        contents = next_airac.read_text().replace('<aixm:name>AMSWELL FIR</aixm:name>',
+                                                  '<aixm:name>AMSWELL UIR</aixm:name>')
+        manifest = load_manifest(self.manifest_path)
+        removed = next(identifier for identifier, entry in reversed(manifest.items())
+                       if entry[0] == 'DesignatedPoint')
+        start = contents.rindex('<message:hasMember>', 0, contents.index(removed))
+        end = contents.index('</message:hasMember>', start) + len('</message:hasMember>')
+        next_airac.write_text(contents[:start] + contents[end:])
+
+        second = IncrementalExtractor(next_airac, previous_manifest=manifest)
+        geo_dicts = list(second)
+        self.assertEqual(['AMSWELL (AMSWELL UIR)'], [geo_dict['name'] for geo_dict in geo_dicts])
+        self.assertEqual(((), (removed,)), (second.diff.added, second.diff.removed))
+        self.assertEqual(1, len(second.diff.changed))
+
+    def get_donlon(self, tree):
+        return next(member for member in tree.getroot().iterfind('message:hasMember', NAMESPACES)
+                    if member.findtext('.//gml:identifier', namespaces=NAMESPACES) == DONLON)
+
+    def test_earlier_timeslice_changes_are_detected(self):
+        first = IncrementalExtractor(self.file_loc)
+        list(first)
+
+        tree = etree.parse(str(self.file_loc))
+        baseline = self.get_donlon(tree).findall('.//aixm:timeSlice', NAMESPACES)[0]
+        self.assertEqual('BASELINE', baseline.findtext('.//aixm:interpretation', namespaces=NAMESPACES))
+        baseline.find('.//aixm:name', NAMESPACES).text = 'DONLON INTERNATIONAL'
+        next_airac = Path(self.temporary_dir.name).joinpath('next.xml')
+        tree.write(str(next_airac))
+
+        second = IncrementalExtractor(next_airac, previous_manifest=first.manifest)
+        self.assertEqual(1, len(list(second)))
+        self.assertEqual(((), (DONLON,)), (second.diff.added, second.diff.changed))
+
+    def test_split_feature_is_one_fingerprint(self):
+        # Move DONLON's TEMPDELTA into a member of its own at the end of the file
+        tree = etree.parse(str(self.file_loc))
+        donlon = self.get_donlon(tree)
+        delta = etree.fromstring(etree.tostring(donlon))
+        for timeslice in donlon.findall('.//aixm:timeSlice', NAMESPACES)[1:]:
+            timeslice.getparent().remove(timeslice)
+        for timeslice in delta.findall('.//aixm:timeSlice', NAMESPACES)[:1]:
+            timeslice.getparent().remove(timeslice)
+        tree.getroot().append(delta)
+        split = Path(self.temporary_dir.name).joinpath('split.xml')
+        tree.write(str(split))
+
+        first = IncrementalExtractor(split)
+        self.assertEqual(50, len(list(first)))
+        self.assertEqual(49, len(first.manifest))
+
+        second = IncrementalExtractor(split, previous_manifest=first.manifest)
+        self.assertEqual([], list(second))
+        self.assertEqual(((), (), ()), second.diff)
@@ -0,0 +1,75 @@
+import pickle
+from pathlib import Path
+from unittest import TestCase
+
+from lxml import etree
+
+from aixm_geo.factory import AixmFeatureFactory
+from aixm_geo.settings import NAMESPACES
+
+
+class TestAixmFeatureFactory(TestCase):
+    def setUp(self) -> None:
+        self.file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+
+    def test_stream_matches_parse(self):
+        parsed = [feature.get_geographic_information() for feature in AixmFeatureFactory(self.file_loc)]
+        streamed = [feature.get_geographic_information() for feature in
+                    AixmFeatureFactory(self.file_loc, stream=True)]
+        self.assertEqual(parsed, streamed)
+        self.assertTrue(len(streamed) > 0)
+
+    def test_stream_clears_members(self):
+        members = AixmFeatureFactory(self.file_loc, stream=True).stream_members()
+        first = next(members)
+        parent = first.getparent()
+        for _ in members:
+            pass
+        self.assertTrue(len(parent) <= 1)
+
+    def test_feature_records_are_detached(self):
+        feature_records = list(AixmFeatureFactory(self.file_loc, stream=True).get_feature_records())
+        self.assertEqual(49, len(feature_records))
+        # lxml elements cannot be pickled, so this fails if a record still references the tree
+        restored = pickle.loads(pickle.dumps(feature_records, protocol=pickle.HIGHEST_PROTOCOL))
+
+        ear1 = next(record for record in restored if record.designator == 'EAR1')
+        self.assertEqual('Airspace', ear1.feature_type)
+        self.assertEqual(0.0, ear1.lower_limit)
+        self.assertEqual(1525.0, ear1.upper_limit)
+        self.assertEqual(3, len(ear1.geometry))
+        self.assertEqual(36, len(ear1.identifier))
+
+    def test_feature_type_filter(self):
+        factory = AixmFeatureFactory(self.file_loc, feature_types=['Airspace'])
+        feature_types = {feature.get_geographic_information()['type'] for feature in factory}
+        self.assertEqual({'Airspace'}, feature_types)
+        self.assertEqual([], factory.errors)
+
+    def test_bbox_filter(self):
+        bbox = (52.0, -33.0, 53.0, -31.0)
+        feature_records = list(AixmFeatureFactory(self.file_loc, bbox=bbox).get_feature_records())
+        names = [record.name for record in feature_records]
+        self.assertIn('EADD (DONLON)', names)
+        self.assertNotIn('TEMPO', names)
+
+    def test_bbox_filter_includes_circle_radius(self):
+        # EAD6's centre lies just west of the box but its 8 km radius reaches into it
+        bbox = (52.0, -31.2, 53.0, -31.0)
+        names = [record.name for record in AixmFeatureFactory(self.file_loc, bbox=bbox).get_feature_records()]
+        self.assertIn('EAD6 (EAD6_DONLON)', names)
+        self.assertNotIn('EADD (DONLON)', names)
+
+    def test_bbox_filter_reads_pos_without_srs_dimension(self):
+        member = etree.fromstring(
+            f'<message:hasMember xmlns:message="{NAMESPACES["message"]}" xmlns:aixm="{NAMESPACES["aixm"]}" '
+            f'xmlns:gml="{NAMESPACES["gml"]}"><aixm:VerticalStructure><aixm:timeSlice><aixm:VerticalStructureTimeSlice>'
+            '<gml:pos>10.0 10.0 50.0</gml:pos></aixm:VerticalStructureTimeSlice></aixm:timeSlice><aixm:timeSlice>'
+            '<aixm:VerticalStructureTimeSlice><gml:pos>52.5 -32.0 30.0</gml:pos></aixm:VerticalStructureTimeSlice>'
+            '</aixm:timeSlice></aixm:VerticalStructure></message:hasMember>')
+        # Only the latest timeslice's position is tested
+        self.assertTrue(AixmFeatureFactory(self.file_loc, bbox=(52.0, -33.0, 53.0, -31.0)).accepts(member))
+        self.assertFalse(AixmFeatureFactory(self.file_loc, bbox=(9.0, 9.0, 11.0, 11.0)).accepts(member))
+        member[0][-1][0][0].text = '52.5 west'
+        # Positions which cannot be read are accepted rather than stopping iteration
+        self.assertTrue(AixmFeatureFactory(self.file_loc, bbox=(9.0, 9.0, 11.0, 11.0)).accepts(member))
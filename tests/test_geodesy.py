@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+import numpy as np
+
+from aixm_geo import geodesy, geometry
+
+
+def get_arc(radius, start_angle, end_angle):
+    start_lats, start_lons, end_lats, end_lons = geodesy.arc_end_points([52.0], [-1.0], [start_angle], [end_angle],
+                                                                        [radius])
+    return geometry.Arc(52.0, -1.0, radius, start_angle, end_angle, 'clockwise', start_lats[0], start_lons[0],
+                        end_lats[0], end_lons[0])
+
+
+class TestDensify(TestCase):
+    def test_chord_error_within_tolerance(self):
+        for radius, tolerance in ((1852.0, 5.0), (50000.0, 25.0), (200000.0, 100.0)):
+            arc = get_arc(radius, 10.0, 250.0)
+            points = geodesy.densify_arc(arc, tolerance)
+            # The arc lies furthest from each chord, a geodesic, at the chord's midpoint
+            azimuths, _, lengths = geodesy.GEOD.inv(points[:-1, 1], points[:-1, 0], points[1:, 1], points[1:, 0])
+            mid_lons, mid_lats, _ = geodesy.GEOD.fwd(points[:-1, 1], points[:-1, 0], azimuths, lengths / 2.0)
+            centre_distances = geodesy.distances(arc.centre_lat, arc.centre_lon, mid_lats, mid_lons)
+            self.assertTrue((radius - centre_distances <= tolerance * 1.01).all())
+            np.testing.assert_allclose((arc.end_lat, arc.end_lon), points[-1])
+
+    def test_vertex_count_adapts(self):
+        small = len(geodesy.densify_arc(get_arc(1852.0, 0.0, 90.0)))
+        large = len(geodesy.densify_arc(get_arc(185200.0, 0.0, 90.0)))
+        short = len(geodesy.densify_arc(get_arc(185200.0, 0.0, 10.0)))
+        self.assertTrue(short < large and small < large)
+        # A coarse tolerance still keeps a circle round
+        ring = geodesy.densify_circle(geometry.Circle(52.0, -1.0, 100.0), tolerance=1000.0)
+        self.assertEqual(360.0 / geodesy.MAX_STEP + 1, len(ring))
+        np.testing.assert_array_equal(ring[0], ring[-1])
+
+    def test_tolerance_must_be_positive(self):
+        for tolerance in (0.0, -5.0, float('nan'), float('inf')):
+            with self.assertRaises(ValueError):
+                geodesy.get_segment_counts([10000.0], [360.0], tolerance)
+            with self.assertRaises(ValueError):
+                geodesy.densify_all([[np.array([[52.0, -1.0]])]], tolerance)
+
+    def test_densify_all_matches_densify(self):
+        geometries = [
+            [np.array([[52.5, -1.0], [52.1, -1.0]]), get_arc(9260.0, 0.0, 120.0)],
+            [geometry.Circle(51.0, 0.5, 5000.0)],
+            [np.array([[50.0, 1.0]])],
+        ]
+        for batched, parts in zip(geodesy.densify_all(geometries), geometries):
+            np.testing.assert_array_equal(geodesy.densify(parts), batched)
+
+
+class TestPolylineLengths(TestCase):
+    def test_matches_edge_distances(self):
+        polyline = np.array([[52.0, -1.0], [52.5, -0.5], [53.0, 0.5]])
+        expected = geodesy.distances(52.0, -1.0, [52.5], [-0.5])[0] + geodesy.distances(52.5, -0.5, [53.0], [0.5])[0]
+        lengths = geodesy.polyline_lengths([polyline, np.empty((0, 2)), polyline[:1], polyline[::-1]])
+        self.assertAlmostEqual(expected, lengths[0], places=6)
+        self.assertEqual([0.0, 0.0], lengths[1:3].tolist())
+        self.assertAlmostEqual(expected, lengths[3], places=6)
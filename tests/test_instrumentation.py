@@ -0,0 +1,34 @@
+import json
+from pathlib import Path
+from unittest import TestCase
+
+from aixm_geo.factory import AixmFeatureFactory
+from aixm_geo.instrumentation import Stats
+
+
+class TestStats(TestCase):
+    def setUp(self) -> None:
+        self.file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+
+    def test_factory_records_stages(self):
+        measurements = []
+        stats = Stats(slowest_count=2, hooks=[lambda *measurement: measurements.append(measurement)])
+        feature_records = list(AixmFeatureFactory(self.file_loc, stream=True, stats=stats).get_feature_records())
+
+        self.assertEqual(len(feature_records), stats.get_count('parse'))
+        self.assertEqual(len(feature_records), stats.get_count('timeslice'))
+        self.assertEqual(len(feature_records), stats.get_count('extract'))
+        self.assertTrue(stats.get_count('geodesic', 'Airspace') > 0)
+        self.assertEqual(sum(stats.get_count(stage) for stage in ('parse', 'timeslice', 'geodesic', 'extract')),
+                         len(measurements))
+
+        exported = json.loads(stats.to_json())
+        slowest = exported['extract']['Airspace']['slowest']
+        self.assertEqual(2, len(slowest))
+        self.assertTrue(slowest[0][1] >= slowest[1][1])
+        self.assertEqual(stats.get_count('extract', 'Airspace'), exported['extract']['Airspace']['count'])
+
+    def test_disabled_by_default(self):
+        factory = AixmFeatureFactory(self.file_loc)
+        self.assertIsNone(factory.stats)
+        self.assertEqual(49, len(list(factory.get_feature_records())))
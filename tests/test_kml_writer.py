@@ -0,0 +1,61 @@
+import contextlib
+import io
+import tempfile
+import zipfile
+from pathlib import Path
+from unittest import TestCase
+
+from lxml import etree
+
+from aixm_geo.aixm_geo import AixmGeo
+from aixm_geo.instrumentation import Stats
+
+KML_NAMESPACES = {'kml': 'http://www.opengis.net/kml/2.2'}
+
+
+class TestStreamingKml(TestCase):
+    def setUp(self) -> None:
+        self.file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+        self.temporary_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.temporary_dir.cleanup()
+
+    def test_kml_and_kmz_hold_every_shape(self):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            AixmGeo(self.file_loc, self.temporary_dir.name, 'donlon.kml').build_kml(streaming=True)
+            AixmGeo(self.file_loc, self.temporary_dir.name, 'donlon.kmz').build_kml()
+        self.assertEqual('', stdout.getvalue())
+
+        kml_root = etree.parse(str(Path(self.temporary_dir.name).joinpath('donlon.kml'))).getroot()
+        with zipfile.ZipFile(Path(self.temporary_dir.name).joinpath('donlon.kmz')) as kmz:
+            kmz_root = etree.fromstring(kmz.read('doc.kml'))
+
+        for root in (kml_root, kmz_root):
+            self.assertEqual(37, len(root.findall('.//kml:Folder', KML_NAMESPACES)))
+            self.assertEqual(600, len(root.findall('.//kml:Placemark', KML_NAMESPACES)))
+        self.assertEqual('EADH (DONLON/DOWNTOWN HELIPORT)', kml_root.findtext('.//kml:name', namespaces=KML_NAMESPACES))
+
+    def test_kml_stage_records_identifiers(self):
+        measurements = []
+        stats = Stats(hooks=[lambda *measurement: measurements.append(measurement)])
+        AixmGeo(self.file_loc, self.temporary_dir.name, 'donlon.kml', stats=stats).build_kml(streaming=True)
+        extracted = [identifier for stage, _, _, identifier in measurements if stage == 'extract']
+        drawn = [identifier for stage, _, _, identifier in measurements if stage == 'kml']
+        self.assertEqual(extracted, drawn)
+
+    def test_incremental_run_writes_a_delta_file(self):
+        manifest_path = Path(self.temporary_dir.name).joinpath('manifest.json')
+        aixm_geo = AixmGeo(self.file_loc, self.temporary_dir.name, 'donlon.kml')
+        aixm_geo.build_kml(streaming=True)
+        full = Path(self.temporary_dir.name).joinpath('donlon.kml').read_bytes()
+
+        self.assertEqual(49, len(aixm_geo.build_kml(manifest_path=manifest_path, streaming=True).added))
+        diff = aixm_geo.build_kml(manifest_path=manifest_path, streaming=True)
+        self.assertEqual(((), (), ()), diff)
+
+        # The full output is left in place, the unchanged second run drew nothing to the delta file
+        self.assertEqual(full, Path(self.temporary_dir.name).joinpath('donlon.kml').read_bytes())
+        delta_root = etree.parse(str(Path(self.temporary_dir.name).joinpath('donlon_delta.kml'))).getroot()
+        self.assertEqual(0, len(delta_root.findall('.//kml:Placemark', KML_NAMESPACES)))
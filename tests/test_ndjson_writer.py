@@ -0,0 +1,45 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+
+from aixm_geo import geodesy, ndjson_writer
+from aixm_geo.factory import AixmFeatureFactory
+
+
+class TestGeoJson(TestCase):
+    def setUp(self) -> None:
+        file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+        self.geo_dicts = [f.get_geographic_information() for f in AixmFeatureFactory(file_loc, numeric=True)]
+
+    def test_arcs_are_densified(self):
+        ear1 = next(d for d in self.geo_dicts if d.get('name') == 'EAR1 (EAR1_BRAVO)')
+        feature = ndjson_writer.to_feature(ear1)
+        ring = np.array(feature['geometry']['coordinates'][0])
+        self.assertEqual('Polygon', feature['geometry']['type'])
+        self.assertEqual(ring[0].tolist(), ring[-1].tolist())
+        # The arc runs from its solved start to end point, positions are (lon, lat)
+        arc = ear1['coordinates'][1]
+        arc_points = geodesy.densify_arc(arc)
+        np.testing.assert_allclose((arc.start_lat, arc.start_lon), arc_points[0])
+        np.testing.assert_allclose((arc.end_lat, arc.end_lon), arc_points[-1])
+        self.assertTrue(len(ring) > len(ear1['coordinates'][0]) + 2)
+        self.assertEqual('1525', feature['properties']['upper_layer'])
+        self.assertEqual('SFC', feature['properties']['upper_layer_reference'])
+
+    def test_write_ndjson(self):
+        with tempfile.TemporaryDirectory() as temporary_dir:
+            path = Path(temporary_dir).joinpath('donlon.ndjson')
+            self.assertEqual(49, ndjson_writer.write_ndjson(self.geo_dicts, path))
+            features = [json.loads(line) for line in path.read_text().splitlines()]
+
+        self.assertEqual(49, len(features))
+        tempo = next(f for f in features if f['properties'].get('name') == 'TEMPO')
+        designated_point = next(d for d in self.geo_dicts if d.get('name') == 'TEMPO')
+        self.assertEqual([designated_point['coordinates'][0][0][1], designated_point['coordinates'][0][0][0]],
+                         tempo['geometry']['coordinates'][:2])
+        self.assertEqual({'RouteSegment'},
+                         {f['properties']['type'] for f in features if f['geometry'] and
+                          f['geometry']['type'] == 'LineString'})
@@ -0,0 +1,109 @@
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+
+from aixm_geo import geodesy, obstacles
+from aixm_geo.obstacles import ObstacleIndex
+from aixm_geo.records import FeatureRecord
+
+
+def get_obstacle(identifier, coordinates, elevation):
+    return FeatureRecord('VerticalStructure', identifier, identifier, None, (np.asarray(coordinates, dtype=float),),
+                         elevation, None, None, None, {})
+
+
+def get_distances(lat, lon, lats, lons):
+    # Great circle distances on the same sphere as the index, by the haversine formula
+    lat, lon, lats, lons = np.radians(lat), np.radians(lon), np.radians(lats), np.radians(lons)
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * geodesy.MEAN_RADIUS * np.arcsin(np.sqrt(a))
+
+
+class TestObstacleIndex(TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(2)
+        self.lats = rng.uniform(50.0, 53.0, 2000)
+        self.lons = rng.uniform(-3.0, 1.0, 2000)
+        self.elevations = rng.uniform(0.0, 300.0, 2000)
+        self.index = ObstacleIndex([get_obstacle(str(i), [[lat, lon]], elevation) for i, (lat, lon, elevation)
+                                    in enumerate(zip(self.lats, self.lons, self.elevations))], leaf_size=8)
+
+    def test_radius_matches_scan(self):
+        rng = np.random.default_rng(3)
+        lats, lons = rng.uniform(50.0, 53.0, 50), rng.uniform(-3.0, 1.0, 50)
+        radii = rng.uniform(1000.0, 40000.0, 50)
+        point_indices, obstacle_indices = self.index.query_radius(lats, lons, radii)
+        expected = [(i, j) for i in range(50)
+                    for j in np.flatnonzero(get_distances(lats[i], lons[i], self.lats, self.lons) <= radii[i])]
+        self.assertEqual(expected, list(zip(point_indices.tolist(), obstacle_indices.tolist())))
+
+    def test_corridor_matches_scan(self):
+        polyline = np.array([[50.5, -2.5], [52.5, 0.5]])
+        _, obstacle_indices = self.index.query_corridor([polyline], 5000.0)
+        # Sample the segment finely enough that the nearest sample is within a few metres of the nearest point
+        fractions = np.linspace(0.0, 1.0, 20001)[:, None]
+        vectors = obstacles.normalise(geodesy.to_unit_vectors(*polyline[0]) * (1 - fractions)
+                                      + geodesy.to_unit_vectors(*polyline[1]) * fractions)
+        samples = np.degrees(np.column_stack((np.arcsin(vectors[:, 2]), np.arctan2(vectors[:, 1], vectors[:, 0]))))
+        nearest = np.array([get_distances(lat, lon, samples[:, 0], samples[:, 1]).min()
+                            for lat, lon in zip(self.lats, self.lons)])
+        clear = np.abs(nearest - 5000.0) > 20.0
+        self.assertTrue(len(obstacle_indices))
+        self.assertEqual(set(np.flatnonzero(clear & (nearest <= 5000.0))),
+                         set(obstacle_indices) & set(np.flatnonzero(clear)))
+
+    def test_max_elevations(self):
+        point_indices, obstacle_indices = self.index.query_radius([51.5, 0.0], [-1.0, 40.0], 20000.0)
+        max_elevations, highest = self.index.max_elevations(point_indices, obstacle_indices, 2)
+        within = get_distances(51.5, -1.0, self.lats, self.lons) <= 20000.0
+        self.assertEqual(self.elevations[within].max(), max_elevations[0])
+        self.assertEqual(int(np.flatnonzero(within)[np.argmax(self.elevations[within])]), highest[0])
+        self.assertTrue(np.isnan(max_elevations[1]))
+        self.assertEqual(-1, highest[1])
+
+    def test_line_obstacle_is_one_match(self):
+        index = ObstacleIndex([get_obstacle('line', [[50.0, 0.0], [50.0, 0.01], [50.0, 0.02]], 50.0),
+                               get_obstacle('unknown', [[50.0, 0.03]], None)])
+        clearance, = index.get_clearances(['a'], *index.query_radius([50.0], [0.01], 5000.0))
+        self.assertEqual(('a', 2, 50.0, 'line'), clearance)
+        self.assertEqual(0, len(ObstacleIndex([]).query_radius([50.0], [0.0], 5000.0)[0]))
+
+    def test_line_crossing_between_vertices(self):
+        # A 1 degree line whose vertices lie far outside a 1 km corridor and a 1 km radius which it crosses
+        index = ObstacleIndex([get_obstacle('line', [[51.0, -0.5], [51.0, 0.5]], 30.0)])
+        self.assertEqual([0], index.query_corridor([np.array([[50.9, 0.0], [51.1, 0.0]])], 500.0)[1].tolist())
+        self.assertEqual([0], index.query_radius([51.005], [0.0], 1000.0)[1].tolist())
+        self.assertEqual([], index.query_radius([51.02], [0.0], 1000.0)[1].tolist())
+        self.assertEqual([], index.query_corridor([np.array([[51.02, -0.1], [51.02, 0.1]])], 1000.0)[1].tolist())
+
+    def test_line_corridor_matches_scan(self):
+        rng = np.random.default_rng(4)
+        starts = np.column_stack((rng.uniform(51.0, 52.0, 200), rng.uniform(-1.0, 1.0, 200)))
+        lines = [np.array([start, start + rng.uniform(-0.05, 0.05, 2)]) for start in starts]
+        index = ObstacleIndex([get_obstacle(str(i), line, 10.0) for i, line in enumerate(lines)])
+        polyline = np.array([[51.0, -1.0], [52.0, 1.0]])
+        _, obstacle_indices = index.query_corridor([polyline], 2000.0)
+
+        # Sample every obstacle finely and measure each sample to the corridor's great circle segment
+        fractions = np.linspace(0.0, 1.0, 2001)[:, None]
+        corridor = geodesy.to_unit_vectors(*polyline.T)
+        nearest = []
+        for line in lines:
+            ends = geodesy.to_unit_vectors(*line.T)
+            samples = obstacles.normalise(ends[0] * (1 - fractions) + ends[1] * fractions)
+            nearest.append(obstacles.segment_angles(samples, np.repeat(corridor[:1], len(samples), axis=0),
+                                                    np.repeat(corridor[1:], len(samples), axis=0)).min())
+        nearest = np.array(nearest) * geodesy.MEAN_RADIUS
+        clear = np.abs(nearest - 2000.0) > 20.0
+        self.assertTrue(len(obstacle_indices))
+        self.assertEqual(set(np.flatnonzero(clear & (nearest <= 2000.0))),
+                         set(obstacle_indices) & set(np.flatnonzero(clear)))
+
+    def test_clearances_in_file(self):
+        file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+        airports, routes = obstacles.clearances_in_file(file_loc, 5 * 1852.0, 5 * 1852.0)
+        self.assertEqual(2, len(airports))
+        self.assertEqual(4, len(routes))
+        self.assertTrue(all(airport.obstacle_count for airport in airports))
+        self.assertTrue(all(airport.max_elevation > 0 for airport in airports))
@@ -0,0 +1,64 @@
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+
+from aixm_geo import overlap
+from aixm_geo.containment import AirspaceContainment
+from aixm_geo.records import FeatureRecord
+
+
+def get_square(min_lat, min_lon, size):
+    return np.array([[min_lat, min_lon], [min_lat + size, min_lon], [min_lat + size, min_lon + size],
+                     [min_lat, min_lon + size], [min_lat, min_lon]])
+
+
+def get_airspace(identifier, ring, lower_limit=0.0, upper_limit=3000.0):
+    return FeatureRecord('Airspace', identifier, identifier, identifier, (ring,), None, lower_limit, upper_limit,
+                         'MSL', {})
+
+
+class TestOverlap(TestCase):
+    def test_rings_overlap(self):
+        square = get_square(0.0, 0.0, 1.0)
+        self.assertTrue(overlap.rings_overlap(square, get_square(0.5, 0.5, 1.0)))
+        # Sharing a border or a corner is not an overlap
+        self.assertFalse(overlap.rings_overlap(square, get_square(0.0, 1.0, 1.0)))
+        self.assertFalse(overlap.rings_overlap(square, get_square(1.0, 1.0, 1.0)))
+        # Containment, including inside a shared border, and identical rings are
+        self.assertTrue(overlap.rings_overlap(square, get_square(0.25, 0.25, 0.5)))
+        self.assertTrue(overlap.rings_overlap(square, get_square(0.0, 0.0, 0.5)))
+        self.assertTrue(overlap.rings_overlap(square, square.copy()))
+        triangle = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 0.0]])
+        self.assertTrue(overlap.rings_overlap(square, triangle))
+
+    def test_find_overlaps(self):
+        airspaces = AirspaceContainment([
+            get_airspace('a', get_square(0.0, 0.0, 1.0)),
+            get_airspace('b', get_square(0.5, 0.5, 1.0), 1000.0, 5000.0),
+            get_airspace('c', get_square(0.0, 1.0, 1.0)),
+            get_airspace('d', get_square(0.2, 0.2, 0.2), 3000.0, 6000.0),
+            get_airspace('e', get_square(10.0, 10.0, 1.0)),
+        ])
+        overlaps = overlap.find_overlaps(airspaces)
+        self.assertEqual([('a', 'b', 1000.0, 3000.0), ('b', 'c', 1000.0, 3000.0)],
+                         [(o.identifier_a, o.identifier_b, o.lower_limit, o.upper_limit) for o in overlaps])
+
+    def test_candidate_pairs_match_brute_force(self):
+        rng = np.random.default_rng(1)
+        mins = rng.uniform(0.0, 10.0, (200, 2))
+        envelopes = np.column_stack((mins, mins + rng.uniform(0.1, 1.0, (200, 2))))
+        lower_limits = rng.uniform(0.0, 5000.0, 200)
+        upper_limits = lower_limits + rng.uniform(100.0, 5000.0, 200)
+        expected = [(i, j) for i in range(200) for j in range(i + 1, 200)
+                    if envelopes[i, 0] <= envelopes[j, 2] and envelopes[j, 0] <= envelopes[i, 2]
+                    and envelopes[i, 1] <= envelopes[j, 3] and envelopes[j, 1] <= envelopes[i, 3]
+                    and max(lower_limits[i], lower_limits[j]) < min(upper_limits[i], upper_limits[j])]
+        pairs = overlap.candidate_pairs(envelopes, lower_limits, upper_limits)
+        self.assertEqual(expected, [tuple(pair) for pair in pairs.tolist()])
+
+    def test_find_overlaps_in_file(self):
+        file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+        overlaps = overlap.find_overlaps_in_file(file_loc)
+        self.assertEqual(8, len(overlaps))
+        self.assertTrue(all(o.lower_limit < o.upper_limit for o in overlaps))
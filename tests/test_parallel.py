@@ -0,0 +1,34 @@
+from pathlib import Path
+from unittest import TestCase
+
+from aixm_geo.factory import AixmFeatureFactory
+from aixm_geo import parallel
+from aixm_geo.parallel import ParallelFeatureExtractor
+
+
+class TestParallelFeatureExtractor(TestCase):
+    def setUp(self) -> None:
+        self.file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+
+    def test_matches_serial_order(self):
+        serial = [feature.get_geographic_information() for feature in AixmFeatureFactory(self.file_loc)]
+        parallel = list(ParallelFeatureExtractor(self.file_loc, workers=2, chunk_size=5))
+        self.assertEqual(serial, parallel)
+
+    def test_records_unsupported_types(self):
+        extractor = ParallelFeatureExtractor(self.file_loc, workers=2)
+        list(extractor)
+        self.assertIn('aixm:Runway is not a currently supported AIXMFeature type', extractor.errors)
+
+    def test_feature_records_in_order(self):
+        serial = AixmFeatureFactory(self.file_loc).get_feature_records()
+        parallel = ParallelFeatureExtractor(self.file_loc, workers=2, chunk_size=5).get_feature_records()
+        self.assertEqual([(r.identifier, r.name) for r in serial], [(r.identifier, r.name) for r in parallel])
+
+    def test_helpers_match_across_workers(self):
+        for workers in (None, 2):
+            feature_records = parallel.get_feature_records(self.file_loc, {'Airspace'}, workers=workers)
+            geo_dicts = parallel.get_geographic_information(self.file_loc, feature_types={'Airspace'}, workers=workers)
+            self.assertIsInstance(feature_records, list)
+            self.assertEqual([record.name for record in feature_records], [geo_dict['name'] for geo_dict in geo_dicts])
+            self.assertEqual(13, len(feature_records))
@@ -0,0 +1,68 @@
+from pathlib import Path
+from unittest import TestCase
+
+from aixm_geo import references
+from aixm_geo.factory import AixmFeatureFactory
+from aixm_geo.references import ReferenceResolver
+
+WOB = '882e849c-682d-4e95-ac19-a7808d55cdbb'
+UA4 = 'a14a8751-5428-46bc-a2d1-32ef84d37b5c'
+
+
+class TestReferenceResolver(TestCase):
+    def setUp(self) -> None:
+        self.file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+        self.resolver = ReferenceResolver.from_file(self.file_loc)
+
+    def test_get_identifier(self):
+        self.assertEqual(WOB, references.get_identifier(f'urn:uuid:{WOB}'))
+        self.assertEqual(WOB, references.get_identifier(f'#uuid.{WOB}'))
+        self.assertEqual(WOB, references.get_identifier(WOB))
+
+    def test_resolve(self):
+        # Navaid and Route are not drawn but are still resolvable
+        navaid = self.resolver.resolve(f'urn:uuid:{WOB}')
+        self.assertEqual(('Navaid', 'WOB'), (navaid.feature_type, navaid.designator))
+        self.assertEqual(2, len(navaid.position))
+        self.assertEqual('UA4', self.resolver[UA4].label)
+        self.assertIsNone(self.resolver.resolve('urn:uuid:missing'))
+        self.assertNotIn('urn:uuid:missing', self.resolver)
+
+    def test_route_segment_names(self):
+        names = [feature.get_geographic_information()['name'] for feature in
+                 AixmFeatureFactory(self.file_loc, feature_types={'RouteSegment'}, resolver=self.resolver)]
+        self.assertEqual('UA4 (BARIM - WOB)', names[0])
+
+        # Without a resolver the reference titles are used
+        segment = next(iter(AixmFeatureFactory(self.file_loc, feature_types={'RouteSegment'})))
+        geo_dict = segment.get_geographic_information()
+        self.assertEqual('UA4 (BARIM - WOB VOR)', geo_dict['name'])
+        self.assertEqual((UA4, WOB), (geo_dict['route_identifier'], geo_dict['end_identifier']))
+
+    def test_incremental_resolver(self):
+        resolver = ReferenceResolver()
+        features = AixmFeatureFactory(self.file_loc, stream=True, feature_types={'RouteSegment'}, resolver=resolver,
+                                      fill_resolver=True)
+        names = [feature.get_geographic_information()['name'] for feature in features]
+        self.assertEqual('UA4 (BARIM - WOB)', names[0])
+        self.assertEqual(len(self.resolver), len(resolver))
+
+    def test_prebuilt_resolver_is_not_refilled(self):
+        resolver = ReferenceResolver()
+        list(AixmFeatureFactory(self.file_loc, feature_types={'RouteSegment'}, resolver=resolver))
+        self.assertEqual(0, len(resolver))
+
+    def test_later_member_merges_into_earlier(self):
+        resolver = ReferenceResolver()
+        resolver.add(references.Reference('Navaid', WOB, 'WOB', 'WOBURN', (52.0, -32.0)))
+        merged = resolver.add(references.Reference('Navaid', WOB, None, 'WOBURN VOR', None))
+        self.assertEqual(('WOB', 'WOBURN VOR', (52.0, -32.0)), (merged.designator, merged.name, merged.position))
+        self.assertEqual(merged, resolver.resolve(WOB))
+
+    def test_airspace_contributors(self):
+        oca = next(feature for feature in AixmFeatureFactory(self.file_loc, feature_types={'Airspace'},
+                                                             resolver=self.resolver)
+                   if feature.get_first_value('.//aixm:name') == 'MAGNETTO OCA')
+        contributors = oca.get_contributors()
+        self.assertEqual(['BASE', 'UNION'], [contributor.operation for contributor in contributors])
+        self.assertEqual(['EAMM', 'EAMM2'], [contributor.reference.designator for contributor in contributors])
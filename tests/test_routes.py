@@ -0,0 +1,67 @@
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+
+from aixm_geo.records import FeatureRecord
+from aixm_geo.routes import RouteNetwork
+
+POINTS = {'A': (50.0, 0.0), 'B': (50.0, 1.0), 'C': (51.0, 1.0), 'D': (50.5, 0.5), 'X': (40.0, 0.0), 'Y': (40.0, 1.0)}
+
+
+def get_segment(identifier, route, start, end):
+    return FeatureRecord('RouteSegment', identifier, identifier, None, (np.array([POINTS[start], POINTS[end]]),), None,
+                         None, None, None,
+                         {'route_identifier': route, 'start_identifier': start, 'end_identifier': end})
+
+
+class TestRouteNetwork(TestCase):
+    def setUp(self) -> None:
+        self.network = RouteNetwork([
+            get_segment('ab', 'r1', 'A', 'B'),
+            get_segment('bc', 'r1', 'B', 'C'),
+            # Reversed, so r2 runs A - D - C against the direction of dc
+            get_segment('ad', 'r2', 'A', 'D'),
+            get_segment('dc', 'r2', 'C', 'D'),
+            get_segment('xy', 'r3', 'X', 'Y'),
+            FeatureRecord('RouteSegment', 'no-end', 'no-end', None, (np.array([POINTS['A']]),), None, None, None,
+                          None, {'route_identifier': 'r1', 'start_identifier': 'A', 'end_identifier': None}),
+        ])
+
+    def test_csr(self):
+        self.assertEqual(5, len(self.network))
+        self.assertEqual(['A', 'B', 'C', 'D', 'X', 'Y'], self.network.point_identifiers.tolist())
+        node = self.network.get_node('C')
+        links = slice(self.network.offsets[node], self.network.offsets[node + 1])
+        self.assertEqual({'B', 'D'}, set(self.network.point_identifiers[self.network.neighbours[links]]))
+
+    def test_connected(self):
+        self.assertTrue(self.network.connected('A', 'C'))
+        self.assertFalse(self.network.connected('A', 'X'))
+        self.assertFalse(self.network.connected('A', 'unknown'))
+
+    def test_shortest_path(self):
+        path = self.network.shortest_path('A', 'C')
+        self.assertEqual(('A', 'D', 'C'), path.points)
+        self.assertEqual(('ad', 'dc'), path.segments)
+        self.assertEqual((True, False), path.forwards)
+        self.assertAlmostEqual(self.network.lengths[2:4].sum(), path.length)
+        polyline = self.network.get_path_polyline(path)
+        self.assertEqual([POINTS['A'], POINTS['D'], POINTS['C']], [tuple(point) for point in polyline.tolist()])
+        self.assertIsNone(self.network.shortest_path('A', 'Y'))
+
+    def test_route_polylines(self):
+        polyline, = self.network.get_route_polylines('r2')
+        self.assertEqual([POINTS['A'], POINTS['D'], POINTS['C']], [tuple(point) for point in polyline.tolist()])
+        self.assertEqual([], self.network.get_route_polylines('unknown'))
+
+    def test_from_file(self):
+        file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+        network = RouteNetwork.from_file(file_loc)
+        self.assertEqual(4, len(network))
+        polylines = network.get_route_polylines(network.route_identifiers[0])
+        self.assertEqual(1, len(polylines))
+        self.assertEqual(5, len(polylines[0]))
+        path = network.shortest_path(network.point_identifiers[network.starts[0]],
+                                     network.point_identifiers[network.ends[-1]])
+        self.assertAlmostEqual(network.lengths.sum(), path.length)
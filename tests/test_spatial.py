@@ -0,0 +1,47 @@
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+
+from aixm_geo import geometry
+from aixm_geo.spatial import SpatialIndex, clamp_distances
+
+
+class TestSpatialIndex(TestCase):
+    def setUp(self) -> None:
+        file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+        # A small node capacity gives the donlon features a few levels of tree
+        self.spatial_index = SpatialIndex.from_file(file_loc, node_capacity=4)
+        self.envelopes = np.array([geometry.envelope(r.geometry) for r in self.spatial_index.records])
+
+    def test_bbox_matches_scan(self):
+        rng = np.random.default_rng(0)
+        for _ in range(100):
+            lats = np.sort(rng.uniform(50.0, 56.0, 2))
+            lons = np.sort(rng.uniform(-36.0, -20.0, 2))
+            bbox = (lats[0], lons[0], lats[1], lons[1])
+            expected = {record.identifier for record, envelope in zip(self.spatial_index.records, self.envelopes)
+                        if geometry.intersects(tuple(envelope), bbox)}
+            self.assertEqual(expected, {record.identifier for record in self.spatial_index.query_bbox(bbox)})
+
+    def test_radius_and_nearest(self):
+        distances = clamp_distances(52.3, -31.9, self.envelopes)
+        order = np.argsort(distances, kind='stable')
+
+        within = self.spatial_index.query_radius(52.3, -31.9, 20000.0)
+        self.assertEqual(int((distances <= 20000.0).sum()), len(within))
+
+        nearest = self.spatial_index.nearest(52.3, -31.9, k=5)
+        self.assertEqual([round(float(d), 3) for d in distances[order[:5]]], [round(d, 3) for _, d in nearest])
+        self.assertEqual([], SpatialIndex([]).nearest(52.3, -31.9))
+
+    def test_arc_envelope_only_covers_swept_part(self):
+        # A quarter arc clockwise from north to east only reaches the northern and eastern extremes of its circle
+        arc = geometry.Arc(52.0, -31.0, 10000.0, 0.0, 90.0, 'clockwise', 52.0898, -31.0, 51.9997, -30.8540)
+        min_lat, min_lon, max_lat, max_lon = geometry.arc_envelope(arc)
+        circle = geometry.expand_envelope((52.0, -31.0, 52.0, -31.0), 10000.0)
+        self.assertEqual((51.9997, -31.0), (min_lat, min_lon))
+        self.assertEqual((circle[2], circle[3]), (max_lat, max_lon))
+
+        anticlockwise = geometry.arc_envelope(arc._replace(direction='anticlockwise'))
+        self.assertEqual((circle[0], circle[1]), anticlockwise[:2])
@@ -0,0 +1,65 @@
+import importlib.util
+import tempfile
+from pathlib import Path
+from unittest import TestCase, skipUnless
+
+import numpy as np
+
+from aixm_geo.table import FeatureTable
+
+
+class TestFeatureTable(TestCase):
+    def setUp(self) -> None:
+        file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+        self.table = FeatureTable.from_file(file_loc)
+
+    def test_columns_and_filtering(self):
+        self.assertEqual(49, len(self.table))
+        self.assertEqual(np.float64, self.table['upper_limit'].dtype)
+
+        airspace = self.table[(self.table['feature_type'] == 'Airspace') & (self.table['designator'] == 'EAR1')]
+        self.assertEqual(1, len(airspace))
+        self.assertEqual(1525.0, airspace['upper_limit'][0])
+        coordinates = airspace.get_coordinates(0)
+        # The arc is densified and every point lies within the row's bounding box
+        self.assertTrue(len(coordinates) > 3)
+        self.assertTrue((coordinates[:, 0] >= airspace['min_lat'][0] - 1e-9).all())
+        self.assertTrue((coordinates[:, 1] <= airspace['max_lon'][0] + 1e-9).all())
+
+    def test_take_keeps_coordinates_with_rows(self):
+        rows = [48, 3, 17]
+        taken = self.table.take(rows)
+        for i, row in enumerate(rows):
+            np.testing.assert_array_equal(self.table.get_coordinates(row), taken.get_coordinates(i))
+            self.assertEqual(self.table['identifier'][row], taken['identifier'][i])
+
+    def test_row_index_is_one_row_table(self):
+        for key in (3, np.int64(3), -46):
+            row = self.table[key]
+            self.assertEqual(1, len(row))
+            self.assertEqual((1,), row['identifier'].shape)
+            self.assertEqual(self.table['identifier'][3], row['identifier'][0])
+            np.testing.assert_array_equal(self.table.get_coordinates(3), row.get_coordinates(0))
+        with self.assertRaises(IndexError):
+            self.table[49]
+
+    def test_npz_round_trip(self):
+        with tempfile.TemporaryDirectory() as temporary_dir:
+            path = Path(temporary_dir).joinpath('donlon.npz')
+            self.table.save(path)
+            loaded = FeatureTable.load(path)
+        self.assert_tables_equal(self.table, loaded)
+
+    @skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_parquet_round_trip(self):
+        with tempfile.TemporaryDirectory() as temporary_dir:
+            path = Path(temporary_dir).joinpath('donlon.parquet')
+            self.table.save_parquet(path)
+            loaded = FeatureTable.load_parquet(path)
+        self.assert_tables_equal(self.table, loaded)
+
+    def assert_tables_equal(self, expected, actual):
+        np.testing.assert_array_equal(expected.offsets, actual.offsets)
+        np.testing.assert_array_equal(expected.coordinates, actual.coordinates)
+        for column, values in expected.columns.items():
+            np.testing.assert_array_equal(values, actual[column])
@@ -0,0 +1,46 @@
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+
+from aixm_geo.temporal import TemporalIndex
+
+ACR001 = '4fd9f4be-8c65-43f6-b083-3ced9a4b2a7f'
+
+
+class TestTemporalIndex(TestCase):
+    def setUp(self) -> None:
+        file_loc = Path().absolute().joinpath('..', Path('test_data/donlon.xml'))
+        self.temporal_index = TemporalIndex(file_loc)
+
+    def test_tempdelta_applies_only_while_valid(self):
+        interpretations = []
+        for time in ('2010-01-01T00:00:00Z', '2012-07-10T07:05:00Z', '2012-07-10T07:16:00Z'):
+            timeslices = self.temporal_index.effective_timeslices(ACR001, time)
+            interpretations.append([ts[0].findtext('{http://www.aixm.aero/schema/5.1}interpretation')
+                                    for ts in timeslices])
+        self.assertEqual([['BASELINE'], ['BASELINE', 'TEMPDELTA'], ['BASELINE']], interpretations)
+
+    def test_state_at_keeps_baseline_values(self):
+        baseline = self.temporal_index.state_at(ACR001, '2010-01-01T00:00:00Z').get_geographic_information()
+        during_delta = self.temporal_index.state_at(ACR001, '2012-07-10T07:05:00Z').get_geographic_information()
+        self.assertEqual(baseline, during_delta)
+        self.assertEqual('ACR001 (Unknown)', during_delta['name'])
+
+    def test_snapshot(self):
+        self.assertIsNone(self.temporal_index.state_at(ACR001, '2008-12-31T23:59:59Z'))
+        # Features only described by deltas have no state to resolve
+        self.assertIsNone(self.temporal_index.state_at('e9ce3cc0-b41f-11e3-a5e2-0800200c9a66', '2013-01-01'))
+        snapshot = list(self.temporal_index.snapshot('2012-07-10T07:05:00Z'))
+        self.assertIn(ACR001, [aixm_feature.get_identifier() for aixm_feature in snapshot])
+        self.assertTrue(len(snapshot) < len(self.temporal_index))
+
+    def test_corrections_supersede_originals(self):
+        # The TEMPDELTA pausing crane operations is corrected to end a day later, only the correction is kept
+        timeline = self.temporal_index.get_timeline('8c755520-b42b-11e3-a5e2-0800500c9a66')
+        self.assertEqual(1, int((~timeline.delta_permanent).sum()))
+        self.assertEqual(np.datetime64('2012-10-19T23:59:59', 'ms'), timeline.delta_end[~timeline.delta_permanent][0])
+        # Corrections without a valid time cancel the PERMDELTAs they correct
+        timeline = self.temporal_index.get_timeline('8c755520-b42b-11e3-a5e2-0800400c9a66')
+        self.assertEqual(2, len(timeline.deltas))
+        self.assertTrue((timeline.delta_begin > np.datetime64('2000-01-01')).all())